@@ -8,13 +8,20 @@ for intelligent script discovery, extension, and categorization
 
 import os
 import json
+import argparse
 import requests
 import hashlib
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Any
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import re
+import sys
+
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.parallel_analysis import ParallelAnalysisDriver
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -48,7 +55,11 @@ class AlexAIScriptKnowledgeIntegration:
         self.supabase_url = supabase_url or os.getenv('SUPABASE_URL')
         self.supabase_key = supabase_key or os.getenv('SUPABASE_ANON_KEY')
         self.scripts_dir = "scripts"
+        self.driver = ParallelAnalysisDriver()
+        self.manifest_file = "alex-ai-script-knowledge-manifest.json"
+        self.diff_file = "alex-ai-script-knowledge-diff.json"
         self.knowledge_base = []
+        self.knowledge_diff = {}
         self.consolidation_data = {}
         
         # Load consolidation findings
@@ -75,15 +86,109 @@ class AlexAIScriptKnowledgeIntegration:
             logger.error(f"Error loading consolidation findings: {e}")
             self.consolidation_data = {}
     
-    def build_script_knowledge_base(self) -> List[ScriptKnowledge]:
-        """Build comprehensive script knowledge base"""
+    def build_script_knowledge_base(self, incremental: bool = True) -> List[ScriptKnowledge]:
+        """Build comprehensive script knowledge base, re-analyzing only changed scripts"""
         logger.info("🧠 Building Alex AI script knowledge base...")
         
-        knowledge_base = []
+        manifest = self.load_manifest() if incremental else {}
+        previous_entries = manifest.get('files', {})
+        recommendations_hash = self.get_recommendations_hash()
+        refresh_all_neighbours = bool(previous_entries) and manifest.get('recommendations_hash') != recommendations_hash
+        
+        entries = {}
+        diff = {"added": [], "modified": [], "removed": [], "unchanged": 0, "neighbours_refreshed": []}
+        pending = []
+        pending_stats = {}
+        
+        for file_path in self.discover_knowledge_scripts():
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                logger.error(f"Error reading {file_path}: {e}")
+                continue
+            
+            cached = previous_entries.get(file_path)
+            
+            # Unchanged size and mtime - trust the manifest without touching the file
+            if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime:
+                entries[file_path] = cached
+                diff['unchanged'] += 1
+            else:
+                entries[file_path] = None
+                pending_stats[file_path] = stat
+                pending.append((file_path, cached['content_hash'] if cached else None))
+        
+        analyzed = self.driver.starmap(self.analyze_changed_script, pending)
+        
+        for (file_path, previous_hash), result in zip(pending, analyzed):
+            stat = pending_stats[file_path]
+            content_hash, script_knowledge = result if result else (None, None)
+            
+            # Touched but identical content - only the stat fields need refreshing
+            if content_hash and content_hash == previous_hash:
+                cached = dict(previous_entries[file_path], size=stat.st_size, mtime=stat.st_mtime)
+                cached['knowledge'] = dict(
+                    cached['knowledge'],
+                    last_modified=datetime.fromtimestamp(stat.st_mtime).isoformat()
+                )
+                entries[file_path] = cached
+                diff['unchanged'] += 1
+                continue
+            
+            if not script_knowledge:
+                del entries[file_path]
+                continue
+            
+            entries[file_path] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "content_hash": content_hash,
+                "knowledge": asdict(script_knowledge)
+            }
+            diff['modified' if previous_hash else 'added'].append(file_path)
+        
+        diff['removed'] = sorted(set(previous_entries) - set(entries))
+        diff['neighbours_refreshed'] = self.refresh_consolidation_neighbours(
+            entries, diff, refresh_all_neighbours
+        )
+        
+        self.knowledge_base = [ScriptKnowledge(**entry['knowledge']) for entry in entries.values()]
+        self.knowledge_diff = diff
+        
+        self.save_manifest({
+            "generated_at": datetime.now().isoformat(),
+            "recommendations_hash": recommendations_hash,
+            "files": entries
+        })
+        self.save_knowledge_diff()
+        
+        logger.info(f"📚 Built knowledge base with {len(self.knowledge_base)} scripts "
+                    f"({len(diff['added'])} added, {len(diff['modified'])} modified, "
+                    f"{len(diff['removed'])} removed, {diff['unchanged']} unchanged)")
+        
+        return self.knowledge_base
+    
+    def analyze_changed_script(self, file_path: str, previous_hash: str = None) -> Tuple[str, ScriptKnowledge]:
+        """Hash a script and analyze it unless its content matches the previous build"""
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        content_hash = hashlib.md5(raw).hexdigest()
+        
+        if content_hash == previous_hash:
+            return content_hash, None
+        
+        return content_hash, self.analyze_script_for_knowledge(
+            file_path, content=raw.decode('utf-8', errors='ignore')
+        )
+    
+    def discover_knowledge_scripts(self) -> List[str]:
+        """Discover script files that belong in the knowledge base"""
+        script_paths = []
         
         # Process all scripts in the organized structure
         for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
+            dirs.sort()
+            for file in sorted(files):
                 if file.endswith(('.py', '.sh', '.js', '.html', '.json')):
                     file_path = os.path.join(root, file)
                     
@@ -91,20 +196,86 @@ class AlexAIScriptKnowledgeIntegration:
                     if 'archived' in file_path:
                         continue
                     
-                    script_knowledge = self.analyze_script_for_knowledge(file_path)
-                    if script_knowledge:
-                        knowledge_base.append(script_knowledge)
+                    script_paths.append(file_path)
+        
+        return script_paths
+    
+    def refresh_consolidation_neighbours(self, entries: Dict[str, Dict], diff: Dict[str, Any],
+                                         refresh_all: bool = False) -> List[str]:
+        """Recompute cross-script fields for unchanged scripts grouped with changed ones"""
+        changed_paths = set(diff['added']) | set(diff['modified'])
+        changed_names = {os.path.basename(path) for path in changed_paths | set(diff['removed'])}
         
-        self.knowledge_base = knowledge_base
-        logger.info(f"📚 Built knowledge base with {len(knowledge_base)} scripts")
+        opportunities = self.consolidation_data.get('recommendations', {}).get('consolidation_opportunities', [])
+        affected_opportunities = [
+            str(opportunity) for opportunity in opportunities
+            if any(name in str(opportunity) for name in changed_names)
+        ]
         
-        return knowledge_base
+        if not refresh_all and not affected_opportunities:
+            return []
+        
+        refreshed = []
+        for file_path, entry in entries.items():
+            if file_path in changed_paths:
+                continue
+            
+            knowledge = entry['knowledge']
+            file_name = knowledge['file_name']
+            if not refresh_all and not any(file_name in text for text in affected_opportunities):
+                continue
+            
+            similar_scripts = self.find_similar_scripts(file_name, file_path)
+            consolidation_group = self.find_consolidation_group(file_name)
+            if (sorted(similar_scripts) != sorted(knowledge['similar_scripts'])
+                    or consolidation_group != knowledge['consolidation_group']):
+                entry['knowledge'] = dict(
+                    knowledge,
+                    similar_scripts=similar_scripts,
+                    consolidation_group=consolidation_group
+                )
+                refreshed.append(file_path)
+        
+        return refreshed
+    
+    def get_recommendations_hash(self) -> str:
+        """Fingerprint the consolidation recommendations that cross-script fields depend on"""
+        recommendations = self.consolidation_data.get('recommendations', {})
+        return hashlib.md5(json.dumps(recommendations, sort_keys=True).encode()).hexdigest()
+    
+    def load_manifest(self) -> Dict[str, Any]:
+        """Load the knowledge base manifest from the previous build"""
+        try:
+            with open(self.manifest_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable manifest {self.manifest_file}: {e}")
+            return {}
+    
+    def save_manifest(self, manifest: Dict[str, Any]):
+        """Persist the knowledge base manifest for the next incremental build"""
+        try:
+            with open(self.manifest_file, 'w') as f:
+                json.dump(manifest, f)
+        except Exception as e:
+            logger.error(f"Error saving manifest: {e}")
     
-    def analyze_script_for_knowledge(self, file_path: str) -> ScriptKnowledge:
+    def save_knowledge_diff(self):
+        """Save the diff produced by the last knowledge base build"""
+        try:
+            with open(self.diff_file, 'w') as f:
+                json.dump(self.knowledge_diff, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving knowledge diff: {e}")
+    
+    def analyze_script_for_knowledge(self, file_path: str, content: str = None) -> ScriptKnowledge:
         """Analyze script and create knowledge representation"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
             
             file_name = os.path.basename(file_path)
             file_type = file_path.split('.')[-1]
@@ -666,6 +837,10 @@ if __name__ == "__main__":
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Alex AI Script Knowledge Integration")
+    parser.add_argument('--full', action='store_true', help='Ignore the manifest and re-analyze every script')
+    args = parser.parse_args()
+    
     print("🧠 Alex AI Script Knowledge Integration")
     print("=" * 50)
     
@@ -673,9 +848,12 @@ def main():
     
     # Build knowledge base
     print("📚 Building script knowledge base...")
-    knowledge_base = integrator.build_script_knowledge_base()
+    knowledge_base = integrator.build_script_knowledge_base(incremental=not args.full)
     
+    diff = integrator.knowledge_diff
     print(f"✅ Knowledge base built with {len(knowledge_base)} scripts")
+    print(f"   ➕ {len(diff['added'])} added, ✏️ {len(diff['modified'])} modified, "
+          f"➖ {len(diff['removed'])} removed, {diff['unchanged']} unchanged")
     
     # Store in Supabase
     print("🗄️ Storing in Supabase...")
@@ -691,6 +869,8 @@ def main():
     print("✅ Alex AI Script Knowledge Integration Complete!")
     print("\n📋 Files created:")
     print("  - alex-ai-script-knowledge.json")
+    print("  - alex-ai-script-knowledge-manifest.json")
+    print("  - alex-ai-script-knowledge-diff.json")
     print("  - alex-ai-script-recommendation-system.json")
     print("  - scripts/alex-ai-script-recommender.py")
     
@@ -6,6 +6,7 @@ Deep analysis of existing folder structure to identify redundancy and optimizati
 """
 
 import os
+import sys
 import json
 import re
 from datetime import datetime
@@ -14,10 +15,22 @@ import logging
 from dataclasses import dataclass
 from collections import defaultdict
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.line_metrics import is_large_file, stream_line_metrics
+from utilities.sparse_similarity import SparseFeatureMatrix
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Weights of the per-feature Jaccard similarities that make up script similarity
+SIMILARITY_WEIGHTS = {"purpose": 0.3, "functions": 0.3, "imports": 0.2, "name": 0.2}
+WITHIN_FOLDER_SIMILARITY_THRESHOLD = 0.7
+CROSS_FOLDER_SIMILARITY_THRESHOLD = 0.8
+
 @dataclass
 class ScriptInfo:
     """Script information"""
@@ -52,12 +65,16 @@ class FolderAnalysis:
 class ComprehensiveFolderAnalyzer:
     def __init__(self, scripts_dir: str = "scripts"):
         self.scripts_dir = scripts_dir
+        self.driver = ParallelAnalysisDriver()
         self.folder_analyses = {}
         self.all_scripts = []
         self.redundancy_map = defaultdict(list)
         self.consolidation_opportunities = []
         self.deprecated_scripts = []
         self.optimization_recommendations = {}
+        self.feature_matrix = None
+        self.script_rows = {}
+        self.folder_similarities = {}
         
     def analyze_all_folders(self) -> Dict:
         """Perform comprehensive analysis of all folders"""
@@ -102,7 +119,10 @@ class ComprehensiveFolderAnalyzer:
     
     def discover_all_scripts_and_folders(self):
         """Discover all scripts and folders"""
+        work_items = []
+        
         for root, dirs, files in os.walk(self.scripts_dir):
+            dirs.sort()
             folder_path = os.path.relpath(root, self.scripts_dir)
             folder_name = os.path.basename(root)
             
@@ -120,34 +140,57 @@ class ComprehensiveFolderAnalyzer:
                 subfolders=dirs
             )
             
-            # Process scripts in this folder
-            for file in files:
+            # Queue scripts in this folder for analysis
+            for file in sorted(files):
                 if file.endswith(('.py', '.sh', '.js', '.html', '.json')):
-                    file_path = os.path.join(root, file)
-                    script_info = self.analyze_script(file_path, folder_path, folder_name)
-                    
-                    if script_info:
-                        self.all_scripts.append(script_info)
-                        self.folder_analyses[folder_path].scripts.append(script_info)
-                        self.folder_analyses[folder_path].script_count += 1
-                        self.folder_analyses[folder_path].total_size += script_info.size_bytes
-                        self.folder_analyses[folder_path].total_lines += script_info.lines
+                    work_items.append((os.path.join(root, file), folder_path, folder_name))
+        
+        for script_info in self.driver.starmap(self.analyze_script, work_items):
+            if script_info:
+                folder_analysis = self.folder_analyses[script_info.folder_path]
+                self.all_scripts.append(script_info)
+                folder_analysis.scripts.append(script_info)
+                folder_analysis.script_count += 1
+                folder_analysis.total_size += script_info.size_bytes
+                folder_analysis.total_lines += script_info.lines
     
     def analyze_script(self, file_path: str, folder_path: str, folder_name: str) -> ScriptInfo:
         """Analyze a single script"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
             file_name = os.path.basename(file_path)
             file_type = file_path.split('.')[-1]
             
             # Get file stats
             stat = os.stat(file_path)
             size_bytes = stat.st_size
-            lines = len(content.split('\n'))
             last_modified = datetime.fromtimestamp(stat.st_mtime).isoformat()
             
+            # Very large files (bundles, data dumps) only get streaming line metrics
+            if is_large_file(size_bytes):
+                metrics = stream_line_metrics(file_path, file_type)
+                if metrics is None:
+                    return None
+                logger.info(f"📏 {file_name} is {size_bytes} bytes, recording line metrics only")
+                return ScriptInfo(
+                    file_path=file_path,
+                    file_name=file_name,
+                    file_type=file_type,
+                    folder_path=folder_path,
+                    folder_name=folder_name,
+                    size_bytes=size_bytes,
+                    lines=metrics.total_lines,
+                    content_preview=metrics.preview,
+                    functions=[],
+                    imports=metrics.imports,
+                    purpose=self.determine_purpose(file_name, metrics.preview),
+                    complexity=1,
+                    last_modified=last_modified
+                )
+            
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            lines = content.count('\n') + 1
+            
             # Extract functions
             functions = self.extract_functions(content, file_type)
             
@@ -310,20 +353,39 @@ class ComprehensiveFolderAnalyzer:
                 # Generate recommended actions
                 folder_analysis.recommended_actions = self.generate_folder_recommendations(folder_analysis)
     
+    def build_feature_matrix(self) -> SparseFeatureMatrix:
+        """Build one sparse binary feature row per script (purpose, functions, imports, name tokens)"""
+        if self.feature_matrix is None or len(self.script_rows) != len(self.all_scripts):
+            self.feature_matrix = SparseFeatureMatrix(SIMILARITY_WEIGHTS)
+            self.script_rows = {}
+            self.folder_similarities = {}
+            for script in self.all_scripts:
+                self.script_rows[script.file_path] = self.feature_matrix.add_row({
+                    "purpose": [script.purpose],
+                    "functions": script.functions,
+                    "imports": script.imports,
+                    "name": self.name_tokens(script.file_name.lower())
+                })
+        return self.feature_matrix
+    
+    def get_folder_similarities(self, folder_analysis: FolderAnalysis) -> Dict[Tuple[int, int], float]:
+        """Nonzero pairwise similarities within a folder, keyed by script positions (computed once per folder)"""
+        matrix = self.build_feature_matrix()
+        if folder_analysis.folder_path not in self.folder_similarities:
+            rows = [self.script_rows[script.file_path] for script in folder_analysis.scripts]
+            self.folder_similarities[folder_analysis.folder_path] = matrix.pairwise_similarities(rows)
+        return self.folder_similarities[folder_analysis.folder_path]
+    
     def calculate_folder_redundancy(self, folder_analysis: FolderAnalysis) -> float:
         """Calculate redundancy score for a folder (0-1)"""
         if folder_analysis.script_count < 2:
             return 0.0
         
-        scripts = folder_analysis.scripts
+        script_count = len(folder_analysis.scripts)
+        comparisons = script_count * (script_count - 1) // 2
         total_similarity = 0.0
-        comparisons = 0
-        
-        for i, script1 in enumerate(scripts):
-            for script2 in scripts[i+1:]:
-                similarity = self.calculate_script_similarity(script1, script2)
-                total_similarity += similarity
-                comparisons += 1
+        for similarity in self.get_folder_similarities(folder_analysis).values():
+            total_similarity += similarity
         
         return total_similarity / comparisons if comparisons > 0 else 0.0
     
@@ -359,8 +421,8 @@ class ComprehensiveFolderAnalyzer:
     
     def calculate_name_similarity(self, name1: str, name2: str) -> float:
         """Calculate filename similarity"""
-        words1 = set(name1.replace('_', ' ').replace('-', ' ').split())
-        words2 = set(name2.replace('_', ' ').replace('-', ' ').split())
+        words1 = self.name_tokens(name1)
+        words2 = self.name_tokens(name2)
         
         if not words1 or not words2:
             return 0.0
@@ -370,16 +432,18 @@ class ComprehensiveFolderAnalyzer:
         
         return intersection / union if union > 0 else 0.0
     
+    def name_tokens(self, name: str) -> Set[str]:
+        """Words of a filename split on underscores, dashes and spaces"""
+        return set(name.replace('_', ' ').replace('-', ' ').split())
+    
     def find_within_folder_consolidation(self, folder_analysis: FolderAnalysis) -> List[str]:
         """Find consolidation opportunities within a folder"""
         opportunities = []
         scripts = folder_analysis.scripts
         
-        for i, script1 in enumerate(scripts):
-            for script2 in scripts[i+1:]:
-                similarity = self.calculate_script_similarity(script1, script2)
-                if similarity > 0.7:  # High similarity threshold
-                    opportunities.append(f"{script1.file_name} + {script2.file_name} (similarity: {similarity:.2f})")
+        for (i, j), similarity in self.get_folder_similarities(folder_analysis).items():
+            if similarity > WITHIN_FOLDER_SIMILARITY_THRESHOLD:
+                opportunities.append(f"{scripts[i].file_name} + {scripts[j].file_name} (similarity: {similarity:.2f})")
         
         return opportunities
     
@@ -405,16 +469,18 @@ class ComprehensiveFolderAnalyzer:
     
     def find_cross_folder_redundancy(self):
         """Find redundancy across different folders"""
-        for i, script1 in enumerate(self.all_scripts):
-            for script2 in self.all_scripts[i+1:]:
-                if script1.folder_path != script2.folder_path:
-                    similarity = self.calculate_script_similarity(script1, script2)
-                    if similarity > 0.8:  # Very high similarity threshold for cross-folder
-                        self.redundancy_map[script1.file_name].append({
-                            "script": script2,
-                            "similarity": similarity,
-                            "reason": f"Similar {script1.purpose} functionality"
-                        })
+        matrix = self.build_feature_matrix()
+        rows = [self.script_rows[script.file_path] for script in self.all_scripts]
+        folders = [script.folder_path for script in self.all_scripts]
+        
+        similarities = matrix.pairwise_similarities(rows, CROSS_FOLDER_SIMILARITY_THRESHOLD, groups=folders)
+        for (i, j), similarity in similarities.items():
+            script1, script2 = self.all_scripts[i], self.all_scripts[j]
+            self.redundancy_map[script1.file_name].append({
+                "script": script2,
+                "similarity": similarity,
+                "reason": f"Similar {script1.purpose} functionality"
+            })
     
     def identify_consolidation_opportunities(self):
         """Identify consolidation opportunities"""
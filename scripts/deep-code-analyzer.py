@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Deep Code Analyzer
@@ -7,19 +6,38 @@ Deep analysis of script code to identify true redundancy and consolidation oppor
 """
 
 import os
+import sys
 import json
 import ast
 import re
+import time
+import hashlib
+import argparse
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Any
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.analysis_cache import AnalysisCache
+from utilities.minhash_lsh import MinHasher, LSHIndex
+from utilities.line_metrics import is_large_file, line_metrics_from_text, stream_line_metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bump whenever analyze_script output changes so cached analyses are not reused
+ANALYZER_VERSION = "3"
+
+# Similarity thresholds used by the exact checks (and to tune LSH candidate generation)
+FUNCTION_SIMILARITY_THRESHOLD = 0.7
+SCRIPT_REDUNDANCY_THRESHOLD = 0.6
+
 @dataclass
 class FunctionInfo:
     """Information about a function"""
@@ -53,41 +71,118 @@ class ScriptAnalysis:
     dependencies: List[str]
 
 class DeepCodeAnalyzer:
+    def __init__(self, scripts_dir: str = "scripts", cache_file: str = "deep-code-analysis-cache.sqlite",
+                 use_cache: bool = True, use_lsh: bool = True):
+        self.scripts_dir = scripts_dir
+        self.driver = ParallelAnalysisDriver()
+        self.cache = AnalysisCache(cache_file, ANALYZER_VERSION) if use_cache else None
+        self.use_lsh = use_lsh
+        self.minhasher = MinHasher(num_perm=128)
         self.script_analyses = {}
         self.function_registry = defaultdict(list)  # function_name -> list of FunctionInfo
         self.similarity_matrix = {}
+        self.script_features = {}  # file_path -> (analysis, feature sets) used by the redundancy checks
         self.consolidation_groups = []
-        
+
+    def __getstate__(self) -> Dict:
+        """Pickled state for worker processes, without the cache connection or the pool driver"""
+        state = self.__dict__.copy()
+        state['cache'] = None
+        state['driver'] = None
+        return state
+
     def analyze_all_scripts(self) -> Dict[str, ScriptAnalysis]:
         """Perform deep analysis of all scripts"""
         logger.info("Starting deep code analysis...")
         
+        script_files = []
         for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
+            dirs.sort()
+            for file in sorted(files):
                 if file.endswith(('.py', '.sh', '.js')) and not file.startswith('consolidated_'):
-                    file_path = os.path.join(root, file)
-                    analysis = self.analyze_script(file_path)
-                    if analysis:
-                        self.script_analyses[file_path] = analysis
-                        self.register_functions(analysis)
+                    script_files.append(os.path.join(root, file))
+        
+        analyses = {}
+        pending = []
+        
+        # Reuse cached analyses for unchanged content
+        for file_path in script_files:
+            content_key = self.get_content_key(file_path) if self.cache else None
+            found, payload = self.cache.lookup(content_key) if content_key else (False, None)
+            if found:
+                analyses[file_path] = self.analysis_from_dict(payload, file_path) if payload else None
+            else:
+                pending.append((file_path, content_key))
+        
+        # Parse only new or changed files, in worker processes
+        parsed = self.driver.map(self.analyze_script_timed, [file_path for file_path, _ in pending])
+        for (file_path, content_key), result in zip(pending, parsed):
+            if result is None:
+                continue
+            analysis, elapsed = result
+            analyses[file_path] = analysis
+            if content_key:
+                self.cache.put(content_key, asdict(analysis) if analysis else None, elapsed)
+        
+        # Registration stays in this process, in discovery order
+        for file_path in script_files:
+            analysis = analyses.get(file_path)
+            if analysis:
+                self.script_analyses[file_path] = analysis
+                self.register_functions(analysis)
         
         logger.info(f"Analyzed {len(self.script_analyses)} scripts")
+        if self.cache:
+            self.cache.commit()
+            stats = self.cache.stats()
+            logger.info(f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses "
+                        f"({stats['hit_rate']:.0%} hit rate, ~{stats['time_saved_seconds']}s saved)")
         return self.script_analyses
     
+    def get_content_key(self, file_path: str) -> str:
+        """Cache key for a script: its name (purpose and type depend on it) plus its content"""
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
+        
+        digest = hashlib.sha256(os.path.basename(file_path).encode() + b'\0')
+        digest.update(content)
+        return digest.hexdigest()
+    
+    def analyze_script_timed(self, file_path: str) -> Tuple[ScriptAnalysis, float]:
+        """Analyze a script and report how long it took"""
+        start_time = time.perf_counter()
+        analysis = self.analyze_script(file_path)
+        return analysis, time.perf_counter() - start_time
+    
+    def analysis_from_dict(self, data: Dict, file_path: str) -> ScriptAnalysis:
+        """Rebuild a cached ScriptAnalysis for the given path"""
+        functions = [FunctionInfo(**dict(func, file_path=file_path)) for func in data['functions']]
+        return ScriptAnalysis(**dict(data, file_path=file_path, functions=functions))
+    
     def analyze_script(self, file_path: str) -> ScriptAnalysis:
         """Analyze a single script file"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
             file_name = os.path.basename(file_path)
             file_type = file_path.split('.')[-1].lower()
+            if file_type not in ('py', 'sh', 'js'):
+                return None
+            
+            # Very large files (bundles, generated code) only get streaming line metrics
+            if is_large_file(os.path.getsize(file_path)):
+                return self.analyze_large_script(file_path, file_name, file_type)
+            
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
             
             # Basic file info
-            lines = content.split('\n')
-            total_lines = len(lines)
-            code_lines = len([line for line in lines if line.strip() and not line.strip().startswith('#')])
-            comment_lines = len([line for line in lines if line.strip().startswith('#')])
+            metrics = line_metrics_from_text(content)
+            total_lines = metrics.total_lines
+            code_lines = metrics.code_lines
+            comment_lines = metrics.comment_lines
             
             # Analyze based on file type
             if file_type == 'py':
@@ -103,6 +198,29 @@ class DeepCodeAnalyzer:
             logger.error(f"Error analyzing {file_path}: {e}")
             return None
     
+    def analyze_large_script(self, file_path: str, file_name: str, file_type: str) -> ScriptAnalysis:
+        """Metrics-only analysis of a file too large for full parsing"""
+        metrics = stream_line_metrics(file_path, file_type)
+        if metrics is None:
+            return None
+        
+        logger.info(f"📏 {file_name} is {metrics.size_bytes} bytes, recording line metrics only")
+        return ScriptAnalysis(
+            file_path=file_path,
+            file_name=file_name,
+            file_type=file_type,
+            functions=[],
+            variables=[],
+            imports=metrics.imports,
+            classes=[],
+            total_lines=metrics.total_lines,
+            code_lines=metrics.code_lines,
+            comment_lines=metrics.comment_lines,
+            complexity_score=0,
+            purpose=self.determine_script_purpose(metrics.preview, file_name),
+            dependencies=metrics.imports
+        )
+    
     def analyze_python_script(self, file_path: str, content: str, file_name: str, 
                             total_lines: int, code_lines: int, comment_lines: int) -> ScriptAnalysis:
         """Analyze Python script"""
@@ -169,7 +287,7 @@ class DeepCodeAnalyzer:
         func_pattern = r'^([a-zA-Z_][a-zA-Z0-9_]*)\s*\(\s*\)\s*\{'
         for match in re.finditer(func_pattern, content, re.MULTILINE):
             func_name = match.group(1)
-            func_info = self.extract_bash_function(func_name, file_path, content)
+            func_info = self.extract_bash_function(func_name, file_path, content, match.start())
             functions.append(func_info)
         
         # Extract variables
@@ -224,7 +342,7 @@ class DeepCodeAnalyzer:
         for pattern in func_patterns:
             for match in re.finditer(pattern, content):
                 func_name = match.group(1)
-                func_info = self.extract_javascript_function(func_name, file_path, content)
+                func_info = self.extract_javascript_function(func_name, file_path, content, match.start())
                 functions.append(func_info)
         
         # Extract variables
@@ -321,11 +439,11 @@ class DeepCodeAnalyzer:
             end_line=end_line
         )
     
-    def extract_bash_function(self, func_name: str, file_path: str, content: str) -> FunctionInfo:
-        """Extract information from Bash function"""
+    def extract_bash_function(self, func_name: str, file_path: str, content: str, position: int = None) -> FunctionInfo:
+        """Extract information from Bash function (the definition starting at ``position`` if given)"""
         # Find function definition
-        func_pattern = rf'^{func_name}\s*\(\s*\)\s*\{{(.*?)^\}}'
-        match = re.search(func_pattern, content, re.MULTILINE | re.DOTALL)
+        func_pattern = re.compile(rf'^{func_name}\s*\(\s*\)\s*\{{(.*?)^\}}', re.MULTILINE | re.DOTALL)
+        match = func_pattern.search(content) if position is None else func_pattern.match(content, position)
         
         if not match:
             return FunctionInfo(
@@ -344,6 +462,9 @@ class DeepCodeAnalyzer:
         
         func_body = match.group(1)
         lines = func_body.split('\n')
+        # 0-based like Python functions, so removals can tell same-named definitions apart
+        start_line = content.count('\n', 0, match.start())
+        end_line = content.count('\n', 0, match.end())
         
         # Extract function calls
         calls = re.findall(r'(\w+)\s*\(', func_body)
@@ -364,12 +485,12 @@ class DeepCodeAnalyzer:
             variables=variables,
             docstring="",
             file_path=file_path,
-            start_line=0,
-            end_line=0
+            start_line=start_line,
+            end_line=end_line
         )
     
-    def extract_javascript_function(self, func_name: str, file_path: str, content: str) -> FunctionInfo:
-        """Extract information from JavaScript function"""
+    def extract_javascript_function(self, func_name: str, file_path: str, content: str, position: int = None) -> FunctionInfo:
+        """Extract information from JavaScript function (the definition starting at ``position`` if given)"""
         # Find function definition
         func_patterns = [
             rf'function\s+{func_name}\s*\([^)]*\)\s*\{{(.*?)^\}}',
@@ -380,7 +501,8 @@ class DeepCodeAnalyzer:
         
         func_body = ""
         for pattern in func_patterns:
-            match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
+            func_pattern = re.compile(pattern, re.MULTILINE | re.DOTALL)
+            match = func_pattern.search(content) if position is None else func_pattern.match(content, position)
             if match:
                 func_body = match.group(1)
                 break
@@ -401,6 +523,8 @@ class DeepCodeAnalyzer:
             )
         
         lines = func_body.split('\n')
+        start_line = content.count('\n', 0, match.start())
+        end_line = content.count('\n', 0, match.end())
         
         # Extract function calls
         calls = re.findall(r'(\w+)\s*\(', func_body)
@@ -421,8 +545,8 @@ class DeepCodeAnalyzer:
             variables=variables,
             docstring="",
             file_path=file_path,
-            start_line=0,
-            end_line=0
+            start_line=start_line,
+            end_line=end_line
         )
     
     def calculate_python_complexity(self, tree: ast.AST) -> int:
@@ -538,22 +662,53 @@ class DeepCodeAnalyzer:
     def find_duplicate_functions(self) -> Dict[str, List[FunctionInfo]]:
         """Find functions that appear in multiple scripts"""
         duplicates = {}
+        similar_names = self.find_similar_function_names() if self.use_lsh else None
         
         for func_name, func_list in self.function_registry.items():
             if len(func_list) > 1:
                 # Check if functions are similar
-                similar_functions = []
-                for i, func1 in enumerate(func_list):
-                    for func2 in func_list[i+1:]:
-                        if self.are_functions_similar(func1, func2):
-                            if func_name not in similar_functions:
-                                similar_functions.append(func_name)
+                if similar_names is not None:
+                    has_similar_pair = func_name in similar_names
+                else:
+                    has_similar_pair = any(self.are_functions_similar(func1, func2)
+                                           for i, func1 in enumerate(func_list)
+                                           for func2 in func_list[i+1:])
                 
-                if similar_functions:
+                if has_similar_pair:
                     duplicates[func_name] = func_list
         
         return duplicates
     
+    def find_similar_function_names(self) -> Set[str]:
+        """Find names with at least one similar pair, checking only LSH candidate pairs exactly"""
+        functions = []
+        index = LSHIndex(FUNCTION_SIMILARITY_THRESHOLD, self.minhasher.num_perm)
+        
+        for func_name, func_list in self.function_registry.items():
+            if len(func_list) < 2:
+                continue
+            
+            for func in func_list:
+                # Similar functions always share their name and parameter set, so those key the buckets
+                bucket_key = (func_name, frozenset(func.parameters))
+                calls = set(func.calls)
+                if calls:
+                    index.insert(len(functions), self.minhasher.signature(calls), bucket_key)
+                else:
+                    # Empty call sets are only similar to each other
+                    index.add_to_bucket(len(functions), bucket_key)
+                functions.append(func)
+        
+        similar_names = set()
+        for i, j in sorted(index.candidate_pairs()):
+            if functions[i].name in similar_names:
+                continue
+            if self.are_functions_similar(functions[i], functions[j]):
+                similar_names.add(functions[i].name)
+        
+        logger.info(f"Checked {len(functions)} functions for duplicates via {index.bands}x{index.rows} LSH banding")
+        return similar_names
+    
     def are_functions_similar(self, func1: FunctionInfo, func2: FunctionInfo) -> bool:
         """Check if two functions are similar"""
         # Check parameter similarity
@@ -573,24 +728,34 @@ class DeepCodeAnalyzer:
         calls2 = set(func2.calls)
         call_similarity = len(calls1 & calls2) / len(calls1 | calls2) if (calls1 | calls2) else 1
         
-        return call_similarity > 0.7
+        return call_similarity > FUNCTION_SIMILARITY_THRESHOLD
     
     def find_redundant_scripts(self) -> List[List[str]]:
         """Find scripts that have significant overlap"""
         redundant_groups = []
         processed_scripts = set()
+        script_paths = list(self.script_analyses)
+        candidates = self.find_redundancy_candidates(script_paths) if self.use_lsh else None
         
-        for script1_path, analysis1 in self.script_analyses.items():
+        for position, script1_path in enumerate(script_paths):
             if script1_path in processed_scripts:
                 continue
             
+            analysis1 = self.script_analyses[script1_path]
             redundant_group = [script1_path]
             processed_scripts.add(script1_path)
             
-            for script2_path, analysis2 in self.script_analyses.items():
+            if candidates is not None:
+                script2_paths = [script_paths[other] for other in candidates[position]]
+            else:
+                script2_paths = script_paths
+            
+            for script2_path in script2_paths:
                 if script2_path in processed_scripts:
                     continue
                 
+                analysis2 = self.script_analyses[script2_path]
+                
                 if self.are_scripts_redundant(analysis1, analysis2):
                     redundant_group.append(script2_path)
                     processed_scripts.add(script2_path)
@@ -600,39 +765,69 @@ class DeepCodeAnalyzer:
         
         return redundant_groups
     
+    def find_redundancy_candidates(self, script_paths: List[str]) -> Dict[int, List[int]]:
+        """Map each script position to the (sorted) positions of scripts it may be redundant with"""
+        # similarity = 0.4*f + 0.2*v + 0.2*i + 0.2*p with p <= 1, so exceeding the threshold needs
+        # 0.4*f + 0.2*v + 0.2*i > threshold - 0.2, i.e. one of f, v, i above (threshold - 0.2) / 0.8.
+        # Banding functions, variables and imports separately at that level keeps every redundant pair.
+        component_threshold = (SCRIPT_REDUNDANCY_THRESHOLD - 0.2) / 0.8
+        index = LSHIndex(component_threshold, self.minhasher.num_perm)
+        
+        for position, script_path in enumerate(script_paths):
+            func_names, variables, imports, _ = self.get_script_features(self.script_analyses[script_path])
+            if not func_names:
+                continue  # Scripts without functions are never redundant
+            
+            for component, tokens in (('functions', func_names), ('variables', variables), ('imports', imports)):
+                if tokens:
+                    index.insert(position, self.minhasher.signature(tokens), component)
+        
+        candidates = defaultdict(list)
+        for i, j in index.candidate_pairs():
+            candidates[i].append(j)
+            candidates[j].append(i)
+        
+        for neighbours in candidates.values():
+            neighbours.sort()
+        
+        return candidates
+    
+    def get_script_features(self, analysis: ScriptAnalysis) -> Tuple[frozenset, frozenset, frozenset, frozenset]:
+        """Function names, variables, imports and purpose words of a script, built once per analysis"""
+        cached = self.script_features.get(analysis.file_path)
+        if cached is None or cached[0] is not analysis:
+            features = (frozenset(func.name for func in analysis.functions),
+                        frozenset(analysis.variables),
+                        frozenset(analysis.imports),
+                        frozenset(analysis.purpose.lower().split()))
+            cached = (analysis, features)
+            self.script_features[analysis.file_path] = cached
+        return cached[1]
+    
     def are_scripts_redundant(self, analysis1: ScriptAnalysis, analysis2: ScriptAnalysis) -> bool:
         """Check if two scripts are redundant"""
-        # Check function overlap
-        funcs1 = {func.name for func in analysis1.functions}
-        funcs2 = {func.name for func in analysis2.functions}
+        funcs1, vars1, imports1, purpose1_words = self.get_script_features(analysis1)
+        funcs2, vars2, imports2, purpose2_words = self.get_script_features(analysis2)
         
+        # Check function overlap
         if not funcs1 or not funcs2:
             return False
         
         func_overlap = len(funcs1 & funcs2) / len(funcs1 | funcs2)
         
         # Check variable overlap
-        vars1 = set(analysis1.variables)
-        vars2 = set(analysis2.variables)
-        
         if vars1 and vars2:
             var_overlap = len(vars1 & vars2) / len(vars1 | vars2)
         else:
             var_overlap = 0
         
         # Check import overlap
-        imports1 = set(analysis1.imports)
-        imports2 = set(analysis2.imports)
-        
         if imports1 and imports2:
             import_overlap = len(imports1 & imports2) / len(imports1 | imports2)
         else:
             import_overlap = 0
         
         # Check purpose similarity
-        purpose1_words = set(analysis1.purpose.lower().split())
-        purpose2_words = set(analysis2.purpose.lower().split())
-        
         if purpose1_words and purpose2_words:
             purpose_overlap = len(purpose1_words & purpose2_words) / len(purpose1_words | purpose2_words)
         else:
@@ -641,7 +836,7 @@ class DeepCodeAnalyzer:
         # Calculate overall similarity
         similarity = (func_overlap * 0.4 + var_overlap * 0.2 + import_overlap * 0.2 + purpose_overlap * 0.2)
         
-        return similarity > 0.6
+        return similarity > SCRIPT_REDUNDANCY_THRESHOLD
     
     def generate_consolidation_recommendations(self) -> Dict:
         """Generate consolidation recommendations based on deep analysis"""
@@ -732,6 +927,7 @@ class DeepCodeAnalyzer:
         analysis_data = {
             "timestamp": datetime.now().isoformat(),
             "total_scripts": len(self.script_analyses),
+            "cache_stats": self.cache.stats() if self.cache else None,
             "script_analyses": {
                 path: {
                     "file_name": analysis.file_name,
@@ -781,6 +977,8 @@ class DeepCodeAnalyzer:
                     {
                         "name": func.name,
                         "file_path": func.file_path,
+                        "start_line": func.start_line,
+                        "end_line": func.end_line,
                         "parameters": func.parameters,
                         "lines": func.lines,
                         "complexity": func.complexity,
@@ -799,16 +997,30 @@ class DeepCodeAnalyzer:
         
         logger.info(f"Recommendations saved to {output_file}")
 
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Deep Code Analyzer")
+    parser.add_argument('--no-cache', action='store_true', help='Re-parse every script instead of using the analysis cache')
+    parser.add_argument('--cache-file', default='deep-code-analysis-cache.sqlite', help='Analysis cache database')
+    parser.add_argument('--exact-similarity', action='store_true',
+                        help='Compare every pair exactly instead of using MinHash/LSH candidate generation')
+    args = parser.parse_args()
+    
     print("🔍 Deep Code Analyzer")
     print("=" * 30)
     
-    analyzer = DeepCodeAnalyzer()
+    analyzer = DeepCodeAnalyzer(cache_file=args.cache_file, use_cache=not args.no_cache,
+                                use_lsh=not args.exact_similarity)
     
     # Analyze all scripts
     print("📊 Analyzing scripts...")
     analyses = analyzer.analyze_all_scripts()
     
     print(f"✅ Analyzed {len(analyses)} scripts")
+    if analyzer.cache:
+        stats = analyzer.cache.stats()
+        print(f"⚡ Cache: {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate, ~{stats['time_saved_seconds']}s saved)")
     
     # Find duplicates and redundancies
     print("🔍 Finding duplicates and redundancies...")
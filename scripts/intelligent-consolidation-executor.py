@@ -6,6 +6,7 @@ Execute intelligent consolidation based on deep code analysis
 """
 
 import os
+import sys
 import json
 import shutil
 from datetime import datetime
@@ -13,6 +14,11 @@ from typing import Dict, List, Set, Tuple
 import logging
 import re
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.source_edit_plan import FileEditPlan
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -73,6 +79,8 @@ class IntelligentConsolidationExecutor:
         logger.info("Consolidating duplicate functions...")
         
         duplicate_functions = self.recommendations.get("duplicate_functions", {})
+        edit_plans = {}  # file_path -> FileEditPlan
+        kept_functions = []  # (func_name, file_path) in recommendation order
         
         for func_name, func_list in duplicate_functions.items():
             if len(func_list) <= 1:
@@ -84,11 +92,11 @@ class IntelligentConsolidationExecutor:
             
             logger.info(f"Consolidating function '{func_name}' - keeping {best_func['file_path']}")
             
-            # Create a shared utility file for common functions
-            self.create_shared_utility_file(func_name, best_func, other_funcs)
-            
-            # Remove duplicate functions from other files
-            self.remove_duplicate_functions(func_name, other_funcs)
+            # Queue the extraction and removals; each affected file is parsed and written once below
+            self.get_edit_plan(edit_plans, best_func['file_path']).extract(func_name, best_func.get('start_line'))
+            for func_info in other_funcs:
+                self.get_edit_plan(edit_plans, func_info['file_path']).remove(func_name, func_info.get('start_line'))
+            kept_functions.append((func_name, best_func['file_path']))
             
             self.consolidation_log.append({
                 "type": "function_consolidation",
@@ -97,6 +105,32 @@ class IntelligentConsolidationExecutor:
                 "removed_from": [f['file_path'] for f in other_funcs],
                 "savings": sum(f['lines'] for f in other_funcs)
             })
+        
+        extracted = self.apply_edit_plans(edit_plans)
+        
+        # Create a shared utility file for common functions
+        if kept_functions:
+            self.create_shared_utility_file([
+                (func_name, extracted.get((file_path, func_name), f"# Function {func_name} extraction failed"))
+                for func_name, file_path in kept_functions
+            ])
+    
+    def get_edit_plan(self, edit_plans: Dict[str, FileEditPlan], file_path: str) -> FileEditPlan:
+        """Return the edit plan for a file, creating it on first use"""
+        if file_path not in edit_plans:
+            edit_plans[file_path] = FileEditPlan(file_path)
+        return edit_plans[file_path]
+    
+    def apply_edit_plans(self, edit_plans: Dict[str, FileEditPlan]) -> Dict[Tuple[str, str], str]:
+        """Apply every file's extractions and removals in one pass per file"""
+        extracted = {}
+        for file_path, plan in edit_plans.items():
+            try:
+                for func_name, func_content in plan.apply().items():
+                    extracted[(file_path, func_name)] = func_content
+            except Exception as e:
+                logger.error(f"Error editing {file_path}: {e}")
+        return extracted
     
     def find_best_function_implementation(self, func_list: List[Dict]) -> Dict:
         """Find the best function implementation to keep"""
@@ -112,7 +146,7 @@ class IntelligentConsolidationExecutor:
         
         return best_func
     
-    def create_shared_utility_file(self, func_name: str, best_func: Dict, other_funcs: List[Dict]):
+    def create_shared_utility_file(self, functions: List[Tuple[str, str]]):
         """Create a shared utility file for common functions"""
         # Determine if we need to create a new utility file or add to existing
         utility_file = "scripts/utilities/shared_functions.py"
@@ -124,8 +158,8 @@ class IntelligentConsolidationExecutor:
         if not os.path.exists(utility_file):
             self.create_initial_utility_file(utility_file)
         
-        # Add function to utility file
-        self.add_function_to_utility(utility_file, func_name, best_func)
+        # Add functions to utility file
+        self.add_functions_to_utility(utility_file, functions)
     
     def create_initial_utility_file(self, utility_file: str):
         """Create initial utility file"""
@@ -151,107 +185,48 @@ logger = logging.getLogger(__name__)
         with open(utility_file, 'w') as f:
             f.write(content)
     
-    def add_function_to_utility(self, utility_file: str, func_name: str, func_info: Dict):
-        """Add function to utility file"""
+    def add_functions_to_utility(self, utility_file: str, functions: List[Tuple[str, str]]):
+        """Add extracted functions to the utility file with a single write"""
         # Read current content
         with open(utility_file, 'r') as f:
             content = f.read()
         
-        # Check if function already exists
-        if f"def {func_name}(" in content:
-            return
-        
-        # Extract function from original file
-        func_content = self.extract_function_content(func_info)
-        
-        # Add function to utility file
-        new_content = content + f"\n\n{func_content}\n"
+        new_content = content
+        for func_name, func_content in functions:
+            # Check if function already exists
+            if f"def {func_name}(" in new_content:
+                continue
+            
+            new_content += f"\n\n{func_content}\n"
         
-        with open(utility_file, 'w') as f:
-            f.write(new_content)
+        if new_content != content:
+            with open(utility_file, 'w') as f:
+                f.write(new_content)
     
     def extract_function_content(self, func_info: Dict) -> str:
         """Extract function content from original file"""
         try:
-            with open(func_info['file_path'], 'r') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            
-            # Find function definition
-            for i, line in enumerate(lines):
-                if f"def {func_info['name']}(" in line or f"function {func_info['name']}(" in line:
-                    # Extract function
-                    func_lines = []
-                    brace_count = 0
-                    in_function = False
-                    
-                    for j in range(i, len(lines)):
-                        current_line = lines[j]
-                        func_lines.append(current_line)
-                        
-                        # Count braces for function boundaries
-                        if '{' in current_line:
-                            brace_count += current_line.count('{')
-                            in_function = True
-                        if '}' in current_line:
-                            brace_count -= current_line.count('}')
-                        
-                        # Check if function ends
-                        if in_function and brace_count == 0 and j > i:
-                            break
-                    
-                    return '\n'.join(func_lines)
-            
-            return f"# Function {func_info['name']} could not be extracted"
+            plan = FileEditPlan(func_info['file_path'])
+            plan.extract(func_info['name'], func_info.get('start_line'))
+            return plan.apply(write=False)[func_info['name']]
             
         except Exception as e:
             logger.error(f"Error extracting function content: {e}")
             return f"# Function {func_info['name']} extraction failed"
     
     def remove_duplicate_functions(self, func_name: str, func_list: List[Dict]):
-        """Remove duplicate functions from files"""
+        """Remove duplicate functions from files, editing each file once"""
+        edit_plans = {}
         for func_info in func_list:
-            self.remove_function_from_file(func_info['file_path'], func_name)
+            self.get_edit_plan(edit_plans, func_info['file_path']).remove(func_name, func_info.get('start_line'))
+        self.apply_edit_plans(edit_plans)
     
     def remove_function_from_file(self, file_path: str, func_name: str):
         """Remove function from a specific file"""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            lines = content.split('\n')
-            new_lines = []
-            skip_function = False
-            brace_count = 0
-            
-            for i, line in enumerate(lines):
-                # Check if this line starts the function we want to remove
-                if (f"def {func_name}(" in line or f"function {func_name}(" in line or 
-                    f"{func_name}()" in line and "{" in line):
-                    skip_function = True
-                    brace_count = 0
-                    continue
-                
-                if skip_function:
-                    # Count braces to know when function ends
-                    if '{' in line:
-                        brace_count += line.count('{')
-                    if '}' in line:
-                        brace_count -= line.count('}')
-                    
-                    # If we've closed all braces, stop skipping
-                    if brace_count <= 0:
-                        skip_function = False
-                    continue
-                
-                new_lines.append(line)
-            
-            # Write back the modified content
-            with open(file_path, 'w') as f:
-                f.write('\n'.join(new_lines))
-            
-            logger.info(f"Removed function '{func_name}' from {file_path}")
+            plan = FileEditPlan(file_path)
+            plan.remove(func_name)
+            plan.apply()
             
         except Exception as e:
             logger.error(f"Error removing function from {file_path}: {e}")
@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Intelligent Script Purge System
@@ -7,6 +6,7 @@ Intelligent purging of unnecessary and bloated scripts while preserving function
 """
 
 import os
+import sys
 import json
 import shutil
 from datetime import datetime
@@ -14,11 +14,23 @@ from typing import Dict, List, Set, Tuple
 import logging
 import re
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.repository_scanner import RepositoryScanner
+from utilities.content_hash_index import ContentHashIndex
+from utilities.minhash_lsh import jaccard
+from utilities.near_duplicate_clustering import NearDuplicateClusterer, shingle
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class IntelligentScriptPurge:
+    def __init__(self, scripts_dir: str = "scripts"):
+        self.scripts_dir = scripts_dir
+        self.scanner = RepositoryScanner(scripts_dir, extensions=('.sh', '.py', '.js'))
+        self.hash_index = ContentHashIndex()
         self.purge_plan = {
             "scripts_to_purge": [],
             "scripts_to_keep": [],
@@ -26,7 +38,8 @@ class IntelligentScriptPurge:
             "bloated_scripts": [],
             "duplicate_scripts": [],
             "obsolete_scripts": [],
-            "minimal_scripts": []
+            "minimal_scripts": [],
+            "backup_matches": []
         }
         self.safety_checks = {
             "essential_functions": set(),
@@ -35,6 +48,7 @@ class IntelligentScriptPurge:
             "database_operations": set(),
             "critical_workflows": set()
         }
+        self.register_safety_probes()
         
     def analyze_scripts_for_purging(self) -> Dict:
         """Analyze all scripts to identify candidates for purging"""
@@ -71,31 +85,29 @@ class IntelligentScriptPurge:
         """Identify bloated scripts with excessive code"""
         logger.info("Identifying bloated scripts...")
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    # Skip consolidated scripts
-                    if file.startswith('consolidated_'):
-                        continue
-                    
-                    # Analyze script for bloat
-                    bloat_score = self.calculate_bloat_score(file_path)
-                    
-                    if bloat_score > 0.7:  # High bloat score
-                        self.purge_plan["bloated_scripts"].append({
-                            "file": file,
-                            "path": file_path,
-                            "bloat_score": bloat_score,
-                            "reason": "High bloat score - excessive code"
-                        })
+        for file, file_path in self.iter_candidate_scripts():
+            # Analyze script for bloat
+            bloat_score = self.calculate_bloat_score(file_path)
+            
+            if bloat_score > 0.7:  # High bloat score
+                self.purge_plan["bloated_scripts"].append({
+                    "file": file,
+                    "path": file_path,
+                    "bloat_score": bloat_score,
+                    "reason": "High bloat score - excessive code"
+                })
+    
+    def iter_candidate_scripts(self, scanner: RepositoryScanner = None):
+        """Yield (file name, path) for every non-consolidated script from the shared scanner"""
+        for file_path in (scanner or self.scanner).file_paths():
+            file = os.path.basename(file_path)
+            if not file.startswith('consolidated_'):
+                yield file, file_path
     
     def calculate_bloat_score(self, file_path: str) -> float:
         """Calculate bloat score for a script"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self.scanner.read_text(file_path)
             
             lines = content.split('\n')
             total_lines = len(lines)
@@ -199,36 +211,25 @@ class IntelligentScriptPurge:
         """Identify duplicate scripts"""
         logger.info("Identifying duplicate scripts...")
         
-        script_hashes = {}
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')) and not file.startswith('consolidated_'):
-                    file_path = os.path.join(root, file)
-                    
-                    # Calculate file hash
-                    file_hash = self.calculate_file_hash(file_path)
-                    
-                    if file_hash in script_hashes:
-                        # Duplicate found
-                        self.purge_plan["duplicate_scripts"].append({
-                            "file": file,
-                            "path": file_path,
-                            "duplicate_of": script_hashes[file_hash],
-                            "reason": "Exact duplicate"
-                        })
-                    else:
-                        script_hashes[file_hash] = file_path
+        script_paths = [file_path for file, file_path in self.iter_candidate_scripts()]
+        
+        # Only same-size files are hashed, and hashes persist across runs in the shared index
+        for group in self.hash_index.duplicate_groups(script_paths):
+            original = group[0]
+            for file_path in group[1:]:
+                self.purge_plan["duplicate_scripts"].append({
+                    "file": os.path.basename(file_path),
+                    "path": file_path,
+                    "duplicate_of": original,
+                    "reason": "Exact duplicate"
+                })
+        
+        self.hash_index.commit()
     
     def calculate_file_hash(self, file_path: str) -> str:
         """Calculate hash for file content"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Normalize content (remove whitespace differences)
-            normalized = re.sub(r'\s+', ' ', content.strip())
-            return str(hash(normalized))
+            return self.hash_index.full_hash(file_path) or ""
             
         except Exception as e:
             logger.error(f"Error calculating hash for {file_path}: {e}")
@@ -243,44 +244,36 @@ class IntelligentScriptPurge:
             'debug', 'experimental', 'unused', 'broken', 'fix_'
         ]
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')) and not file.startswith('consolidated_'):
-                    file_path = os.path.join(root, file)
-                    file_lower = file.lower()
-                    
-                    # Check for obsolete indicators
-                    for indicator in obsolete_indicators:
-                        if indicator in file_lower:
-                            self.purge_plan["obsolete_scripts"].append({
-                                "file": file,
-                                "path": file_path,
-                                "reason": f"Contains obsolete indicator: {indicator}"
-                            })
-                            break
+        for file, file_path in self.iter_candidate_scripts():
+            file_lower = file.lower()
+            
+            # Check for obsolete indicators
+            for indicator in obsolete_indicators:
+                if indicator in file_lower:
+                    self.purge_plan["obsolete_scripts"].append({
+                        "file": file,
+                        "path": file_path,
+                        "reason": f"Contains obsolete indicator: {indicator}"
+                    })
+                    break
     
     def identify_minimal_scripts(self):
         """Identify scripts with minimal functionality"""
         logger.info("Identifying minimal scripts...")
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')) and not file.startswith('consolidated_'):
-                    file_path = os.path.join(root, file)
-                    
-                    # Check if script is minimal
-                    if self.is_minimal_script(file_path):
-                        self.purge_plan["minimal_scripts"].append({
-                            "file": file,
-                            "path": file_path,
-                            "reason": "Minimal functionality - can be consolidated"
-                        })
+        for file, file_path in self.iter_candidate_scripts():
+            # Check if script is minimal
+            if self.is_minimal_script(file_path):
+                self.purge_plan["minimal_scripts"].append({
+                    "file": file,
+                    "path": file_path,
+                    "reason": "Minimal functionality - can be consolidated"
+                })
     
     def is_minimal_script(self, file_path: str) -> bool:
         """Check if script has minimal functionality"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self.scanner.read_text(file_path)
             
             lines = content.split('\n')
             non_empty_lines = [line for line in lines if line.strip() and not line.strip().startswith('#')]
@@ -325,63 +318,56 @@ class IntelligentScriptPurge:
                 self.purge_plan["scripts_to_consolidate"].extend(consolidate_scripts)
     
     def group_similar_scripts(self) -> List[List[str]]:
-        """Group similar scripts together"""
-        script_groups = []
-        processed_scripts = set()
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')) and not file.startswith('consolidated_'):
-                    file_path = os.path.join(root, file)
-                    
-                    if file_path in processed_scripts:
-                        continue
-                    
-                    # Find similar scripts
-                    similar_scripts = [file_path]
-                    processed_scripts.add(file_path)
-                    
-                    for other_root, other_dirs, other_files in os.walk(self.scripts_dir):
-                        for other_file in other_files:
-                            if other_file.endswith(('.sh', '.py', '.js')) and not other_file.startswith('consolidated_'):
-                                other_path = os.path.join(other_root, other_file)
-                                
-                                if other_path in processed_scripts:
-                                    continue
-                                
-                                if self.are_scripts_similar(file_path, other_path):
-                                    similar_scripts.append(other_path)
-                                    processed_scripts.add(other_path)
-                    
-                    if len(similar_scripts) > 1:
-                        script_groups.append(similar_scripts)
-        
-        return script_groups
+        """Group similar live scripts together, reporting their backup copies separately"""
+        clusterer = NearDuplicateClusterer(threshold=0.7)
+        backup_trees = self.find_backup_trees()
+        scanners = [self.scanner] + [RepositoryScanner(tree, extensions=('.sh', '.py', '.js'))
+                                     for tree in backup_trees]
+        
+        # Tokenize every script once; candidate pairs come from MinHash/LSH instead of a nested walk
+        for scanner in scanners:
+            for file, file_path in self.iter_candidate_scripts(scanner):
+                try:
+                    clusterer.add(file_path, scanner.read_text(file_path))
+                except OSError as e:
+                    logger.error(f"Error reading {file_path}: {e}")
+        
+        def is_backup(file_path: str) -> bool:
+            return any(os.path.commonpath([file_path, tree]) == tree for tree in backup_trees)
+        
+        # Backup copies never take part in keep/consolidate decisions, and never link two live scripts
+        self.purge_plan["backup_matches"] = []
+        for group in clusterer.clusters():
+            live_scripts = [file_path for file_path in group if not is_backup(file_path)]
+            backup_copies = [file_path for file_path in group if is_backup(file_path)]
+            if live_scripts and backup_copies:
+                self.purge_plan["backup_matches"].append({
+                    "scripts": live_scripts,
+                    "backup_copies": backup_copies
+                })
+        
+        return clusterer.subset(lambda file_path: not is_backup(file_path)).clusters()
+    
+    def find_backup_trees(self) -> List[str]:
+        """Find ``*_backup_*`` copies of the scripts tree next to it"""
+        parent_dir = os.path.dirname(os.path.normpath(self.scripts_dir))
+        backup_trees = []
+        for name in sorted(os.listdir(parent_dir or '.')):
+            path = os.path.join(parent_dir, name)
+            if '_backup_' in name and os.path.isdir(path):
+                backup_trees.append(path)
+        return backup_trees
     
     def are_scripts_similar(self, script1: str, script2: str) -> bool:
         """Check if two scripts are similar"""
         try:
-            with open(script1, 'r', encoding='utf-8', errors='ignore') as f:
-                content1 = f.read()
+            words1 = shingle(self.scanner.read_text(script1))
+            words2 = shingle(self.scanner.read_text(script2))
             
-            with open(script2, 'r', encoding='utf-8', errors='ignore') as f:
-                content2 = f.read()
-            
-            # Normalize content
-            content1_norm = re.sub(r'\s+', ' ', content1.strip().lower())
-            content2_norm = re.sub(r'\s+', ' ', content2.strip().lower())
-            
-            # Calculate similarity
-            if len(content1_norm) == 0 or len(content2_norm) == 0:
+            if not words1 or not words2:
                 return False
             
-            # Simple similarity check
-            common_words = set(content1_norm.split()) & set(content2_norm.split())
-            total_words = set(content1_norm.split()) | set(content2_norm.split())
-            
-            similarity = len(common_words) / len(total_words) if total_words else 0
-            
-            return similarity > 0.7  # 70% similarity threshold
+            return jaccard(words1, words2) > 0.7  # 70% similarity threshold
             
         except Exception as e:
             logger.error(f"Error checking similarity between {script1} and {script2}: {e}")
@@ -391,6 +377,9 @@ class IntelligentScriptPurge:
         """Perform safety checks to ensure essential functionality is preserved"""
         logger.info("Performing safety checks...")
         
+        # Read every script once and evaluate all safety probes in that pass
+        self.scanner.scan()
+        
         # Find essential functions
         self.find_essential_functions()
         
@@ -406,119 +395,53 @@ class IntelligentScriptPurge:
         # Find critical workflows
         self.find_critical_workflows()
     
-    def find_essential_functions(self):
-        """Find essential functions that must be preserved"""
-        essential_patterns = [
+    def register_safety_probes(self):
+        """Register all safety-check patterns with the shared scanner"""
+        self.scanner.register_probe("essential_functions", [
             r'main\s*\(', r'init\s*\(', r'setup\s*\(',
             r'deploy\w*', r'install\w*', r'configure\w*',
             r'start\w*', r'stop\w*', r'restart\w*'
-        ]
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        for pattern in essential_patterns:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                self.safety_checks["essential_functions"].add(file_path)
-                                break
-                    except Exception as e:
-                        logger.error(f"Error checking essential functions in {file_path}: {e}")
+        ])
+        self.scanner.register_probe("api_endpoints", [
+            r'curl\s+', r'http[s]?://', r'api/v1/', r'endpoint',
+            r'requests\.', r'fetch\s*\(', r'axios\.'
+        ])
+        self.scanner.register_probe("database_operations", [
+            r'supabase', r'postgres', r'mysql', r'sqlite',
+            r'CREATE\s+TABLE', r'INSERT\s+INTO', r'SELECT\s+',
+            r'UPDATE\s+', r'DELETE\s+FROM'
+        ])
+        self.scanner.register_probe("critical_workflows", [
+            r'n8n', r'workflow', r'pipeline', r'ci/cd',
+            r'deployment', r'production', r'milestone'
+        ])
+        self.scanner.register_extractor("script_references", [
+            r'\./([a-zA-Z0-9_-]+\.(?:sh|py|js))'
+        ])
+    
+    def find_essential_functions(self):
+        """Find essential functions that must be preserved"""
+        self.safety_checks["essential_functions"].update(self.scanner.probe_hits("essential_functions"))
     
     def find_referenced_scripts(self):
         """Find scripts that are referenced by other scripts"""
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        # Look for script references
-                        script_refs = re.findall(r'\./([a-zA-Z0-9_-]+\.(?:sh|py|js))', content)
-                        for ref in script_refs:
-                            ref_path = os.path.join(self.scripts_dir, ref)
-                            if os.path.exists(ref_path):
-                                self.safety_checks["referenced_scripts"].add(ref_path)
-                    except Exception as e:
-                        logger.error(f"Error checking references in {file_path}: {e}")
+        for file_path, script_refs in self.scanner.extractions("script_references").items():
+            for ref in script_refs:
+                ref_path = os.path.join(self.scripts_dir, ref)
+                if os.path.exists(ref_path):
+                    self.safety_checks["referenced_scripts"].add(ref_path)
     
     def find_api_endpoints(self):
         """Find scripts that contain API endpoints"""
-        api_patterns = [
-            r'curl\s+', r'http[s]?://', r'api/v1/', r'endpoint',
-            r'requests\.', r'fetch\s*\(', r'axios\.'
-        ]
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        for pattern in api_patterns:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                self.safety_checks["api_endpoints"].add(file_path)
-                                break
-                    except Exception as e:
-                        logger.error(f"Error checking API endpoints in {file_path}: {e}")
+        self.safety_checks["api_endpoints"].update(self.scanner.probe_hits("api_endpoints"))
     
     def find_database_operations(self):
         """Find scripts that contain database operations"""
-        db_patterns = [
-            r'supabase', r'postgres', r'mysql', r'sqlite',
-            r'CREATE\s+TABLE', r'INSERT\s+INTO', r'SELECT\s+',
-            r'UPDATE\s+', r'DELETE\s+FROM'
-        ]
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        for pattern in db_patterns:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                self.safety_checks["database_operations"].add(file_path)
-                                break
-                    except Exception as e:
-                        logger.error(f"Error checking database operations in {file_path}: {e}")
+        self.safety_checks["database_operations"].update(self.scanner.probe_hits("database_operations"))
     
     def find_critical_workflows(self):
         """Find scripts that are part of critical workflows"""
-        critical_patterns = [
-            r'n8n', r'workflow', r'pipeline', r'ci/cd',
-            r'deployment', r'production', r'milestone'
-        ]
-        
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                        
-                        for pattern in critical_patterns:
-                            if re.search(pattern, content, re.IGNORECASE):
-                                self.safety_checks["critical_workflows"].add(file_path)
-                                break
-                    except Exception as e:
-                        logger.error(f"Error checking critical workflows in {file_path}: {e}")
+        self.safety_checks["critical_workflows"].update(self.scanner.probe_hits("critical_workflows"))
     
     def generate_purging_recommendations(self):
         """Generate final purging recommendations"""
@@ -575,9 +498,11 @@ class IntelligentScriptPurge:
                 
                 if os.path.exists(script_path):
                     os.remove(script_path)
+                    self.hash_index.forget(script_path)
                     purged_count += 1
                     logger.info(f"Purged: {script_path}")
             
+            self.hash_index.commit()
             logger.info(f"Purged {purged_count} scripts")
             return True
             
@@ -585,6 +510,8 @@ class IntelligentScriptPurge:
             logger.error(f"Error executing purge: {e}")
             return False
     
+    def create_backup(self):
+        """Create backup before purging"""
         backup_dir = f"scripts_purge_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         shutil.copytree(self.scripts_dir, backup_dir)
         logger.info(f"Created backup: {backup_dir}")
@@ -625,6 +552,8 @@ class IntelligentScriptPurge:
         
         return "\n".join(report)
 
+def main():
+    """Main function"""
     print("🧹 Intelligent Script Purge System")
     print("=" * 40)
     
@@ -679,11 +608,3 @@ class IntelligentScriptPurge:
 
 if __name__ == "__main__":
     main()
-
-
-
-
-
-
-
-
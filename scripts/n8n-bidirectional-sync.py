@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 N8N Bi-Directional Sync System
@@ -11,11 +10,24 @@ import os
 import sys
 import json
 import time
-import requests
-import hashlib
+import glob
+import argparse
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
+from dataclasses import asdict
+
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.n8n_client import N8NClient, N8NAPIError, WorkflowSummary, DEFAULT_FETCH_WORKERS
+from utilities.n8n_workflow_diff import WorkflowDiff, diff_workflows, structural_hash
+from utilities.sync_history_store import SyncHistoryStore, DEFAULT_HISTORY_DB, DEFAULT_RETENTION_DAYS
+from utilities.debounced_queue import DebouncedQueue
+from utilities.n8n_change_feed import ChangeFeedServer, CHANGE_FEED_PATH, DEFAULT_CHANGE_FEED_PORT
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.n8n_workflow_lint import lint_workflow
 
 # Configure logging
 logging.basicConfig(
@@ -28,84 +40,121 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Change events for one workflow within this many seconds are synced once
+DEFAULT_DEBOUNCE = 1.0
+# Fallback polling while the change feed is running (seconds)
+DEFAULT_RECONCILE_INTERVAL = 3600
+# Workflows synced and analyzed concurrently (mostly file I/O)
+DEFAULT_PROCESS_WORKERS = 4
+# Consolidated analysis files kept per kind (sync runs, change feed days)
+DEFAULT_ANALYSIS_RUNS_KEPT = 30
+ANALYSIS_FILE_PATTERNS = ('sync-run-*.jsonl', 'change-feed-*.jsonl')
+SLOWEST_WORKFLOWS_REPORTED = 10
+
 class N8NBidirectionalSync:
+    def __init__(self, fetch_workers: int = DEFAULT_FETCH_WORKERS, history_db: str = DEFAULT_HISTORY_DB,
+                 retention_days: int = DEFAULT_RETENTION_DAYS, process_workers: int = DEFAULT_PROCESS_WORKERS,
+                 analysis_runs_kept: int = DEFAULT_ANALYSIS_RUNS_KEPT):
+        self.n8n_url = os.getenv('N8N_URL', 'https://n8n.pbradygeorgen.com')
         self.n8n_api_key = os.getenv('N8N_API_KEY')
         self.workflows_dir = 'workflows'
         self.analysis_dir = 'analysis'
-        self.sync_log_file = 'n8n-sync-history.json'
+        self.sync_log_file = 'n8n-sync-history.json'  # Legacy format, imported into the store once
+        self.retention_days = retention_days
+        self.analysis_runs_kept = analysis_runs_kept
+        self.driver = ParallelAnalysisDriver(max_workers=process_workers, use_threads=True)
+        self._file_locks: Dict[str, threading.Lock] = {}
+        self._file_locks_guard = threading.Lock()
+        self.client = N8NClient(self.n8n_url, self.n8n_api_key, max_workers=fetch_workers)
+        self.workflow_changes: Dict[str, WorkflowDiff] = {}  # workflow id -> diff of the last write
         
         # Ensure directories exist
         os.makedirs(self.workflows_dir, exist_ok=True)
         os.makedirs(self.analysis_dir, exist_ok=True)
         
         # Load sync history
+        self.history_store = SyncHistoryStore(history_db)
+        self.history_store.import_legacy_history(self.sync_log_file)
         self.sync_history = self.load_sync_history()
         
     def load_sync_history(self) -> Dict:
-        """Load sync history from file"""
-        if os.path.exists(self.sync_log_file):
-            try:
-                with open(self.sync_log_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Failed to load sync history: {e}")
+        """Load the per-workflow summary from the history store (operations stay on disk)"""
+        state = self.history_store.workflow_state()
         return {
-            'last_sync': None,
-            'workflow_hashes': {},
-            'sync_operations': [],
-            'conflicts': []
+            'last_sync': self.history_store.get_meta('last_sync'),
+            'workflow_hashes': {wid: entry['hash'] for wid, entry in state.items() if entry['hash']},
+            'workflow_updated_at': {wid: entry['updated_at'] for wid, entry in state.items() if entry['updated_at']}
         }
     
     def save_sync_history(self):
-        """Save sync history to file"""
+        """Commit sync history (operations and workflow state are written as they happen)"""
         try:
-            with open(self.sync_log_file, 'w') as f:
-                json.dump(self.sync_history, f, indent=2)
+            self.history_store.set_meta('last_sync', self.sync_history['last_sync'])
+            self.history_store.commit()
         except Exception as e:
             logger.error(f"Failed to save sync history: {e}")
     
+    def log_sync_operation(self, operation: Dict):
+        """Append one operation to the sync history"""
+        try:
+            self.history_store.append_operation(operation)
+        except Exception as e:
+            logger.error(f"Failed to record sync operation: {e}")
+    
     def get_workflow_hash(self, workflow_data: Dict) -> str:
         """Generate hash for workflow data"""
-        # Create a stable hash based on workflow structure
-        workflow_str = json.dumps(workflow_data, sort_keys=True)
-        return hashlib.sha256(workflow_str.encode()).hexdigest()[:16]
+        # Structural hash: updatedAt, versionId, node positions etc. do not count as changes
+        return structural_hash(workflow_data)
+    
+    def local_workflow_file(self, workflow: Dict) -> str:
+        """Path of a workflow's file in the workflows directory"""
+        safe_name = workflow.get('name', 'unnamed').replace(' ', '_').replace('/', '_')
+        return os.path.join(self.workflows_dir, f"{safe_name}.json")
+    
+    def file_lock(self, file_path: str) -> threading.Lock:
+        """Lock serializing workers that write the same file (workflows sharing a name)"""
+        with self._file_locks_guard:
+            return self._file_locks.setdefault(file_path, threading.Lock())
+    
+    def load_local_workflow(self, local_file: str) -> Optional[Dict]:
+        """Previously synced version of a workflow, if there is a readable one"""
+        try:
+            with open(local_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
     
     def fetch_n8n_workflows(self) -> List[Dict]:
         """Fetch all workflows from N8N production"""
         try:
-            headers = {
-                'X-N8N-API-KEY': self.n8n_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
-                f"{self.n8n_url}/api/v1/workflows",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                workflows = data.get('data', [])
-                logger.info(f"Fetched {len(workflows)} workflows from N8N")
-                return workflows
-            else:
-                logger.error(f"Failed to fetch workflows: {response.status_code}")
-                return []
-                
-        except Exception as e:
+            _, workflows, _ = self.client.fetch_changed_workflows({})
+            logger.info(f"Fetched {len(workflows)} workflows from N8N")
+            return workflows
+        except N8NAPIError as e:
             logger.error(f"Error fetching N8N workflows: {e}")
             return []
     
+    def fetch_changed_n8n_workflows(self) -> Optional[Tuple[List[WorkflowSummary], List[Dict], List[WorkflowSummary]]]:
+        """List all workflows and fetch full bodies only for those updated since the last sync
+        (plus the changed workflows that could not be downloaded)"""
+        try:
+            return self.client.fetch_changed_workflows(self.sync_history['workflow_updated_at'])
+        except N8NAPIError as e:
+            logger.error(f"Error fetching N8N workflows: {e}")
+            return None
+    
     def sync_workflow_from_n8n(self, workflow: Dict) -> bool:
-        """Sync a single workflow from N8N to local development"""
+        """Sync a single workflow from N8N to local development.
+        
+        The local file is only rewritten when the workflow changed structurally;
+        the semantic diff of that write is kept in ``workflow_changes``.
+        """
+        workflow_name = workflow.get('name', 'unnamed')
         try:
-            workflow_name = workflow.get('name', 'unnamed')
             workflow_id = workflow.get('id')
             
             # Create safe filename
-            safe_name = workflow_name.replace(' ', '_').replace('/', '_')
-            local_file = os.path.join(self.workflows_dir, f"{safe_name}.json")
+            local_file = self.local_workflow_file(workflow)
             
             # Generate hash for change detection
             workflow_hash = self.get_workflow_hash(workflow)
@@ -114,8 +163,17 @@ class N8NBidirectionalSync:
             if workflow_id in self.sync_history['workflow_hashes']:
                 if self.sync_history['workflow_hashes'][workflow_id] == workflow_hash:
                     logger.debug(f"No changes detected for workflow: {workflow_name}")
+                    self.record_workflow_state(workflow)
                     return True
             
+            # Compare with the previously synced version; volatile-only edits are not written
+            previous = self.load_local_workflow(local_file)
+            changes = diff_workflows(previous, workflow)
+            if previous is not None and not changes.has_changes:
+                logger.debug(f"Only volatile fields changed for workflow: {workflow_name}")
+                self.record_workflow_state(workflow, workflow_hash)
+                return True
+            
             # Create backup if file exists
             if os.path.exists(local_file):
                 backup_file = f"{local_file}.backup.{int(time.time())}"
@@ -127,76 +185,62 @@ class N8NBidirectionalSync:
                 json.dump(workflow, f, indent=2)
             
             # Update sync history
-            self.sync_history['workflow_hashes'][workflow_id] = workflow_hash
+            self.record_workflow_state(workflow, workflow_hash)
             
             # Log sync operation
             sync_operation = {
                 'timestamp': datetime.now().isoformat(),
                 'operation': 'n8n_to_dev',
+                'status': 'synced',
                 'workflow_name': workflow_name,
                 'workflow_id': workflow_id,
                 'file_path': local_file,
-                'hash': workflow_hash
+                'hash': workflow_hash,
+                'changes': changes.summary()
             }
-            self.sync_history['sync_operations'].append(sync_operation)
+            self.log_sync_operation(sync_operation)
+            self.workflow_changes[workflow_id] = changes
             
-            logger.info(f"Synced workflow from N8N: {workflow_name}")
+            logger.info(f"Synced workflow from N8N: {workflow_name} ({changes.summary()})")
             return True
             
         except Exception as e:
             logger.error(f"Failed to sync workflow {workflow_name}: {e}")
+            self.log_sync_operation({
+                'timestamp': datetime.now().isoformat(),
+                'operation': 'n8n_to_dev',
+                'status': 'failed',
+                'workflow_name': workflow_name,
+                'workflow_id': workflow.get('id'),
+                'error': str(e)
+            })
             return False
     
-    def analyze_workflow_changes(self, workflow: Dict) -> Dict:
+    def record_workflow_state(self, workflow: Dict, workflow_hash: str = None):
+        """Remember a synced workflow's hash and updatedAt so the next sync can skip fetching it"""
+        workflow_id = workflow.get('id')
+        if workflow_hash is not None:
+            self.sync_history['workflow_hashes'][workflow_id] = workflow_hash
+        self.sync_history['workflow_updated_at'][workflow_id] = workflow.get('updatedAt')
+        self.history_store.set_workflow_state(workflow_id, workflow_hash, workflow.get('updatedAt'))
+    
+    def analyze_workflow_changes(self, workflow: Dict, changes: Optional[WorkflowDiff] = None) -> Dict:
         """Analyze workflow for changes and potential issues"""
+        workflow_name = workflow.get('name', 'unnamed')
         try:
-            workflow_name = workflow.get('name', 'unnamed')
-            nodes = workflow.get('nodes', [])
-            connections = workflow.get('connections', {})
+            lint = lint_workflow(workflow)
             
             analysis = {
                 'workflow_name': workflow_name,
                 'analysis_timestamp': datetime.now().isoformat(),
                 'change_source': 'n8n_production',
-                'metrics': {
-                    'node_count': len(nodes),
-                    'connection_count': len(connections),
-                    'webhook_count': len([n for n in nodes if n.get('type') == 'n8n-nodes-base.webhook']),
-                    'function_count': len([n for n in nodes if n.get('type') == 'n8n-nodes-base.function']),
-                    'http_request_count': len([n for n in nodes if n.get('type') == 'n8n-nodes-base.httpRequest'])
-                },
-                'issues': [],
-                'recommendations': []
+                'metrics': lint.metrics,
+                'changes': changes.to_dict() if changes else None,
+                'issues': [finding.message for finding in lint.findings],
+                'recommendations': [finding.recommendation for finding in lint.findings if finding.recommendation],
+                'findings': [asdict(finding) for finding in lint.findings]
             }
             
-            # Check for potential issues
-            webhook_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.webhook']
-            if not webhook_nodes:
-                analysis['issues'].append("No webhook triggers found")
-                analysis['recommendations'].append("Consider adding webhook triggers for external access")
-            
-            response_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.respondToWebhook']
-            if not response_nodes:
-                analysis['issues'].append("No response nodes found")
-                analysis['recommendations'].append("Add response nodes for proper webhook responses")
-            
-            function_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.function']
-            if function_nodes:
-                analysis['issues'].append("Contains custom functions - review code")
-                analysis['recommendations'].append("Review custom function code for security and functionality")
-            
-            http_nodes = [n for n in nodes if n.get('type') == 'n8n-nodes-base.httpRequest']
-            if http_nodes:
-                analysis['issues'].append("Contains HTTP requests - verify endpoints")
-                analysis['recommendations'].append("Verify all HTTP endpoints are accessible and secure")
-            
-            # Check for duplicate node names
-            node_names = [n.get('name', '') for n in nodes]
-            duplicates = [name for name in set(node_names) if node_names.count(name) > 1]
-            if duplicates:
-                analysis['issues'].append(f"Duplicate node names: {duplicates}")
-                analysis['recommendations'].append("Rename duplicate nodes to avoid conflicts")
-            
             # Add general recommendations
             analysis['recommendations'].extend([
                 "Review changes for security implications",
@@ -211,87 +255,162 @@ class N8NBidirectionalSync:
             logger.error(f"Failed to analyze workflow {workflow_name}: {e}")
             return {'error': str(e)}
     
-    def save_analysis(self, analysis: Dict):
-        """Save workflow analysis to file"""
+    def save_analyses(self, analyses: List[Dict], analysis_file: str) -> int:
+        """Append workflow analyses to a consolidated JSONL file; returns the number written"""
+        if not analyses:
+            return 0
         try:
-            workflow_name = analysis.get('workflow_name', 'unnamed')
-            safe_name = workflow_name.replace(' ', '_').replace('/', '_')
-            analysis_file = os.path.join(
-                self.analysis_dir, 
-                f"{safe_name}-analysis-{int(time.time())}.json"
-            )
+            with open(analysis_file, 'a') as f:
+                for analysis in analyses:
+                    f.write(json.dumps(analysis) + '\n')
             
-            with open(analysis_file, 'w') as f:
-                json.dump(analysis, f, indent=2)
-            
-            logger.info(f"Analysis saved: {analysis_file}")
+            logger.info(f"Analysis saved: {analysis_file} ({len(analyses)} workflows)")
+            return len(analyses)
             
         except Exception as e:
             logger.error(f"Failed to save analysis: {e}")
+            return 0
+    
+    def prune_analysis_files(self) -> int:
+        """Delete consolidated analysis files beyond the newest ``analysis_runs_kept`` of each kind"""
+        removed = 0
+        for pattern in ANALYSIS_FILE_PATTERNS:
+            # Names end in a sortable timestamp or date
+            files = sorted(glob.glob(os.path.join(self.analysis_dir, pattern)))
+            for old_file in files[:max(0, len(files) - self.analysis_runs_kept)]:
+                try:
+                    os.remove(old_file)
+                    removed += 1
+                except OSError as e:
+                    logger.error(f"Failed to remove old analysis {old_file}: {e}")
+        return removed
     
-    def sync_from_n8n_to_dev(self) -> Dict:
-        """Sync all workflows from N8N production to development"""
+    def process_workflow(self, workflow: Dict) -> Dict:
+        """Sync one workflow and analyze it if it changed; returns its report entry.
+        
+        The entry carries the analysis (``analysis_record``) for the caller to
+        save with the rest of its batch, and the time the workflow took.
+        """
+        workflow_name = workflow.get('name', 'unnamed')
+        workflow_id = workflow.get('id')
+        start_time = time.perf_counter()
+        
+        try:
+            with self.file_lock(self.local_workflow_file(workflow)):
+                result = self._process_workflow(workflow, workflow_name, workflow_id)
+        except Exception as e:
+            logger.error(f"Error processing workflow {workflow_name}: {e}")
+            result = {'name': workflow_name, 'id': workflow_id, 'status': 'error', 'error': str(e)}
+        
+        result['duration'] = round(time.perf_counter() - start_time, 4)
+        return result
+    
+    def _process_workflow(self, workflow: Dict, workflow_name: str, workflow_id: str) -> Dict:
+        """Sync and analyze one workflow (the caller holds its file lock)"""
+        # Sync workflow
+        self.workflow_changes.pop(workflow_id, None)
+        if not self.sync_workflow_from_n8n(workflow):
+            return {'name': workflow_name, 'id': workflow_id, 'status': 'failed'}
+        
+        changes = self.workflow_changes.get(workflow_id)
+        if changes is None:
+            return {'name': workflow_name, 'id': workflow_id, 'status': 'unchanged'}
+        
+        # Analyze workflow
+        analysis = self.analyze_workflow_changes(workflow, changes)
+        
+        return {
+            'name': workflow_name,
+            'id': workflow_id,
+            'status': 'synced',
+            'changes': changes.summary(),
+            'analysis': analysis.get('issues', []),
+            'analysis_record': analysis if 'error' not in analysis else None
+        }
+    
+    def sync_workflow_by_id(self, workflow_id: str) -> Dict:
+        """Fetch and sync a single workflow, e.g. when the change feed reports an edit"""
+        try:
+            workflow = self.client.fetch_workflow(workflow_id)
+        except N8NAPIError as e:
+            logger.error(f"Error fetching workflow {workflow_id}: {e}")
+            return {'name': None, 'id': workflow_id, 'status': 'failed', 'error': str(e)}
+        
+        result = self.process_workflow(workflow)
+        analysis = result.pop('analysis_record', None)
+        if analysis:
+            # Change-feed analyses go to one file per day
+            analysis_file = os.path.join(self.analysis_dir, f"change-feed-{datetime.now().strftime('%Y%m%d')}.jsonl")
+            self.save_analyses([analysis], analysis_file)
+        self.save_sync_history()
+        return result
+    
+    def sync_from_n8n_to_dev(self, full: bool = False) -> Dict:
+        """Sync workflows from N8N production to development (only those updated since the last sync unless full)"""
         logger.info("🔄 Starting sync from N8N production to development...")
         
         # Fetch workflows from N8N
-        workflows = self.fetch_n8n_workflows()
+        if full:
+            self.sync_history['workflow_updated_at'] = {}
+        fetched = self.fetch_changed_n8n_workflows()
         
-        if not workflows:
+        if not fetched or not fetched[0]:
             logger.error("No workflows fetched from N8N")
             return {'success': False, 'error': 'No workflows fetched'}
         
+        summaries, workflows, fetch_failures = fetched
+        
         sync_results = {
             'success': True,
             'timestamp': datetime.now().isoformat(),
-            'total_workflows': len(workflows),
+            'total_workflows': len(summaries),
+            'unchanged_workflows': len(summaries) - len(workflows) - len(fetch_failures),
             'synced_workflows': 0,
-            'failed_workflows': 0,
+            'failed_workflows': len(fetch_failures),
             'analyses_created': 0,
-            'workflows': []
+            'api_requests': self.client.requests_made,
+            'workflows': [{'name': summary.name, 'id': summary.id, 'status': 'failed',
+                           'error': 'Download from N8N failed'} for summary in fetch_failures]
         }
         
-        for workflow in workflows:
-            workflow_name = workflow.get('name', 'unnamed')
-            workflow_id = workflow.get('id')
-            
-            try:
-                # Sync workflow
-                if self.sync_workflow_from_n8n(workflow):
-                    sync_results['synced_workflows'] += 1
-                    
-                    # Analyze workflow
-                    analysis = self.analyze_workflow_changes(workflow)
-                    if 'error' not in analysis:
-                        self.save_analysis(analysis)
-                        sync_results['analyses_created'] += 1
-                    
-                    sync_results['workflows'].append({
-                        'name': workflow_name,
-                        'id': workflow_id,
-                        'status': 'synced',
-                        'analysis': analysis.get('issues', [])
-                    })
-                else:
-                    sync_results['failed_workflows'] += 1
-                    sync_results['workflows'].append({
-                        'name': workflow_name,
-                        'id': workflow_id,
-                        'status': 'failed'
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error processing workflow {workflow_name}: {e}")
+        # Sync and analyze workflows concurrently; results come back in input order
+        start_time = time.perf_counter()
+        results = self.driver.map(self.process_workflow, workflows)
+        sync_results['processing_seconds'] = round(time.perf_counter() - start_time, 3)
+        
+        analyses = []
+        timings = []
+        for result in results:
+            analysis = result.pop('analysis_record', None)
+            if analysis:
+                analyses.append(analysis)
+            timings.append({key: result.get(key) for key in ('name', 'id', 'status', 'duration')})
+            if result['status'] == 'synced':
+                sync_results['synced_workflows'] += 1
+            elif result['status'] == 'unchanged':
+                # updatedAt moved but nothing structural changed
+                sync_results['unchanged_workflows'] += 1
+                continue
+            else:
                 sync_results['failed_workflows'] += 1
-                sync_results['workflows'].append({
-                    'name': workflow_name,
-                    'id': workflow_id,
-                    'status': 'error',
-                    'error': str(e)
-                })
+            sync_results['workflows'].append(result)
+        sync_results['workflow_timings'] = sorted(timings, key=lambda timing: timing['duration'], reverse=True)
+        
+        # One consolidated analysis file per run
+        if analyses:
+            analysis_file = os.path.join(self.analysis_dir, f"sync-run-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl")
+            sync_results['analyses_created'] = self.save_analyses(analyses, analysis_file)
+            sync_results['analysis_file'] = analysis_file
+        pruned = self.prune_analysis_files()
+        if pruned:
+            logger.info(f"Removed {pruned} old analysis files (keeping {self.analysis_runs_kept} per kind)")
         
         # Update sync history
         self.sync_history['last_sync'] = datetime.now().isoformat()
         self.save_sync_history()
+        removed = self.history_store.compact(self.retention_days)
+        if removed:
+            logger.info(f"Compacted sync history: removed {removed} operations older than {self.retention_days} days")
         
         logger.info(f"Sync completed: {sync_results['synced_workflows']} synced, {sync_results['failed_workflows']} failed")
         return sync_results
@@ -308,9 +427,11 @@ class N8NBidirectionalSync:
 ## Sync Summary
 
 - **Total Workflows**: {sync_results['total_workflows']}
+- **Unchanged Since Last Sync**: {sync_results.get('unchanged_workflows', 0)}
 - **Successfully Synced**: {sync_results['synced_workflows']}
 - **Failed**: {sync_results['failed_workflows']}
 - **Analyses Created**: {sync_results['analyses_created']}
+- **Processing Time**: {sync_results.get('processing_seconds', 0):.2f}s
 
 ## Workflow Details
 
@@ -318,8 +439,10 @@ class N8NBidirectionalSync:
         
         for workflow in sync_results['workflows']:
             status_icon = "✅" if workflow['status'] == 'synced' else "❌"
-            report += f"- {status_icon} **{workflow['name']}** ({workflow['id']})\n"
+            report += f"- {status_icon} **{workflow['name']}** ({workflow['id']}) - {workflow.get('duration', 0):.3f}s\n"
             
+            if workflow.get('changes'):
+                report += f"  - Changes: {workflow['changes']}\n"
             if workflow['status'] == 'synced' and 'analysis' in workflow:
                 if workflow['analysis']:
                     report += f"  - Issues: {', '.join(workflow['analysis'])}\n"
@@ -328,6 +451,12 @@ class N8NBidirectionalSync:
             elif workflow['status'] == 'failed':
                 report += f"  - Error: {workflow.get('error', 'Unknown error')}\n"
         
+        timings = sync_results.get('workflow_timings', [])[:SLOWEST_WORKFLOWS_REPORTED]
+        if timings:
+            report += "\n## Slowest Workflows\n\n"
+            for timing in timings:
+                report += f"- **{timing['name']}** ({timing['id']}): {timing['duration']:.3f}s ({timing['status']})\n"
+        
         report += f"""
 ## Recommendations
 
@@ -339,7 +468,7 @@ class N8NBidirectionalSync:
 
 ## Next Steps
 
-- [ ] Review individual workflow analyses in `{self.analysis_dir}/`
+- [ ] Review the workflow analyses in `{sync_results.get('analysis_file', self.analysis_dir + '/')}`
 - [ ] Test modified workflows in development
 - [ ] Deploy to production if approved
 - [ ] Monitor production performance
@@ -350,13 +479,13 @@ class N8NBidirectionalSync:
         
         return report
     
-    def run_sync(self) -> Dict:
+    def run_sync(self, full: bool = False) -> Dict:
         """Run the complete bi-directional sync process"""
         logger.info("🚀 Starting N8N Bi-Directional Sync...")
         
         try:
             # Sync from N8N to development
-            sync_results = self.sync_from_n8n_to_dev()
+            sync_results = self.sync_from_n8n_to_dev(full=full)
             
             # Generate report
             report = self.generate_sync_report(sync_results)
@@ -378,6 +507,60 @@ class N8NBidirectionalSync:
             logger.error(f"Sync failed: {e}")
             return {'success': False, 'error': str(e)}
 
+    def run_change_feed(self, host: str = '127.0.0.1', port: int = DEFAULT_CHANGE_FEED_PORT,
+                        debounce: float = DEFAULT_DEBOUNCE,
+                        reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL, token: str = None):
+        """Sync workflows as change events arrive, with low-frequency reconciliation polling as a fallback"""
+        sync_lock = threading.Lock()  # Event syncs and reconciliation never run at the same time
+        
+        def sync_changed_workflow(workflow_id: str):
+            with sync_lock:
+                result = self.sync_workflow_by_id(workflow_id)
+            logger.info(f"Change event for {workflow_id}: {result['status']}"
+                        f"{' (' + result['changes'] + ')' if result.get('changes') else ''}")
+        
+        queue = DebouncedQueue(sync_changed_workflow, delay=debounce)
+        server = ChangeFeedServer(host, port, queue.push, token=token, stats=queue.stats)
+        server.start()
+        
+        try:
+            while True:
+                # Catch up on anything the feed missed (also runs once at startup)
+                with sync_lock:
+                    self.sync_from_n8n_to_dev()
+                time.sleep(reconcile_interval)
+        except KeyboardInterrupt:
+            logger.info("Change feed stopped by user")
+        finally:
+            server.stop()
+            queue.stop()
+            self.save_sync_history()
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="N8N bi-directional sync")
+    parser.add_argument('--full', action='store_true',
+                        help="Fetch every workflow, not only those updated since the last sync")
+    parser.add_argument('--workers', type=int, default=DEFAULT_FETCH_WORKERS,
+                        help="Concurrent workflow downloads")
+    parser.add_argument('--history-db', default=DEFAULT_HISTORY_DB,
+                        help="Sync history database")
+    parser.add_argument('--retention-days', type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Days of sync operations to keep")
+    parser.add_argument('--process-workers', type=int, default=DEFAULT_PROCESS_WORKERS,
+                        help="Workflows synced and analyzed concurrently")
+    parser.add_argument('--analysis-runs-kept', type=int, default=DEFAULT_ANALYSIS_RUNS_KEPT,
+                        help="Consolidated analysis files to keep")
+    parser.add_argument('--listen', type=int, nargs='?', const=DEFAULT_CHANGE_FEED_PORT, metavar='PORT',
+                        help=f"Run the change feed receiver (POST {CHANGE_FEED_PATH}) instead of a one-off sync")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Change feed bind address")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="Seconds to coalesce change events for the same workflow")
+    parser.add_argument('--reconcile-interval', type=float, default=DEFAULT_RECONCILE_INTERVAL,
+                        help="Seconds between fallback polls while listening")
+    args = parser.parse_args()
+    
     print("🔄 N8N Bi-Directional Sync System")
     print("=" * 50)
     
@@ -387,10 +570,17 @@ class N8NBidirectionalSync:
         sys.exit(1)
     
     # Initialize sync system
-    sync_system = N8NBidirectionalSync()
+    sync_system = N8NBidirectionalSync(fetch_workers=args.workers, history_db=args.history_db,
+                                       retention_days=args.retention_days, process_workers=args.process_workers,
+                                       analysis_runs_kept=args.analysis_runs_kept)
+    
+    if args.listen is not None:
+        sync_system.run_change_feed(args.host, args.listen, args.debounce, args.reconcile_interval,
+                                    token=os.getenv('N8N_CHANGE_FEED_TOKEN'))
+        return
     
     # Run sync
-    result = sync_system.run_sync()
+    result = sync_system.run_sync(full=args.full)
     
     if result['success']:
         print("✅ Sync completed successfully!")
@@ -401,4 +591,3 @@ class N8NBidirectionalSync:
 
 if __name__ == "__main__":
     main()
-
@@ -11,6 +11,9 @@ WORKFLOWS_DIR="workflows"
 CHANGE_LOG="n8n-changes.log"
 ANALYSIS_DIR="analysis"
 BACKUP_DIR="backups"
+# Change feed receiver (n8n-bidirectional-sync.py --listen); while it runs, edits arrive as events
+CHANGE_FEED_URL="${N8N_CHANGE_FEED_URL:-http://127.0.0.1:5680}"
+FORCE_POLL="${FORCE_POLL:-0}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -40,6 +43,24 @@ log_error() {
     echo "$(date): ERROR: $1" >> "$CHANGE_LOG"
 }
 
+# Recent workflow analyses, newest first, as "name<TAB>timestamp<TAB>source" lines.
+# The sync appends analyses to sync-run-*.jsonl / change-feed-*.jsonl; older runs wrote one file per workflow.
+recent_analyses() {
+    local limit="$1"
+    local files=()
+    local analysis_file
+    for analysis_file in "$ANALYSIS_DIR"/sync-run-*.jsonl "$ANALYSIS_DIR"/change-feed-*.jsonl "$ANALYSIS_DIR"/*-analysis-*.json; do
+        if [ -f "$analysis_file" ]; then
+            files+=("$analysis_file")
+        fi
+    done
+    if [ ${#files[@]} -eq 0 ]; then
+        return 0
+    fi
+    jq -r '[.workflow_name // "unknown", .analysis_timestamp // "", .change_source // "unknown"] | @tsv' \
+        "${files[@]}" 2>/dev/null | sort -t $'\t' -k2,2r | head -n "$limit"
+}
+
 # Check prerequisites
 check_prerequisites() {
     if [ -z "$N8N_URL" ] || [ -z "$N8N_API_KEY" ]; then
@@ -81,6 +102,12 @@ test_n8n_connection() {
     log_success "N8N connection successful"
 }
 
+# Check whether the change feed receiver is running
+change_feed_active() {
+    local http_code=$(curl -s -o /dev/null -w "%{http_code}" --max-time 2 "$CHANGE_FEED_URL/health" 2>/dev/null)
+    [ "$http_code" = "200" ]
+}
+
 # Get current workflows from N8N
 get_n8n_workflows() {
     log_info "Fetching current workflows from N8N..."
@@ -344,14 +371,10 @@ generate_sync_report() {
 
 EOF
     
-    # List recent analysis files
-    for analysis_file in "$ANALYSIS_DIR"/*-analysis-*.json; do
-        if [ -f "$analysis_file" ]; then
-            local workflow_name=$(jq -r '.workflow_name' "$analysis_file")
-            local timestamp=$(jq -r '.analysis_timestamp' "$analysis_file")
-            echo "- **$workflow_name**: $timestamp" >> "$report_file"
-        fi
-    done
+    # List recent analyses
+    while IFS=$'\t' read -r workflow_name timestamp change_source; do
+        echo "- **$workflow_name**: $timestamp" >> "$report_file"
+    done < <(recent_analyses 50)
     
     cat >> "$report_file" << EOF
 
@@ -383,8 +406,14 @@ main() {
     
     # Run all steps
     check_prerequisites
-    test_n8n_connection
-    monitor_n8n_changes
+    
+    # The change feed syncs edits as they happen and reconciles on its own; polling is the fallback
+    if [ "$FORCE_POLL" != "1" ] && change_feed_active; then
+        log_info "Change feed receiver is running at $CHANGE_FEED_URL; skipping full workflow poll (FORCE_POLL=1 to poll anyway)"
+    else
+        test_n8n_connection
+        monitor_n8n_changes
+    fi
     generate_sync_report
     
     echo ""
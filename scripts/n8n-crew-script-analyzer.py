@@ -6,19 +6,36 @@ Activate N8N crew for deep script analysis and optimal folder restructuring
 """
 
 import os
+import sys
+import re
 import json
+import hashlib
+import argparse
 import requests
 import time
 from datetime import datetime
-from typing import Dict, List, Set, Tuple, Any
+from typing import Dict, List, Set, Tuple, Any, Optional
 import logging
 from dataclasses import dataclass
 from collections import defaultdict
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.analysis_cache import AnalysisCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Bump whenever the research prompt or the simulator heuristics change so cached crew results are not reused
+ANALYZER_VERSION = "1"
+
+# The research prompt only shows the head of each script
+PROMPT_CONTENT_CHARS = 1000
+PROMPT_HEADER_PATTERN = re.compile(r'^\s*(Script|Type): (.*)$', re.MULTILINE)
+
 @dataclass
 class ScriptAnalysis:
     """Script analysis result"""
@@ -46,10 +63,74 @@ class FolderStructure:
     subfolders: List['FolderStructure']
     consolidation_opportunities: List[str]
 
+class SimulatedCrewBackend:
+    """Local heuristic stand-in for the crew LLMs (no network calls)"""
+    name = "simulator"
+    io_bound = False
+    
+    def __init__(self, analyzer: 'N8NCrewScriptAnalyzer'):
+        self.analyzer = analyzer
+    
+    @property
+    def cache_tag(self) -> str:
+        return self.name
+    
+    def analyze(self, prompt: str, crew_config: Dict) -> Dict:
+        """Answer a research prompt with the analyzer's heuristics"""
+        return self.analyzer.simulate_crew_analysis(prompt, crew_config)
+
+class N8NCrewBackend:
+    """Send research prompts to the crew's N8N webhook and return the model's JSON answer.
+    
+    The workflow is expected to answer with the same keys the simulator
+    produces (primary_intent, secondary_intents, dependencies, ...), either
+    directly or under an "analysis" key, as an object or a JSON string.
+    """
+    name = "n8n"
+    io_bound = True
+    
+    def __init__(self, n8n_url: str, webhook_path: str = "crew-script-analysis", timeout: int = 120):
+        self.n8n_url = n8n_url.rstrip('/')
+        self.webhook_path = webhook_path
+        self.timeout = timeout
+    
+    @property
+    def cache_tag(self) -> str:
+        return f"{self.name}:{self.webhook_path}"
+    
+    def analyze(self, prompt: str, crew_config: Dict) -> Dict:
+        """Run a research prompt through the crew workflow"""
+        response = requests.post(
+            f"{self.n8n_url}/webhook/{self.webhook_path}",
+            json={
+                "crew": crew_config["name"],
+                "llm": crew_config["llm"],
+                "task": crew_config["task"],
+                "prompt": prompt
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        
+        result = response.json()
+        if isinstance(result, dict) and "analysis" in result:
+            result = result["analysis"]
+        if isinstance(result, str):
+            result = json.loads(result)
+        if not isinstance(result, dict):
+            raise ValueError(f"Unexpected crew response: {str(result)[:200]}")
+        return result
+
 class N8NCrewScriptAnalyzer:
-    def __init__(self, scripts_dir: str = "scripts", n8n_url: str = "https://n8n.pbradygeorgen.com"):
+    def __init__(self, scripts_dir: str = "scripts", n8n_url: str = "https://n8n.pbradygeorgen.com",
+                 backend=None, cache_file: str = "n8n-crew-analysis-cache.sqlite", use_cache: bool = True,
+                 max_workers: int = None):
         self.scripts_dir = scripts_dir
         self.n8n_url = n8n_url
+        self.backend = backend or SimulatedCrewBackend(self)
+        # Remote model calls wait on the network, so they fan out over threads
+        self.driver = ParallelAnalysisDriver(max_workers=max_workers, use_threads=self.backend.io_bound)
+        self.cache = None
         self.script_analyses = {}
         self.orphaned_scripts = []
         self.folder_analysis = {}
@@ -80,6 +161,19 @@ class N8NCrewScriptAnalyzer:
                 "task": "Identify obsolete and deprecated scripts"
             }
         }
+        
+        if use_cache:
+            # Results of different backends (and crew models) are kept apart
+            self.cache = AnalysisCache(cache_file, f"{ANALYZER_VERSION}:{self.backend.cache_tag}:"
+                                                   f"{self.crew_config['research_crew']['llm']}")
+
+    def __getstate__(self) -> Dict:
+        """Pickled state for worker processes (the simulated backend points back here), without the
+        cache connection or the pool driver"""
+        state = self.__dict__.copy()
+        state['cache'] = None
+        state['driver'] = None
+        return state
     
     def activate_n8n_crew_analysis(self) -> Dict:
         """Activate N8N crew for comprehensive script analysis"""
@@ -149,7 +243,7 @@ class N8NCrewScriptAnalyzer:
             relative_path = os.path.relpath(script_path, self.scripts_dir)
             
             # Check if script is in root of scripts directory
-            if os.path.dirname(relative_path) == '.':
+            if os.path.dirname(relative_path) in ('', '.'):
                 self.orphaned_scripts.append(script_path)
     
     def analyze_existing_folders(self):
@@ -179,26 +273,74 @@ class N8NCrewScriptAnalyzer:
         
         crew_config = self.crew_config["research_crew"]
         
+        # One prompt per script; scripts with identical prompts share a single crew analysis
+        prompts = {}
+        script_keys = []
         for script_path in self.orphaned_scripts:
-            try:
-                # Read script content
-                with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                # Create analysis prompt for research crew
-                analysis_prompt = self.create_research_prompt(script_path, content)
-                
-                # Simulate crew analysis (in real implementation, this would call N8N)
-                analysis_result = self.simulate_crew_analysis(analysis_prompt, crew_config)
-                
-                # Parse analysis result
-                script_analysis = self.parse_research_analysis(script_path, analysis_result)
-                self.script_analyses[script_path] = script_analysis
-                
-                logger.info(f"✅ Analyzed: {os.path.basename(script_path)}")
-                
-            except Exception as e:
-                logger.error(f"Error analyzing {script_path}: {e}")
+            prompt = self.build_research_prompt(script_path)
+            if prompt is None:
+                continue
+            content_key = hashlib.sha256(prompt.encode()).hexdigest()
+            prompts.setdefault(content_key, (script_path, prompt))
+            script_keys.append((script_path, content_key))
+        
+        # Reuse cached crew results and send only unseen prompts to the backend
+        results = {}
+        pending = []
+        for content_key in prompts:
+            found, payload = self.cache.lookup(content_key) if self.cache else (False, None)
+            if found:
+                results[content_key] = payload
+            else:
+                pending.append(content_key)
+        
+        logger.info(f"🧠 {len(prompts)} unique prompts for {len(script_keys)} scripts, "
+                    f"{len(pending)} sent to the {self.backend.name} backend")
+        completed = self.driver.starmap(self.run_crew_backend,
+                                        [prompts[content_key] + (crew_config,) for content_key in pending])
+        for content_key, result in zip(pending, completed):
+            if result is None:
+                continue
+            analysis_result, elapsed = result
+            results[content_key] = analysis_result
+            if self.cache:
+                self.cache.put(content_key, analysis_result, elapsed)
+        
+        if self.cache:
+            self.cache.commit()
+            stats = self.cache.stats()
+            logger.info(f"⚡ Crew cache: {stats['hits']} hits, {stats['misses']} misses "
+                        f"(~{stats['time_saved_seconds']}s saved)")
+        
+        for script_path, content_key in script_keys:
+            analysis_result = results.get(content_key)
+            if analysis_result is None:
+                continue
+            
+            # Candidates depend on the other scripts rather than on the prompt, so they are never cached
+            analysis_result = dict(analysis_result, consolidation_candidates=self.find_consolidation_candidates(
+                os.path.basename(script_path)))
+            self.script_analyses[script_path] = self.parse_research_analysis(script_path, analysis_result)
+            
+            logger.info(f"✅ Analyzed: {os.path.basename(script_path)}")
+    
+    def build_research_prompt(self, script_path: str) -> Optional[str]:
+        """Read the head of a script and build its research prompt"""
+        try:
+            with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read(PROMPT_CONTENT_CHARS)
+        except OSError as e:
+            logger.error(f"Error reading {script_path}: {e}")
+            return None
+        
+        return self.create_research_prompt(script_path, content)
+    
+    def run_crew_backend(self, script_path: str, prompt: str, crew_config: Dict) -> Tuple[Dict, float]:
+        """Run one prompt through the backend and report how long it took"""
+        start_time = time.perf_counter()
+        analysis_result = self.backend.analyze(prompt, crew_config)
+        analysis_result.pop("consolidation_candidates", None)
+        return analysis_result, time.perf_counter() - start_time
     
     def create_research_prompt(self, script_path: str, content: str) -> str:
         """Create research prompt for crew analysis"""
@@ -239,8 +381,11 @@ class N8NCrewScriptAnalyzer:
         # This is a simulation - in real implementation, this would call N8N API
         # For now, we'll use a local analysis approach
         
-        file_name = prompt.split('\n')[2].split(': ')[1]
-        file_type = prompt.split('\n')[3].split(': ')[1]
+        header = {}
+        for key, value in PROMPT_HEADER_PATTERN.findall(prompt):
+            header.setdefault(key, value)  # The content preview may repeat these labels
+        file_name = header.get('Script', '')
+        file_type = header.get('Type', '')
         
         # Basic analysis based on filename and content
         analysis = {
@@ -738,10 +883,21 @@ class N8NCrewScriptAnalyzer:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="N8N Crew Script Analyzer")
+    parser.add_argument('--backend', choices=['simulator', 'n8n'], default='simulator',
+                        help='Answer research prompts locally or through the N8N crew webhook')
+    parser.add_argument('--n8n-url', default='https://n8n.pbradygeorgen.com', help='N8N instance URL')
+    parser.add_argument('--workers', type=int, default=None, help='Concurrent crew analyses')
+    parser.add_argument('--no-cache', action='store_true', help='Re-run every prompt instead of using the crew cache')
+    parser.add_argument('--cache-file', default='n8n-crew-analysis-cache.sqlite', help='Crew analysis cache database')
+    args = parser.parse_args()
+    
     print("🚀 N8N Crew Script Analyzer")
     print("=" * 40)
     
-    analyzer = N8NCrewScriptAnalyzer()
+    backend = N8NCrewBackend(args.n8n_url) if args.backend == 'n8n' else None
+    analyzer = N8NCrewScriptAnalyzer(n8n_url=args.n8n_url, backend=backend, cache_file=args.cache_file,
+                                     use_cache=not args.no_cache, max_workers=args.workers)
     
     # Activate N8N crew analysis
     results = analyzer.activate_n8n_crew_analysis()
@@ -754,6 +910,10 @@ def main():
         print(f"  Folders Analyzed: {results['folders_analyzed']}")
         print(f"  Consolidation Opportunities: {results['consolidation_opportunities']}")
         print(f"  Deprecated Scripts: {results['deprecated_scripts']}")
+        if analyzer.cache:
+            stats = analyzer.cache.stats()
+            print(f"⚡ Cache: {stats['hits']} hits / {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} hit rate, ~{stats['time_saved_seconds']}s saved)")
         
         # Save results
         analyzer.save_analysis_results()
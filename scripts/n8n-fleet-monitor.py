@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+N8N Fleet Monitor
+=================
+Concurrent health monitoring of several N8N instances (prod, staging,
+per-client) with a combined dashboard.
+
+Every instance is polled by its own asyncio task on its own schedule, so a
+slow or unreachable instance never delays the others. Intervals adapt:
+each healthy check backs the interval off towards ``max_interval``, and an
+error drops it straight to ``min_interval`` until the instance recovers.
+Ticks are jittered so instances configured with the same interval do not
+probe in lockstep. Probe latency does not add to the interval, because
+the next tick is scheduled from the start of the previous one.
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.n8n_probe import N8NProber, MonitorCycle
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLEET_CONFIG = "n8n-fleet.json"
+DEFAULT_DASHBOARD_FILE = "n8n-fleet-dashboard.json"
+DEFAULT_DASHBOARD_INTERVAL = 15  # seconds between dashboard writes
+# Interval multiplier after a healthy check
+BACKOFF_FACTOR = 1.5
+# Ticks are spread by up to +/- this fraction of the interval
+JITTER = 0.1
+# Response time above which an instance counts as degraded (seconds)
+SLOW_RESPONSE_TIME = 5.0
+
+
+@dataclass
+class FleetTarget:
+    """One monitored N8N instance"""
+    name: str
+    url: str
+    api_key_env: str = 'N8N_API_KEY'  # Environment variable holding the instance's API key
+    interval: float = 60.0
+    min_interval: Optional[float] = None  # Defaults to a quarter of the interval
+    max_interval: Optional[float] = None  # Defaults to four times the interval
+    timeout: float = 10.0
+
+    def __post_init__(self):
+        self.min_interval = self.min_interval or max(1.0, self.interval / 4)
+        self.max_interval = self.max_interval or self.interval * 4
+
+
+@dataclass
+class TargetState:
+    """Latest results and polling schedule of one target"""
+    target: FleetTarget
+    prober: N8NProber
+    current_interval: float
+    checks: int = 0
+    consecutive_failures: int = 0
+    last_check: Optional[str] = None
+    status: Dict = field(default_factory=dict)
+
+
+def load_fleet_config(config_file: str) -> List[FleetTarget]:
+    """Targets from a JSON config ({"defaults": {...}, "targets": [...]}), or N8N_URL when there is none"""
+    if not os.path.exists(config_file):
+        return [FleetTarget(name='default', url=os.getenv('N8N_URL', 'https://n8n.pbradygeorgen.com'),
+                            interval=float(os.getenv('MONITOR_INTERVAL', '60')))]
+
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    defaults = config.get('defaults', {})
+    return [FleetTarget(**{**defaults, **target}) for target in config.get('targets', [])]
+
+
+class N8NFleetMonitor:
+    def __init__(self, targets: List[FleetTarget], dashboard_file: str = DEFAULT_DASHBOARD_FILE,
+                 dashboard_interval: float = DEFAULT_DASHBOARD_INTERVAL):
+        self.dashboard_file = dashboard_file
+        self.dashboard_interval = dashboard_interval
+        self.states: Dict[str, TargetState] = {
+            target.name: TargetState(target=target,
+                                     prober=N8NProber(target.url, os.getenv(target.api_key_env)),
+                                     current_interval=target.interval)
+            for target in targets
+        }
+        # Probes are blocking requests calls; give every target its own thread
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(targets)))
+
+    async def check_target(self, state: TargetState) -> Dict:
+        """Probe one target once and update its state and polling interval"""
+        target = state.target
+        loop = asyncio.get_running_loop()
+        try:
+            # Both probes have their own request timeout; this bounds the tick as a whole
+            cycle = await asyncio.wait_for(
+                loop.run_in_executor(self.executor, state.prober.run_cycle, target.timeout, target.timeout),
+                timeout=target.timeout * 2 + 1
+            )
+            status = self.summarize_cycle(state, cycle)
+        except asyncio.TimeoutError:
+            status = {'is_healthy': False, 'error': f"Check timed out after {target.timeout * 2 + 1:.0f}s"}
+        except Exception as e:
+            # e.g. an unexpected API payload; a failing target must never stop the other pollers
+            logger.error(f"❌ {target.name}: check failed: {e}")
+            status = {'is_healthy': False, 'error': f"Check failed: {e}"}
+
+        state.checks += 1
+        state.last_check = datetime.now().isoformat()
+        if status['is_healthy']:
+            state.consecutive_failures = 0
+            state.current_interval = min(target.max_interval, state.current_interval * BACKOFF_FACTOR)
+        else:
+            state.consecutive_failures += 1
+            state.current_interval = target.min_interval
+            logger.warning(f"⚠️  {target.name}: unhealthy ({status.get('error', 'degraded')}), "
+                           f"re-checking in {state.current_interval:.1f}s")
+        state.status = status
+        return status
+
+    def summarize_cycle(self, state: TargetState, cycle: MonitorCycle) -> Dict:
+        """Health and workflow counts of one target from its probes"""
+        workflows = cycle.workflows.data.get('data', []) if cycle.workflows.ok else []
+        response_time = cycle.workflows.latency if cycle.workflows.ok else None
+        is_healthy = cycle.health.ok and cycle.workflows.ok and response_time < SLOW_RESPONSE_TIME
+
+        status = {
+            'is_healthy': is_healthy,
+            'health_status_code': cycle.health.status_code,
+            'api_status_code': cycle.workflows.status_code,
+            'total_workflows': len(workflows),
+            'active_workflows': len([w for w in workflows if w.get('active', False)]),
+            'response_time': response_time,
+            'latency_percentiles': state.prober.latency_percentiles()
+        }
+        errors = [probe.error or f"{probe.path} returned {probe.status_code}"
+                  for probe in (cycle.health, cycle.workflows) if not probe.ok]
+        if errors:
+            status['error'] = '; '.join(errors)
+        elif not is_healthy:
+            status['error'] = f"Slow response time: {response_time:.2f}s"
+        return status
+
+    async def poll_target(self, state: TargetState):
+        """Check one target forever on its adaptive, jittered schedule"""
+        loop = asyncio.get_running_loop()
+        # Stagger the first checks across the interval
+        await asyncio.sleep(random.uniform(0, state.current_interval * JITTER))
+        while True:
+            started = loop.time()
+            await self.check_target(state)
+            delay = state.current_interval * random.uniform(1 - JITTER, 1 + JITTER)
+            await asyncio.sleep(max(0.0, started + delay - loop.time()))
+
+    def generate_dashboard_data(self) -> Dict:
+        """Combined dashboard payload for the whole fleet"""
+        targets = {}
+        alerts = []
+        for name, state in self.states.items():
+            targets[name] = {
+                'url': state.target.url,
+                'last_check': state.last_check,
+                'checks': state.checks,
+                'consecutive_failures': state.consecutive_failures,
+                'current_interval': round(state.current_interval, 1),
+                **state.status
+            }
+            if state.checks and not state.status.get('is_healthy'):
+                alerts.append({
+                    'level': 'critical' if state.consecutive_failures >= 3 else 'warning',
+                    'target': name,
+                    'message': state.status.get('error', 'Unhealthy'),
+                    'timestamp': datetime.now().isoformat()
+                })
+
+        checked = [target for target in targets.values() if target['checks']]
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'summary': {
+                'targets': len(targets),
+                'checked': len(checked),
+                'healthy': len([target for target in checked if target.get('is_healthy')]),
+                'unhealthy': len([target for target in checked if not target.get('is_healthy')]),
+                'total_workflows': sum(target.get('total_workflows', 0) for target in checked),
+                'active_workflows': sum(target.get('active_workflows', 0) for target in checked)
+            },
+            'targets': targets,
+            'alerts': alerts
+        }
+
+    def save_dashboard_data(self, dashboard_data: Dict):
+        """Write the dashboard file atomically so readers never see a partial file"""
+        try:
+            temp_file = f"{self.dashboard_file}.tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(dashboard_data, f, indent=2)
+            os.replace(temp_file, self.dashboard_file)
+        except Exception as e:
+            logger.error(f"Failed to save dashboard data: {e}")
+
+    async def publish_dashboard(self):
+        """Write the combined dashboard periodically"""
+        while True:
+            await asyncio.sleep(self.dashboard_interval)
+            dashboard_data = self.generate_dashboard_data()
+            self.save_dashboard_data(dashboard_data)
+            summary = dashboard_data['summary']
+            logger.info(f"Fleet check - Healthy: {summary['healthy']}/{summary['checked']}, "
+                        f"Workflows: {summary['active_workflows']}/{summary['total_workflows']}")
+
+    async def check_once(self) -> Dict:
+        """Check every target once, concurrently, and return the dashboard"""
+        await asyncio.gather(*(self.check_target(state) for state in self.states.values()))
+        dashboard_data = self.generate_dashboard_data()
+        self.save_dashboard_data(dashboard_data)
+        return dashboard_data
+
+    async def run_monitor(self):
+        """Poll every target on its own schedule until cancelled"""
+        logger.info(f"🔍 Starting N8N Fleet Monitor for {len(self.states)} instances...")
+        tasks = [asyncio.create_task(self.poll_target(state)) for state in self.states.values()]
+        tasks.append(asyncio.create_task(self.publish_dashboard()))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.save_dashboard_data(self.generate_dashboard_data())
+
+    def close(self):
+        """Stop the probe threads and close every session"""
+        self.executor.shutdown(wait=False)
+        for state in self.states.values():
+            state.prober.close()
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Monitor several N8N instances concurrently")
+    parser.add_argument('--config', default=DEFAULT_FLEET_CONFIG,
+                        help="Fleet config (JSON with 'defaults' and 'targets'); falls back to N8N_URL")
+    parser.add_argument('--dashboard-file', default=DEFAULT_DASHBOARD_FILE,
+                        help="Combined dashboard output")
+    parser.add_argument('--dashboard-interval', type=float, default=DEFAULT_DASHBOARD_INTERVAL,
+                        help="Seconds between dashboard writes")
+    parser.add_argument('--once', action='store_true',
+                        help="Check every instance once and exit (non-zero if any is unhealthy)")
+    args = parser.parse_args()
+
+    print("🔍 N8N Fleet Monitor")
+    print("=" * 30)
+
+    try:
+        targets = load_fleet_config(args.config)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"❌ Error: invalid fleet config {args.config}: {e}")
+        sys.exit(1)
+    if not targets:
+        print(f"❌ Error: no targets in {args.config}")
+        sys.exit(1)
+
+    monitor = N8NFleetMonitor(targets, args.dashboard_file, args.dashboard_interval)
+    try:
+        if args.once:
+            dashboard_data = asyncio.run(monitor.check_once())
+            summary = dashboard_data['summary']
+            for name, target in dashboard_data['targets'].items():
+                icon = "✅" if target.get('is_healthy') else "❌"
+                print(f"{icon} {name}: {target.get('active_workflows', 0)}/{target.get('total_workflows', 0)} "
+                      f"workflows active{' - ' + target['error'] if target.get('error') else ''}")
+            print(f"📊 Dashboard: {args.dashboard_file}")
+            sys.exit(0 if summary['healthy'] == summary['targets'] else 1)
+        asyncio.run(monitor.run_monitor())
+    except KeyboardInterrupt:
+        logger.info("Monitor stopped by user")
+    finally:
+        monitor.close()
+
+
+if __name__ == "__main__":
+    main()
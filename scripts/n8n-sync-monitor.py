@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 N8N Sync Monitor
@@ -10,12 +9,18 @@ import os
 import sys
 import json
 import time
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import logging
 from dataclasses import dataclass
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.sync_history_store import SyncHistoryStore, DEFAULT_HISTORY_DB
+from utilities.n8n_probe import (N8NProber, ProbeResult, MonitorCycle, HEALTH_PATH, WORKFLOWS_PATH,
+                                 HEALTH_TIMEOUT, WORKFLOWS_TIMEOUT)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,6 +28,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Window for error counts and sync frequency
+HEALTH_WINDOW = timedelta(hours=24)
+# Operations used for the sync frequency when the window holds fewer than two
+FREQUENCY_FALLBACK_SAMPLE = 100
+# Reported as the response time when the probe failed
+FAILED_RESPONSE_TIME = 999.0
+
 @dataclass
 class SyncStatus:
     """Sync status data class"""
@@ -34,101 +46,82 @@ class SyncStatus:
     performance_metrics: Dict
 
 class N8NSyncMonitor:
+    def __init__(self):
+        self.n8n_url = os.getenv('N8N_URL', 'https://n8n.pbradygeorgen.com')
         self.n8n_api_key = os.getenv('N8N_API_KEY')
         self.monitor_interval = int(os.getenv('MONITOR_INTERVAL', '60'))  # seconds
         self.alert_threshold = int(os.getenv('ALERT_THRESHOLD', '5'))  # error threshold
+        self.history_db = os.getenv('SYNC_HISTORY_DB', DEFAULT_HISTORY_DB)
+        self._history_store: Optional[SyncHistoryStore] = None
         
-    def check_n8n_health(self) -> bool:
+        # One keep-alive session for every probe, with rolling latency per endpoint
+        self.prober = N8NProber(self.n8n_url, self.n8n_api_key)
+    
+    def history_store(self) -> Optional[SyncHistoryStore]:
+        """Sync history written by the bi-directional sync (None until the first sync has run)"""
+        if self._history_store is None and os.path.exists(self.history_db):
+            self._history_store = SyncHistoryStore(self.history_db)
+        return self._history_store
+        
+    def run_cycle(self) -> MonitorCycle:
+        """Probe each endpoint once for this tick"""
+        return self.prober.run_cycle()
+    
+    def check_n8n_health(self, probe: ProbeResult = None) -> bool:
         """Check N8N instance health"""
-        try:
-            headers = {
-                'X-N8N-API-KEY': self.n8n_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
-                f"{self.n8n_url}/health",
-                headers=headers,
-                timeout=10
-            )
-            
-            return response.status_code == 200
-            
-        except Exception as e:
-            logger.error(f"N8N health check failed: {e}")
-            return False
+        probe = probe or self.prober.probe(HEALTH_PATH, timeout=HEALTH_TIMEOUT)
+        if not probe.ok:
+            logger.error(f"N8N health check failed: {probe.error or probe.status_code}")
+        return probe.ok
     
-    def get_workflow_status(self) -> Dict:
+    def get_workflow_status(self, probe: ProbeResult = None) -> Dict:
         """Get workflow status from N8N"""
-        try:
-            headers = {
-                'X-N8N-API-KEY': self.n8n_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
-                f"{self.n8n_url}/api/v1/workflows",
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                workflows = data.get('data', [])
-                
-                active_workflows = [w for w in workflows if w.get('active', False)]
-                
-                return {
-                    'total_workflows': len(workflows),
-                    'active_workflows': len(active_workflows),
-                    'workflows': workflows
-                }
-            else:
-                logger.error(f"Failed to fetch workflows: {response.status_code}")
-                return {'total_workflows': 0, 'active_workflows': 0, 'workflows': []}
-                
-        except Exception as e:
-            logger.error(f"Error fetching workflow status: {e}")
+        probe = probe or self.prober.probe(WORKFLOWS_PATH, timeout=WORKFLOWS_TIMEOUT, parse_json=True)
+        if not probe.ok:
+            logger.error(f"Failed to fetch workflows: {probe.error or probe.status_code}")
             return {'total_workflows': 0, 'active_workflows': 0, 'workflows': []}
+        
+        workflows = probe.data.get('data', [])
+        active_workflows = [w for w in workflows if w.get('active', False)]
+        
+        return {
+            'total_workflows': len(workflows),
+            'active_workflows': len(active_workflows),
+            'workflows': workflows
+        }
     
-    def check_sync_health(self) -> SyncStatus:
-        """Check overall sync health"""
+    def check_sync_health(self, cycle: MonitorCycle = None) -> SyncStatus:
+        """Check overall sync health (from this tick's probes when given)"""
         try:
+            cycle = cycle or self.run_cycle()
+            
             # Check N8N health
-            n8n_healthy = self.check_n8n_health()
+            n8n_healthy = self.check_n8n_health(cycle.health)
             
             # Get workflow status
-            workflow_status = self.get_workflow_status()
+            workflow_status = self.get_workflow_status(cycle.workflows)
             
-            # Load sync history
-            sync_history_file = 'n8n-sync-history.json'
+            # Load sync history (only the last 24 hours, via the time index)
             sync_errors = 0
+            recent_operations = 0
             last_sync = None
             
-            if os.path.exists(sync_history_file):
+            store = self.history_store()
+            if store is not None:
                 try:
-                    with open(sync_history_file, 'r') as f:
-                        sync_history = json.load(f)
-                    
-                    last_sync = sync_history.get('last_sync')
-                    sync_operations = sync_history.get('sync_operations', [])
-                    
-                    # Count recent errors (last 24 hours)
-                    cutoff_time = datetime.now() - timedelta(hours=24)
-                    for op in sync_operations:
-                        if op.get('timestamp'):
-                            op_time = datetime.fromisoformat(op['timestamp'].replace('Z', '+00:00'))
-                            if op_time > cutoff_time and op.get('status') == 'failed':
-                                sync_errors += 1
-                                
+                    cutoff = (datetime.now() - HEALTH_WINDOW).timestamp()
+                    last_sync = store.get_meta('last_sync')
+                    sync_errors = store.count_since(cutoff, status='failed')
+                    recent_operations = store.count_since(cutoff)
                 except Exception as e:
                     logger.error(f"Failed to load sync history: {e}")
             
             # Calculate performance metrics
             performance_metrics = {
-                'n8n_response_time': self.measure_n8n_response_time(),
+                'n8n_response_time': self.measure_n8n_response_time(cycle.workflows),
+                'latency_percentiles': self.prober.latency_percentiles(),
                 'sync_frequency': self.calculate_sync_frequency(),
-                'error_rate': sync_errors / max(1, len(sync_history.get('sync_operations', []))) if 'sync_history' in locals() else 0
+                'error_rate': sync_errors / max(1, recent_operations)
             }
             
             # Determine overall health
@@ -158,62 +151,30 @@ class N8NSyncMonitor:
                 performance_metrics={}
             )
     
-    def measure_n8n_response_time(self) -> float:
+    def measure_n8n_response_time(self, probe: ProbeResult = None) -> float:
         """Measure N8N API response time"""
-        try:
-            start_time = time.time()
-            headers = {
-                'X-N8N-API-KEY': self.n8n_api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(
-                f"{self.n8n_url}/api/v1/workflows",
-                headers=headers,
-                timeout=10
-            )
-            
-            end_time = time.time()
-            return end_time - start_time
-            
-        except Exception as e:
-            logger.error(f"Failed to measure response time: {e}")
-            return 999.0
+        probe = probe or self.prober.probe(WORKFLOWS_PATH, timeout=WORKFLOWS_TIMEOUT, parse_json=True)
+        return probe.latency if probe.ok else FAILED_RESPONSE_TIME
     
     def calculate_sync_frequency(self) -> str:
         """Calculate sync frequency from history"""
         try:
-            sync_history_file = 'n8n-sync-history.json'
-            if not os.path.exists(sync_history_file):
+            store = self.history_store()
+            if store is None:
                 return "No sync history"
             
-            with open(sync_history_file, 'r') as f:
-                sync_history = json.load(f)
-            
-            sync_operations = sync_history.get('sync_operations', [])
-            if not sync_operations:
+            # Operation times are read oldest first from the time index
+            timestamps = store.operation_times(since=(datetime.now() - HEALTH_WINDOW).timestamp())
+            if len(timestamps) < 2:
+                timestamps = store.operation_times(limit=FREQUENCY_FALLBACK_SAMPLE)
+            if not timestamps:
                 return "No sync operations"
             
-            # Calculate average time between syncs
-            timestamps = []
-            for op in sync_operations:
-                if op.get('timestamp'):
-                    try:
-                        op_time = datetime.fromisoformat(op['timestamp'].replace('Z', '+00:00'))
-                        timestamps.append(op_time)
-                    except:
-                        continue
-            
             if len(timestamps) < 2:
                 return "Insufficient data"
             
-            timestamps.sort()
-            intervals = []
-            for i in range(1, len(timestamps)):
-                interval = (timestamps[i] - timestamps[i-1]).total_seconds() / 60  # minutes
-                intervals.append(interval)
-            
-            avg_interval = sum(intervals) / len(intervals)
+            # Calculate average time between syncs (minutes)
+            avg_interval = (timestamps[-1] - timestamps[0]) / (len(timestamps) - 1) / 60
             
             if avg_interval < 60:
                 return f"Every {avg_interval:.1f} minutes"
@@ -229,20 +190,17 @@ class N8NSyncMonitor:
     def generate_dashboard_data(self) -> Dict:
         """Generate dashboard data for web interface"""
         try:
-            sync_status = self.check_sync_health()
-            workflow_status = self.get_workflow_status()
+            cycle = self.run_cycle()
+            sync_status = self.check_sync_health(cycle)
+            workflow_status = self.get_workflow_status(cycle.workflows)
             
             # Get recent sync operations
             recent_operations = []
-            sync_history_file = 'n8n-sync-history.json'
-            if os.path.exists(sync_history_file):
+            store = self.history_store()
+            if store is not None:
                 try:
-                    with open(sync_history_file, 'r') as f:
-                        sync_history = json.load(f)
-                    
-                    sync_operations = sync_history.get('sync_operations', [])
                     # Get last 10 operations
-                    recent_operations = sync_operations[-10:]
+                    recent_operations = store.recent_operations(10)
                     
                 except Exception as e:
                     logger.error(f"Failed to load recent operations: {e}")
@@ -338,9 +296,12 @@ class N8NSyncMonitor:
                 
                 # Log status
                 sync_status = dashboard_data.get('sync_status', {})
+                latency = self.prober.latency_percentiles().get(WORKFLOWS_PATH, {})
                 logger.info(f"Monitor check - Healthy: {sync_status.get('is_healthy')}, "
                            f"Workflows: {sync_status.get('active_workflows')}/{sync_status.get('total_workflows')}, "
-                           f"Errors: {sync_status.get('sync_errors')}")
+                           f"Errors: {sync_status.get('sync_errors')}, "
+                           f"API latency p50/p95/p99: {latency.get('p50')}/{latency.get('p95')}/{latency.get('p99')}s "
+                           f"({latency.get('failed', 0)} failed)")
                 
                 # Log alerts
                 alerts = dashboard_data.get('alerts', [])
@@ -359,7 +320,11 @@ class N8NSyncMonitor:
             logger.info("Monitor stopped by user")
         except Exception as e:
             logger.error(f"Monitor error: {e}")
+        finally:
+            self.prober.close()
 
+def main():
+    """Main function"""
     print("🔍 N8N Sync Monitor")
     print("=" * 30)
     
@@ -376,4 +341,3 @@ class N8NSyncMonitor:
 
 if __name__ == "__main__":
     main()
-
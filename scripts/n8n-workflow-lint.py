@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+N8N Workflow Lint
+=================
+Lint every n8n workflow JSON file in a directory (workflows/ by default)
+with the rule engine in utilities/n8n_workflow_lint.py.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from typing import List
+
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.n8n_workflow_lint import LINT_RULES, SEVERITIES, LintReport, lint_directory
+
+SEVERITY_ICONS = {'info': 'ℹ️ ', 'warning': '⚠️ ', 'error': '❌'}
+
+
+def print_report(reports: List[LintReport], min_severity: str):
+    """Findings per workflow (at or above a severity), then totals"""
+    threshold = SEVERITIES.index(min_severity)
+    for report in reports:
+        if report.error:
+            print(f"❌ {report.file_path}: {report.error}")
+            continue
+        shown = [finding for finding in report.findings if SEVERITIES.index(finding.severity) >= threshold]
+        if not shown:
+            continue
+        print(f"\n📄 {report.workflow_name} ({report.file_path})")
+        for finding in shown:
+            print(f"   {SEVERITY_ICONS[finding.severity]} [{finding.rule}] {finding.message}")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Lint n8n workflow definitions")
+    parser.add_argument('directory', nargs='?', default='workflows', help="Directory of workflow JSON files")
+    parser.add_argument('--rules', help="Comma-separated rule ids to run (default: all)")
+    parser.add_argument('--list-rules', action='store_true', help="List the available rules and exit")
+    parser.add_argument('--min-severity', choices=SEVERITIES, default='warning',
+                        help="Lowest severity printed per workflow")
+    parser.add_argument('--fail-on', choices=SEVERITIES + ('never',), default='error',
+                        help="Exit non-zero when a finding of this severity or higher exists")
+    parser.add_argument('--json', dest='json_file', help="Also write all reports to this JSON file")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.list_rules:
+        for rule in LINT_RULES:
+            print(f"{rule.rule_id:30} {rule.severity:8} {rule.description}")
+        return
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Error: {args.directory} is not a directory")
+        sys.exit(1)
+
+    rules = [rule.strip() for rule in args.rules.split(',')] if args.rules else None
+    unknown = set(rules or []) - {rule.rule_id for rule in LINT_RULES}
+    if unknown:
+        print(f"❌ Error: unknown rules: {', '.join(sorted(unknown))}")
+        sys.exit(1)
+
+    print("🔍 N8N Workflow Lint")
+    print("=" * 30)
+
+    start_time = time.time()
+    reports = [report for report in lint_directory(args.directory, rules, args.workers) if report is not None]
+    elapsed = time.time() - start_time
+
+    print_report(reports, args.min_severity)
+
+    severities = Counter(finding.severity for report in reports for finding in report.findings)
+    rule_counts = Counter(finding.rule for report in reports for finding in report.findings)
+    unreadable = len([report for report in reports if report.error])
+    print(f"\n📊 Linted {len(reports)} workflows in {elapsed:.2f}s"
+          f"{f' ({unreadable} unreadable)' if unreadable else ''}")
+    print(f"   Errors: {severities['error']}, Warnings: {severities['warning']}, Info: {severities['info']}")
+    for rule_id, count in rule_counts.most_common():
+        print(f"   {rule_id}: {count}")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump([report.to_dict() for report in reports], f, indent=2)
+        print(f"💾 Reports saved: {args.json_file}")
+
+    if args.fail_on != 'never':
+        threshold = SEVERITIES.index(args.fail_on)
+        if unreadable or any(SEVERITIES.index(severity) >= threshold for severity in severities):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
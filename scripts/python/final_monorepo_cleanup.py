@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Final Monorepo Cleanup System
@@ -12,26 +11,47 @@ import os
 import sys
 import shutil
 import json
+import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Tuple, Optional
 import re
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.file_io_engine import FileIOEngine, DEFAULT_SNAPSHOT_EXCLUDES
+
+# Left out of full pre-cleanup snapshots: regenerable directories and earlier backups
+SNAPSHOT_EXCLUDES = DEFAULT_SNAPSHOT_EXCLUDES + ('*_backup_*',)
+
 class FinalMonorepoCleanup:
     """Final cleanup system for main folder organization"""
     
+    def __init__(self, project_root: str = ".", full_backup: bool = False, max_workers: Optional[int] = None,
+                 use_hardlinks: bool = True):
+        self.project_root = Path(project_root)
         self.backup_dir = None
+        self.full_backup = full_backup
         self.cleanup_log = []
         self.sub_projects = {}
         self.removed_files = []
+        self.io_engine = FileIOEngine(max_workers=max_workers, use_hardlinks=use_hardlinks)
         
     def create_backup(self) -> str:
-        """Create a backup directory for safety"""
+        """Create a backup directory for safety (a hard-linked snapshot of the whole project with full_backup)"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.backup_dir = self.project_root / f"final_cleanup_backup_{timestamp}"
-        self.backup_dir.mkdir(exist_ok=True)
+        self.io_engine.make_dirs(str(self.backup_dir))
         
         self.log(f"Created backup directory: {self.backup_dir}")
+        
+        if self.full_backup:
+            started = datetime.now()
+            file_count = self.io_engine.backup_tree(str(self.project_root), str(self.backup_dir), SNAPSHOT_EXCLUDES)
+            stats = self.io_engine.stats()
+            self.log(f"Snapshot of {file_count} files in {(datetime.now() - started).total_seconds():.1f}s "
+                     f"({stats['linked_files']} hard links, {stats['copied_files']} copies)")
         return str(self.backup_dir)
     
     def log(self, message: str):
@@ -43,18 +63,22 @@ class FinalMonorepoCleanup:
     
     def safe_remove_file(self, file_path: Path, reason: str = "Excess file"):
         """Safely remove a file with backup"""
-        if not file_path.exists():
-            return
-        
-        # Create backup
-        backup_path = self.backup_dir / file_path.name
-        shutil.copy2(file_path, backup_path)
-        
-        # Remove original
-        file_path.unlink()
-        
-        self.removed_files.append(str(file_path))
-        self.log(f"Removed {file_path.name} ({reason}) - backed up to {backup_path}")
+        self.safe_remove_files([file_path], reason)
+    
+    def safe_remove_files(self, file_paths: List[Path], reason: str = "Excess file"):
+        """Back up a batch of files in parallel, then remove them"""
+        file_paths = [file_path for file_path in dict.fromkeys(file_paths) if file_path.exists()]
+        # Backups keep their path relative to the project, so files sharing a name never share a backup
+        backups = [(file_path, self.backup_dir / file_path.relative_to(self.project_root)) for file_path in file_paths]
+        
+        # Nothing is removed unless every backup in the batch succeeded
+        self.io_engine.run_all(self.io_engine.backup_file,
+                               [(str(file_path), str(backup_path)) for file_path, backup_path in backups])
+        
+        for file_path, backup_path in backups:
+            file_path.unlink()
+            self.removed_files.append(str(file_path))
+            self.log(f"Removed {file_path} ({reason}) - backed up to {backup_path}")
     
     def identify_sub_projects(self) -> Dict[str, Dict[str, Any]]:
         """Identify and catalog all sub-projects in the monorepo"""
@@ -440,10 +464,7 @@ class FinalMonorepoCleanup:
             
             # Step 4: Remove excess files
             print("\n🗑️  Step 4: Removing excess files...")
-            for file in excess_files:
-                file_path = self.project_root / file
-                if file_path.exists():
-                    self.safe_remove_file(file_path, "Excess file in main folder")
+            self.safe_remove_files([self.project_root / file for file in excess_files], "Excess file in main folder")
             
             # Step 5: Organize remaining files
             print("\n📁 Step 5: Organizing remaining files...")
@@ -468,12 +489,26 @@ class FinalMonorepoCleanup:
             print(f"📦 Backup available at: {backup_dir}")
             raise
         
+        finally:
+            # One fsync batch for every backup made above
+            self.io_engine.sync()
+        
+        results['io_stats'] = self.io_engine.stats()
         return results
 
-    import sys
+def main():
+    """Main function to run final cleanup"""
+    parser = argparse.ArgumentParser(description="Final monorepo cleanup")
+    parser.add_argument('--root', default='.', help="Monorepo root directory")
+    parser.add_argument('--full-backup', action='store_true',
+                        help="Snapshot the whole project (hard links, no extra disk) before cleaning up")
+    parser.add_argument('--no-hardlinks', action='store_true', help="Always copy files into the backup")
+    parser.add_argument('--workers', type=int, default=None, help="I/O threads for backups")
+    args = parser.parse_args()
     
     # Run final cleanup
-    cleanup = FinalMonorepoCleanup()
+    cleanup = FinalMonorepoCleanup(args.root, full_backup=args.full_backup, max_workers=args.workers,
+                                   use_hardlinks=not args.no_hardlinks)
     results = cleanup.run_final_cleanup()
     
     print(f"\n🎉 Final monorepo cleanup completed successfully!")
@@ -481,6 +516,8 @@ class FinalMonorepoCleanup:
     print(f"   - Sub-projects identified: {len(results['sub_projects'])}")
     print(f"   - Files removed: {len(results['files_removed'])}")
     print(f"   - Backup location: {results['backup_directory']}")
+    print(f"   - Backup I/O: {results['io_stats']['linked_files']} hard links, "
+          f"{results['io_stats']['copied_files']} copies")
     print(f"   - Report: {results['report_path']}")
     
     # Display sub-projects summary
@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Intelligent Monorepo Cleanup System
@@ -13,25 +12,53 @@ import sys
 import shutil
 import json
 import hashlib
+import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 import difflib
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.content_hash_index import ContentHashIndex, DEFAULT_INDEX_FILE, DEFAULT_EXCLUDE_DIRS
+from utilities.file_io_engine import FileIOEngine, DEFAULT_SNAPSHOT_EXCLUDES
+
+# Left out of full pre-cleanup snapshots: regenerable directories, earlier backups and the hash index
+SNAPSHOT_EXCLUDES = DEFAULT_SNAPSHOT_EXCLUDES + ('*_backup_*', DEFAULT_INDEX_FILE)
+
 class IntelligentMonorepoCleanup:
     """Intelligent cleanup system for monorepo optimization"""
     
+    def __init__(self, project_root: str = ".", full_backup: bool = False, max_workers: Optional[int] = None,
+                 use_hardlinks: bool = True, dedupe_archives: bool = False):
+        self.project_root = Path(project_root)
         self.backup_dir = None
+        self.full_backup = full_backup
+        self.dedupe_archives = dedupe_archives
         self.cleanup_log = []
         self.preserved_files = set()
+        self.hash_index = ContentHashIndex(str(self.project_root / DEFAULT_INDEX_FILE))
+        self.io_engine = FileIOEngine(max_workers=max_workers, use_hardlinks=use_hardlinks)
         
+    def create_backup(self) -> str:
+        """Create a backup directory for safety (a hard-linked snapshot of the whole project with full_backup)"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.backup_dir = self.project_root / f"monorepo_cleanup_backup_{timestamp}"
-        self.backup_dir.mkdir(exist_ok=True)
+        self.io_engine.make_dirs(str(self.backup_dir))
         
         self.log(f"Created backup directory: {self.backup_dir}")
+        
+        if self.full_backup:
+            started = datetime.now()
+            file_count = self.io_engine.backup_tree(str(self.project_root), str(self.backup_dir), SNAPSHOT_EXCLUDES)
+            stats = self.io_engine.stats()
+            self.log(f"Snapshot of {file_count} files in {(datetime.now() - started).total_seconds():.1f}s "
+                     f"({stats['linked_files']} hard links, {stats['copied_files']} copies)")
         return str(self.backup_dir)
     
+    def log(self, message: str):
+        """Log cleanup actions"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_entry = f"[{timestamp}] {message}"
         self.cleanup_log.append(log_entry)
@@ -39,18 +66,25 @@ class IntelligentMonorepoCleanup:
     
     def safe_remove_file(self, file_path: Path, reason: str = "Duplicate or redundant"):
         """Safely remove a file with backup"""
-        if not file_path.exists():
-            return
-        
-        # Create backup
-        backup_path = self.backup_dir / file_path.relative_to(self.project_root)
-        backup_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(file_path, backup_path)
+        self.safe_remove_files([(file_path, reason)])
+    
+    def safe_remove_files(self, removals: List[Tuple[Path, str]]):
+        """Back up a batch of files in parallel, then remove them"""
+        unique_removals = {}
+        for file_path, reason in removals:
+            unique_removals.setdefault(file_path, reason)
+        removals = [(file_path, reason) for file_path, reason in unique_removals.items() if file_path.exists()]
+        backups = [(file_path, self.backup_dir / file_path.relative_to(self.project_root))
+                   for file_path, _ in removals]
         
-        # Remove original
-        file_path.unlink()
+        # Nothing is removed unless every backup in the batch succeeded
+        self.io_engine.run_all(self.io_engine.backup_file,
+                               [(str(file_path), str(backup_path)) for file_path, backup_path in backups])
         
-        self.log(f"Removed {file_path} ({reason}) - backed up to {backup_path}")
+        for (file_path, reason), (_, backup_path) in zip(removals, backups):
+            file_path.unlink()
+            self.hash_index.forget(str(file_path))
+            self.log(f"Removed {file_path} ({reason}) - backed up to {backup_path}")
     
     def safe_remove_directory(self, dir_path: Path, reason: str = "Redundant directory"):
         """Safely remove a directory with backup"""
@@ -59,8 +93,7 @@ class IntelligentMonorepoCleanup:
         
         # Create backup
         backup_path = self.backup_dir / dir_path.relative_to(self.project_root)
-        backup_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(dir_path, backup_path)
+        self.io_engine.backup_tree(str(dir_path), str(backup_path), exclude=())
         
         # Remove original
         shutil.rmtree(dir_path)
@@ -114,19 +147,15 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
 '''
             
-            with open(consolidated_path, 'w', encoding='utf-8') as f:
-                f.write(header + best_content)
-            
-            # Make executable
-            os.chmod(consolidated_path, 0o755)
+            # Written through a rename (and made executable) so a hard-linked backup of an older version stays intact
+            self.io_engine.replace_file(str(consolidated_path), header + best_content, mode=0o755)
             
             consolidated[group_name] = str(consolidated_path)
             self.log(f"Created consolidated script: {consolidated_path}")
             
             # Remove original scripts (except the best one)
-            for script_path, _ in script_contents:
-                if script_path != best_path:
-                    self.safe_remove_file(Path(script_path), "Consolidated into single script")
+            self.safe_remove_files([(Path(script_path), "Consolidated into single script")
+                                    for script_path, _ in script_contents if script_path != best_path])
         
         return consolidated
     
@@ -145,10 +174,12 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             archive_name = f"{milestone_path.name}_{datetime.now().strftime('%Y%m%d')}.tar.gz"
             archive_path = archives_dir / archive_name
             
-            # Create tar.gz archive
+            # Create tar.gz archive (renamed into place, never rewriting a possibly hard-linked archive)
             import tarfile
-            with tarfile.open(archive_path, "w:gz") as tar:
+            temp_archive_path = archive_path.with_name(f".{archive_name}.tmp")
+            with tarfile.open(temp_archive_path, "w:gz") as tar:
                 tar.add(milestone_path, arcname=milestone_path.name)
+            os.replace(temp_archive_path, archive_path)
             
             archived[milestone_dir] = str(archive_path)
             self.log(f"Archived {milestone_dir} to {archive_path}")
@@ -160,46 +191,82 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     
     def remove_duplicate_files(self, duplicate_groups: Dict[str, List[str]]) -> int:
         """Remove duplicate files, keeping the most recent or most comprehensive"""
-        removed_count = 0
+        removals = []
         
         for hash_val, files in duplicate_groups.items():
             if len(files) < 2:
                 continue
             
-            # Keep the file with the most recent modification time or largest size
-            best_file = None
-            best_score = -1
-            
-            for file_path in files:
-                try:
-                    path = Path(file_path)
-                    if not path.exists():
-                        continue
-                    
-                    stat = path.stat()
-                    # Score based on modification time and size
-                    score = stat.st_mtime + (stat.st_size / 1000)  # Size in KB
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_file = file_path
+            # The analysis may be stale: only files that are still byte-identical are removed
+            for identical_files in self.hash_index.duplicate_groups(files, executor=self.io_engine.executor):
+                # Keep the file with the most recent modification time or largest size
+                best_file = None
+                best_score = -1
+                
+                for file_path in identical_files:
+                    try:
+                        path = Path(file_path)
+                        if not path.exists():
+                            continue
+                        
+                        stat = path.stat()
+                        # Score based on modification time and size
+                        score = stat.st_mtime + (stat.st_size / 1000)  # Size in KB
                         
-                except Exception:
+                        if score > best_score:
+                            best_score = score
+                            best_file = file_path
+                            
+                    except Exception:
+                        continue
+                
+                if not best_file:
                     continue
-            
-            if not best_file:
-                continue
-            
-            # Remove duplicates
-            for file_path in files:
-                if file_path != best_file:
-                    path = Path(file_path)
-                    if path.exists():
-                        self.safe_remove_file(path, f"Duplicate of {best_file}")
-                        removed_count += 1
+                
+                # Remove duplicates
+                for file_path in identical_files:
+                    if file_path != best_file and Path(file_path).exists():
+                        removals.append((Path(file_path), f"Duplicate of {best_file}"))
+        
+        self.safe_remove_files(removals)
+        self.hash_index.commit()
+        return len(removals)
+    
+    def is_archive_path(self, file_path: str) -> bool:
+        """Whether a file lives in archives/ or a top-level *_backup_* tree"""
+        try:
+            top_level = Path(file_path).resolve().relative_to(self.project_root.resolve()).parts[0]
+        except (ValueError, IndexError):
+            return False
+        return top_level == 'archives' or '_backup_' in top_level
+    
+    def find_duplicate_groups(self, include_backups: bool = False) -> Dict[str, List[str]]:
+        """Find byte-identical files across the whole project with the persistent hash index"""
+        # Backups only count as duplicates when asked for, and this run's own snapshot never does
+        backup_dirs = tuple(path.name for path in self.project_root.glob('*_backup_*')
+                            if path.is_dir() and (not include_backups or path == self.backup_dir))
+        file_paths = self.hash_index.scan(str(self.project_root), exclude_dirs=DEFAULT_EXCLUDE_DIRS + backup_dirs)
+        duplicate_groups = {
+            self.hash_index.full_hash(files[0]): files
+            for files in self.hash_index.duplicate_groups(file_paths, min_size=1, executor=self.io_engine.executor)
+        }
+        self.hash_index.commit()
         
-        return removed_count
+        stats = self.hash_index.stats()
+        self.log(f"Hash index: {len(file_paths)} files, {stats['partial_hashes']} partial and "
+                 f"{stats['full_hashes']} full hashes computed, {len(duplicate_groups)} duplicate groups")
+        return duplicate_groups
+    
+    def find_archive_duplicate_groups(self) -> Dict[str, List[str]]:
+        """Duplicate groups whose every copy lives in an archive or backup tree"""
+        return {
+            hash_val: files
+            for hash_val, files in self.find_duplicate_groups(include_backups=True).items()
+            if all(self.is_archive_path(file_path) for file_path in files)
+        }
     
+    def organize_remaining_files(self):
+        """Organize remaining files into a clean structure"""
         # Create organized directory structure
         organized_dirs = {
             'src': 'Source code files',
@@ -296,7 +363,14 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         try:
             # Step 1: Remove duplicate files
             print("\n🗑️  Step 1: Removing duplicate files...")
-            duplicate_groups = analysis['duplicate_analysis']['duplicate_groups']
+            duplicate_groups = analysis.get('duplicate_analysis', {}).get('duplicate_groups')
+            if duplicate_groups is None:
+                # Byte-identical files outside archives are often intentional (shipped copies, .d.ts
+                # twins), so a project-wide scan is only reported; --dedupe-archives prunes archive copies
+                results['duplicate_groups_found'] = self.find_duplicate_groups()
+                self.log(f"No duplicate groups in {analysis_file}: reporting "
+                         f"{len(results['duplicate_groups_found'])} groups without removing anything")
+                duplicate_groups = self.find_archive_duplicate_groups() if self.dedupe_archives else {}
             results['duplicates_removed'] = self.remove_duplicate_files(duplicate_groups)
             
             # Step 2: Consolidate similar scripts
@@ -342,31 +416,51 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             print(f"📦 Backup available at: {backup_dir}")
             raise
         
+        finally:
+            # One fsync batch for every backup, copy and rewrite made above
+            self.io_engine.sync()
+        
+        results['io_stats'] = self.io_engine.stats()
         return results
 
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python3 intelligent_monorepo_cleanup.py <analysis_file.json>")
-        print("Example: python3 intelligent_monorepo_cleanup.py monorepo_optimization_analysis_20250906_202651.json")
-        return 1
+def main():
+    """Main function to run intelligent cleanup"""
+    parser = argparse.ArgumentParser(
+        description="Intelligent monorepo cleanup",
+        epilog="Example: python3 intelligent_monorepo_cleanup.py monorepo_optimization_analysis_20250906_202651.json"
+    )
+    parser.add_argument('analysis_file', help="Analysis JSON produced by the monorepo optimization analysis")
+    parser.add_argument('--full-backup', action='store_true',
+                        help="Snapshot the whole project (hard links, no extra disk) before cleaning up")
+    parser.add_argument('--no-hardlinks', action='store_true', help="Always copy files into the backup")
+    parser.add_argument('--workers', type=int, default=None, help="I/O threads for hashing and backups")
+    parser.add_argument('--dedupe-archives', action='store_true',
+                        help="When the analysis lists no duplicate groups, remove byte-identical copies "
+                             "that live only in archives/ and *_backup_* trees")
+    args = parser.parse_args()
     
-    analysis_file = sys.argv[1]
+    analysis_file = args.analysis_file
     
     if not os.path.exists(analysis_file):
         print(f"Error: Analysis file not found: {analysis_file}")
         return 1
     
     # Run intelligent cleanup
-    cleanup = IntelligentMonorepoCleanup()
+    cleanup = IntelligentMonorepoCleanup(full_backup=args.full_backup, max_workers=args.workers,
+                                         use_hardlinks=not args.no_hardlinks,
+                                         dedupe_archives=args.dedupe_archives)
     results = cleanup.run_intelligent_cleanup(analysis_file)
     
     print(f"\n🎉 Monorepo cleanup completed successfully!")
     print(f"📊 Results:")
     print(f"   - Duplicates removed: {results['duplicates_removed']}")
+    if 'duplicate_groups_found' in results:
+        print(f"   - Duplicate groups found (report only): {len(results['duplicate_groups_found'])}")
     print(f"   - Scripts consolidated: {len(results['scripts_consolidated'])}")
     print(f"   - Packages archived: {len(results['packages_archived'])}")
     print(f"   - Backup location: {results['backup_directory']}")
+    print(f"   - Backup I/O: {results['io_stats']['linked_files']} hard links, "
+          f"{results['io_stats']['copied_files']} copies")
     print(f"   - Report: {results['report_path']}")
     
     return 0
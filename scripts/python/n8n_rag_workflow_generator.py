@@ -6,9 +6,246 @@ Generates RAG-enhanced N8N workflows for crew memory management
 
 import json
 import os
+import sys
 import hashlib
+import argparse
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.n8n_workflow_template import WorkflowTemplate, write_if_changed
+
+# All crew workflows in one JSON array, importable with `n8n import:workflow --input=<file>`
+DEFAULT_BUNDLE_FILE = "n8n-rag-workflows-bundle.json"
+
+# Shared by every crew workflow; per-crew values are patched in by _generate_crew_rag_workflow
+RAG_WORKFLOW_SKELETON = {
+    "name": None,  # Set per crew
+    "nodes": [
+        {
+            "id": "webhook_trigger",
+            "type": "n8n-nodes-base.webhook",
+            "name": "RAG Query Trigger",
+            "parameters": {
+                "path": None,  # Set per crew
+                "httpMethod": "POST",
+                "responseMode": "responseNode",
+                "options": {}
+            },
+            "position": [240, 300],
+            "typeVersion": 1
+        },
+        {
+            "id": "rag_query_processor",
+            "type": "n8n-nodes-base.function",
+            "name": "RAG Query Processor",
+            "parameters": {
+                "functionCode": None  # Rendered per crew
+            },
+            "position": [460, 300],
+            "typeVersion": 1
+        },
+        {
+            "id": "openai_embedding",
+            "type": "n8n-nodes-base.openAi",
+            "name": "Generate Query Embedding",
+            "parameters": {
+                "resource": "embedding",
+                "operation": "create",
+                "model": "text-embedding-3-small",
+                "input": "={{ $json.query }}"
+            },
+            "position": [680, 200],
+            "typeVersion": 1
+        },
+        {
+            "id": "supabase_vector_search",
+            "type": "n8n-nodes-base.supabase",
+            "name": "Search Vector Database",
+            "parameters": {
+                "operation": "execute",
+                "query": """
+SELECT 
+    id, content, embedding, crew_member, memory_type, importance_score,
+    1 - (embedding <=> $1::vector) as similarity_score,
+    tags, created_at
+FROM crew_memories 
+WHERE crew_member = $2 
+  AND 1 - (embedding <=> $1::vector) > 0.75
+ORDER BY embedding <=> $1::vector
+LIMIT 10
+                        """,
+                "parameters": ["={{ $json.query_embedding }}", "={{ $json.crew_member }}"]
+            },
+            "position": [900, 200],
+            "typeVersion": 1
+        },
+        {
+            "id": "crew_response_generator",
+            "type": "n8n-nodes-base.openAi",
+            "name": "Crew Response Generator",
+            "parameters": {
+                "resource": "chat",
+                "operation": "create",
+                "model": "gpt-4",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": None  # Rendered per crew
+                    },
+                    {
+                        "role": "user",
+                        "content": """Query: {{ $json.query }}
+
+Relevant Memories from Vector Database:
+{{ $json.similar_memories }}
+
+Please provide a comprehensive response using your expertise and the retrieved knowledge. Be specific and actionable in your response."""
+                    }
+                ],
+                "options": {
+                    "temperature": 0.7,
+                    "maxTokens": 1000
+                }
+            },
+            "position": [1120, 300],
+            "typeVersion": 1
+        },
+        {
+            "id": "memory_storage",
+            "type": "n8n-nodes-base.supabase",
+            "name": "Store New Memory",
+            "parameters": {
+                "operation": "insert",
+                "table": "crew_memories",
+                "data": {
+                    "id": "={{ $json.memory_id }}",
+                    "content": "={{ $json.query }}",
+                    "embedding": "={{ $json.query_embedding }}",
+                    "project_id": "n8n_rag_system",
+                    "crew_member": "={{ $json.crew_member }}",
+                    "memory_type": "rag_query",
+                    "importance_score": 0.7,
+                    "tags": ["rag", "query", "{{ $json.crew_member }}", "n8n_workflow"],
+                    "created_by": "n8n_rag_system"
+                }
+            },
+            "position": [900, 400],
+            "typeVersion": 1
+        },
+        {
+            "id": "response_webhook",
+            "type": "n8n-nodes-base.respondToWebhook",
+            "name": "RAG Response",
+            "parameters": {
+                "respondWith": "json",
+                "responseBody": """{
+  "crew_member": "{{ $json.crew_member }}",
+  "expertise": "{{ $json.expertise }}",
+  "query": "{{ $json.query }}",
+  "response": "{{ $json.crew_response }}",
+  "similar_memories_found": {{ $json.similar_memories_count }},
+  "rag_capabilities_used": {{ $json.rag_capabilities }},
+  "timestamp": "{{ $json.timestamp }}",
+  "memory_id": "{{ $json.memory_id }}"
+}"""
+            },
+            "position": [1340, 300],
+            "typeVersion": 1
+        }
+    ],
+    "connections": {
+        "RAG Query Trigger": {
+            "main": [
+                [{"node": "RAG Query Processor", "type": "main", "index": 0}]
+            ]
+        },
+        "RAG Query Processor": {
+            "main": [
+                [{"node": "Generate Query Embedding", "type": "main", "index": 0}],
+                [{"node": "Search Vector Database", "type": "main", "index": 0}]
+            ]
+        },
+        "Generate Query Embedding": {
+            "main": [
+                [{"node": "Search Vector Database", "type": "main", "index": 0}],
+                [{"node": "Store New Memory", "type": "main", "index": 0}]
+            ]
+        },
+        "Search Vector Database": {
+            "main": [
+                [{"node": "Crew Response Generator", "type": "main", "index": 0}]
+            ]
+        },
+        "Crew Response Generator": {
+            "main": [
+                [{"node": "RAG Response", "type": "main", "index": 0}]
+            ]
+        },
+        "Store New Memory": {
+            "main": [
+                [{"node": "RAG Response", "type": "main", "index": 0}]
+            ]
+        }
+    },
+    "active": True,
+    "settings": {
+        "executionOrder": "v1"
+    },
+    "tags": ["rag", "crew", "memory", "alex-ai"]
+}
+
+RAG_WORKFLOW_TEMPLATE = WorkflowTemplate(RAG_WORKFLOW_SKELETON)
+
+
+def _render_query_processor_code(crew_id: str, crew_info: Dict) -> str:
+    """JavaScript of a crew member's RAG Query Processor node"""
+    return f"""
+// RAG Query Processor for {crew_info['name']}
+const query = $input.first().json.query || $input.first().json.body?.query;
+const crew_member = "{crew_id}";
+const expertise = "{crew_info['expertise']}";
+const personality = "{crew_info['personality']}";
+
+// Process the query and determine RAG capabilities needed
+const rag_capabilities = {json.dumps(crew_info['rag_capabilities'])};
+
+// Generate unique memory ID
+const memoryId = `rag_${{crew_member}}_${{Date.now()}}_${{Math.random().toString(36).substr(2, 9)}}`;
+
+// Prepare query data for processing
+const queryData = {{
+    query: query,
+    crew_member: crew_member,
+    expertise: expertise,
+    personality: personality,
+    rag_capabilities: rag_capabilities,
+    memory_id: memoryId,
+    timestamp: new Date().toISOString()
+}};
+
+return queryData;
+"""
+
+
+def _render_crew_system_prompt(crew_info: Dict) -> str:
+    """System prompt of a crew member's response generator"""
+    return f"""You are {crew_info['name']} from Star Trek: The Next Generation. 
+
+Your expertise: {crew_info['expertise']}
+Your personality: {crew_info['personality']}
+Your RAG capabilities: {', '.join(crew_info['rag_capabilities'])}
+
+You have access to a comprehensive knowledge base through RAG (Retrieval-Augmented Generation) that includes:
+- Web-scraped documentation from 90+ sources
+- N8N Supabase memory database with 27+ memories
+- Vector embeddings for semantic search
+- Crew-specific expertise and knowledge
+
+Use your specialized knowledge and the provided memories to respond to queries. Maintain your character's personality and speaking style while providing comprehensive, expert-level responses."""
+
 
 class N8NRAGWorkflowGenerator:
     """Generates RAG-enhanced N8N workflows for crew memory management"""
@@ -113,8 +350,21 @@ class N8NRAGWorkflowGenerator:
             print(f"Warning: Could not load RAG research data: {e}")
             return {"web_research": {}, "memory_research": {}, "rag_integration": {}}
 
-    def generate_rag_workflows(self) -> Dict[str, Any]:
-        """Generate RAG-enhanced N8N workflows for all crew members"""
+    def _crew_variants(self, clients: Optional[List[str]] = None) -> Iterator[Tuple[str, str, Dict]]:
+        """(variant_id, crew_id, crew_info) for every crew member, then for every client's copy of the crew"""
+        for crew_id, crew_info in self.crew_members.items():
+            yield crew_id, crew_id, crew_info
+        for client in clients or []:
+            for crew_id, crew_info in self.crew_members.items():
+                yield f"{client}_{crew_id}", crew_id, {
+                    **crew_info,
+                    "client": client,
+                    "webhook_path": f"{client}-{crew_info['webhook_path']}"
+                }
+
+    def generate_rag_workflows(self, clients: Optional[List[str]] = None,
+                               output_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Generate RAG-enhanced N8N workflows for all crew members (and per-client variants)"""
         print("🚀 N8N RAG WORKFLOW GENERATOR - INITIATING")
         print("=" * 60)
         
@@ -130,26 +380,43 @@ class N8NRAGWorkflowGenerator:
         print("\n📡 GENERATING RAG-ENHANCED WORKFLOWS")
         print("-" * 50)
         
-        for crew_id, crew_info in self.crew_members.items():
-            print(f"\n👤 Generating RAG workflow for {crew_info['name']}...")
+        bundle = []
+        written = 0
+        for variant_id, crew_id, crew_info in self._crew_variants(clients):
+            label = f"{crew_info['name']} ({crew_info['client']})" if crew_info.get('client') else crew_info['name']
+            print(f"\n👤 Generating RAG workflow for {label}...")
             
             # Generate RAG workflow
             rag_workflow = self._generate_crew_rag_workflow(crew_id, crew_info)
+            bundle.append(rag_workflow)
             
-            # Save workflow to file
-            workflow_file = f"n8n-rag-workflow-{crew_id}.json"
-            with open(workflow_file, 'w') as f:
-                json.dump(rag_workflow, f, indent=2)
+            # Save workflow to file (unchanged files are left alone)
+            workflow_file = f"n8n-rag-workflow-{variant_id}.json"
+            if output_dir:
+                workflow_file = os.path.join(output_dir, workflow_file)
+            changed = write_if_changed(workflow_file, RAG_WORKFLOW_TEMPLATE.dumps(rag_workflow))
+            written += changed
             
-            workflow_results["generated_workflows"][crew_id] = {
+            workflow_results["generated_workflows"][variant_id] = {
                 "workflow_file": workflow_file,
                 "workflow_id": crew_info['workflow_id'],
                 "webhook_path": crew_info['webhook_path'],
                 "expertise": crew_info['expertise'],
                 "rag_capabilities": crew_info['rag_capabilities']
             }
+            if crew_info.get('client'):
+                workflow_results["generated_workflows"][variant_id]["client"] = crew_info['client']
             
-            print(f"  ✅ {crew_info['name']} RAG workflow generated: {workflow_file}")
+            if changed:
+                print(f"  ✅ {label} RAG workflow generated: {workflow_file}")
+            else:
+                print(f"  ⏭️  {label} RAG workflow unchanged: {workflow_file}")
+        
+        # Export every workflow in one file for bulk import
+        bundle_file = os.path.join(output_dir, DEFAULT_BUNDLE_FILE) if output_dir else DEFAULT_BUNDLE_FILE
+        write_if_changed(bundle_file, RAG_WORKFLOW_TEMPLATE.dumps(bundle))
+        workflow_results["bundle_file"] = bundle_file
+        print(f"\n📦 {len(bundle)} workflows exported to {bundle_file} ({written} files changed)")
         
         # Generate Supabase integration configuration
         print("\n🧠 GENERATING SUPABASE INTEGRATION")
@@ -171,222 +438,17 @@ class N8NRAGWorkflowGenerator:
         return workflow_results
 
     def _generate_crew_rag_workflow(self, crew_id: str, crew_info: Dict) -> Dict[str, Any]:
-        """Generate RAG-enhanced workflow for a specific crew member"""
-        
-        workflow = {
-            "name": f"{crew_info['name']} - RAG Enhanced Memory System",
-            "nodes": [
-                {
-                    "id": "webhook_trigger",
-                    "type": "n8n-nodes-base.webhook",
-                    "name": "RAG Query Trigger",
-                    "parameters": {
-                        "path": crew_info['webhook_path'],
-                        "httpMethod": "POST",
-                        "responseMode": "responseNode",
-                        "options": {}
-                    },
-                    "position": [240, 300],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "rag_query_processor",
-                    "type": "n8n-nodes-base.function",
-                    "name": "RAG Query Processor",
-                    "parameters": {
-                        "functionCode": f"""
-// RAG Query Processor for {crew_info['name']}
-const query = $input.first().json.query || $input.first().json.body?.query;
-const crew_member = "{crew_id}";
-const expertise = "{crew_info['expertise']}";
-const personality = "{crew_info['personality']}";
-
-// Process the query and determine RAG capabilities needed
-const rag_capabilities = {json.dumps(crew_info['rag_capabilities'])};
-
-// Generate unique memory ID
-const memoryId = `rag_${{crew_member}}_${{Date.now()}}_${{Math.random().toString(36).substr(2, 9)}}`;
-
-// Prepare query data for processing
-const queryData = {{
-    query: query,
-    crew_member: crew_member,
-    expertise: expertise,
-    personality: personality,
-    rag_capabilities: rag_capabilities,
-    memory_id: memoryId,
-    timestamp: new Date().toISOString()
-}};
+        """Generate RAG-enhanced workflow for a specific crew member (or a client's variant of it)"""
+        fields = {"name": f"{crew_info['name']} - RAG Enhanced Memory System"}
+        if crew_info.get('client'):
+            fields["name"] += f" ({crew_info['client']})"
+            fields["tags"] = RAG_WORKFLOW_SKELETON["tags"] + [f"client:{crew_info['client']}"]
 
-return queryData;
-"""
-                    },
-                    "position": [460, 300],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "openai_embedding",
-                    "type": "n8n-nodes-base.openAi",
-                    "name": "Generate Query Embedding",
-                    "parameters": {
-                        "resource": "embedding",
-                        "operation": "create",
-                        "model": "text-embedding-3-small",
-                        "input": "={{ $json.query }}"
-                    },
-                    "position": [680, 200],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "supabase_vector_search",
-                    "type": "n8n-nodes-base.supabase",
-                    "name": "Search Vector Database",
-                    "parameters": {
-                        "operation": "execute",
-                        "query": """
-SELECT 
-    id, content, embedding, crew_member, memory_type, importance_score,
-    1 - (embedding <=> $1::vector) as similarity_score,
-    tags, created_at
-FROM crew_memories 
-WHERE crew_member = $2 
-  AND 1 - (embedding <=> $1::vector) > 0.75
-ORDER BY embedding <=> $1::vector
-LIMIT 10
-                        """,
-                        "parameters": ["={{ $json.query_embedding }}", "={{ $json.crew_member }}"]
-                    },
-                    "position": [900, 200],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "crew_response_generator",
-                    "type": "n8n-nodes-base.openAi",
-                    "name": "Crew Response Generator",
-                    "parameters": {
-                        "resource": "chat",
-                        "operation": "create",
-                        "model": "gpt-4",
-                        "messages": [
-                            {
-                                "role": "system",
-                                "content": f"""You are {crew_info['name']} from Star Trek: The Next Generation. 
-
-Your expertise: {crew_info['expertise']}
-Your personality: {crew_info['personality']}
-Your RAG capabilities: {', '.join(crew_info['rag_capabilities'])}
-
-You have access to a comprehensive knowledge base through RAG (Retrieval-Augmented Generation) that includes:
-- Web-scraped documentation from 90+ sources
-- N8N Supabase memory database with 27+ memories
-- Vector embeddings for semantic search
-- Crew-specific expertise and knowledge
-
-Use your specialized knowledge and the provided memories to respond to queries. Maintain your character's personality and speaking style while providing comprehensive, expert-level responses."""
-                            },
-                            {
-                                "role": "user",
-                                "content": """Query: {{ $json.query }}
-
-Relevant Memories from Vector Database:
-{{ $json.similar_memories }}
-
-Please provide a comprehensive response using your expertise and the retrieved knowledge. Be specific and actionable in your response."""
-                            }
-                        ],
-                        "options": {
-                            "temperature": 0.7,
-                            "maxTokens": 1000
-                        }
-                    },
-                    "position": [1120, 300],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "memory_storage",
-                    "type": "n8n-nodes-base.supabase",
-                    "name": "Store New Memory",
-                    "parameters": {
-                        "operation": "insert",
-                        "table": "crew_memories",
-                        "data": {
-                            "id": "={{ $json.memory_id }}",
-                            "content": "={{ $json.query }}",
-                            "embedding": "={{ $json.query_embedding }}",
-                            "project_id": "n8n_rag_system",
-                            "crew_member": "={{ $json.crew_member }}",
-                            "memory_type": "rag_query",
-                            "importance_score": 0.7,
-                            "tags": ["rag", "query", "{{ $json.crew_member }}", "n8n_workflow"],
-                            "created_by": "n8n_rag_system"
-                        }
-                    },
-                    "position": [900, 400],
-                    "typeVersion": 1
-                },
-                {
-                    "id": "response_webhook",
-                    "type": "n8n-nodes-base.respondToWebhook",
-                    "name": "RAG Response",
-                    "parameters": {
-                        "respondWith": "json",
-                        "responseBody": """{
-  "crew_member": "{{ $json.crew_member }}",
-  "expertise": "{{ $json.expertise }}",
-  "query": "{{ $json.query }}",
-  "response": "{{ $json.crew_response }}",
-  "similar_memories_found": {{ $json.similar_memories_count }},
-  "rag_capabilities_used": {{ $json.rag_capabilities }},
-  "timestamp": "{{ $json.timestamp }}",
-  "memory_id": "{{ $json.memory_id }}"
-}"""
-                    },
-                    "position": [1340, 300],
-                    "typeVersion": 1
-                }
-            ],
-            "connections": {
-                "RAG Query Trigger": {
-                    "main": [
-                        [{"node": "RAG Query Processor", "type": "main", "index": 0}]
-                    ]
-                },
-                "RAG Query Processor": {
-                    "main": [
-                        [{"node": "Generate Query Embedding", "type": "main", "index": 0}],
-                        [{"node": "Search Vector Database", "type": "main", "index": 0}]
-                    ]
-                },
-                "Generate Query Embedding": {
-                    "main": [
-                        [{"node": "Search Vector Database", "type": "main", "index": 0}],
-                        [{"node": "Store New Memory", "type": "main", "index": 0}]
-                    ]
-                },
-                "Search Vector Database": {
-                    "main": [
-                        [{"node": "Crew Response Generator", "type": "main", "index": 0}]
-                    ]
-                },
-                "Crew Response Generator": {
-                    "main": [
-                        [{"node": "RAG Response", "type": "main", "index": 0}]
-                    ]
-                },
-                "Store New Memory": {
-                    "main": [
-                        [{"node": "RAG Response", "type": "main", "index": 0}]
-                    ]
-                }
-            },
-            "active": True,
-            "settings": {
-                "executionOrder": "v1"
-            },
-            "tags": ["rag", "crew", "memory", "alex-ai"]
-        }
-        
-        return workflow
+        return RAG_WORKFLOW_TEMPLATE.render(fields, {
+            "webhook_trigger": {("parameters", "path"): crew_info['webhook_path']},
+            "rag_query_processor": {("parameters", "functionCode"): _render_query_processor_code(crew_id, crew_info)},
+            "crew_response_generator": {("parameters", "messages", 0, "content"): _render_crew_system_prompt(crew_info)}
+        })
 
     def _generate_supabase_integration(self) -> Dict[str, Any]:
         """Generate Supabase integration configuration"""
@@ -538,7 +600,8 @@ curl -X POST {self.n8n_base_url}/webhook/{crew_info['webhook_path']} \\
         print("  ✅ Deployment guide generated")
         return deployment_guide
 
-    def execute_workflow_generation(self) -> Dict[str, Any]:
+    def execute_workflow_generation(self, clients: Optional[List[str]] = None,
+                                    output_dir: Optional[str] = None) -> Dict[str, Any]:
         """Execute the complete RAG workflow generation"""
         print("🚀 EXECUTING N8N RAG WORKFLOW GENERATION")
         print("=" * 60)
@@ -547,7 +610,7 @@ curl -X POST {self.n8n_base_url}/webhook/{crew_info['webhook_path']} \\
         print()
         
         # Execute workflow generation
-        results = self.generate_rag_workflows()
+        results = self.generate_rag_workflows(clients, output_dir)
         
         # Save results
         timestamp = int(datetime.now().timestamp())
@@ -564,6 +627,12 @@ curl -X POST {self.n8n_base_url}/webhook/{crew_info['webhook_path']} \\
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Generate RAG-enhanced N8N workflows for the crew")
+    parser.add_argument('--clients', help="Comma-separated client slugs; each gets its own copy of every crew workflow")
+    parser.add_argument('--output-dir', help="Directory for the workflow files (default: current directory)")
+    args = parser.parse_args()
+    clients = [client.strip() for client in args.clients.split(',') if client.strip()] if args.clients else None
+    
     print("🚀 N8N RAG WORKFLOW GENERATOR")
     print("=" * 60)
     print("Generating RAG-enhanced N8N workflows for crew memory management...")
@@ -573,7 +642,7 @@ def main():
     workflow_generator = N8NRAGWorkflowGenerator()
     
     # Execute workflow generation
-    results = workflow_generator.execute_workflow_generation()
+    results = workflow_generator.execute_workflow_generation(clients, args.output_dir)
     
     print("\n🔍 WORKFLOW GENERATION SUMMARY:")
     print("-" * 30)
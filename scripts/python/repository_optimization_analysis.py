@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Repository Optimization Analysis System
@@ -7,6 +6,7 @@ Convenes the Observation Lounge crew to analyze and optimize repository structur
 
 import os
 import json
+import argparse
 import subprocess
 from datetime import datetime
 from typing import Dict, List, Tuple
@@ -14,6 +14,10 @@ import sys
 
 # Add the alexai-base-package to the path
 sys.path.append('API_KEY_PLACEHOLDERmusician-show-tour-app/alexai-base-package')
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utilities.filesystem_inventory import FilesystemInventory, human_size
 
 try:
     from enhanced_unified_router import EnhancedUnifiedRouter
@@ -21,69 +25,85 @@ try:
 except ImportError as e:
     print(f"Warning: Could not import Alex AI components: {e}")
 
+# Names of regenerable directories and archive patterns reported as cleanup candidates
+UNNECESSARY_PATTERNS = ['node_modules', '__pycache__', '.git', 'venv', 'env', 'alexai_env', '*.tar.gz', '*.zip']
+LARGE_FILE_THRESHOLD = 10 * 1024 * 1024
+
 class RepositoryOptimizationAnalyzer:
+    def __init__(self, root_dir: str = '.', exclude_dirs: List[str] = None):
+        self.analysis_results = {}
         self.crew_insights = {}
         self.optimization_plan = {}
-        
+        self.root_dir = root_dir
+        self.exclude_dirs = exclude_dirs or []
+        self.inventory = None
+        
+    def build_inventory(self) -> FilesystemInventory:
+        """Collect sizes, file types and pattern matches in a single walk of the repository"""
+        if self.inventory is None:
+            self.inventory = FilesystemInventory(
+                self.root_dir,
+                patterns=UNNECESSARY_PATTERNS,
+                exclude_dirs=self.exclude_dirs,
+                large_file_threshold=LARGE_FILE_THRESHOLD
+            ).scan()
+        return self.inventory
+    
     def analyze_large_files(self) -> Dict:
         """Analyze files by size and type"""
         print("🔍 Analyzing large files and unnecessary directories...")
         
+        inventory = self.build_inventory()
+        for error in inventory.errors:
+            print(f"Error scanning {error}")
+        
         # Find large files (>10MB)
         large_files = []
-        try:
-            result = subprocess.run(['find', '.', '-type', 'f', '-size', '+10M', '-exec', 'ls', '-lh', '{}', ';'], 
-                                  capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 5:
-                        size = parts[4]
-                        filepath = parts[-1]
-                        large_files.append({
-                            'file': filepath,
-                            'size': size,
-                            'type': self._categorize_file(filepath)
-                        })
-        except Exception as e:
-            print(f"Error finding large files: {e}")
+        for filepath, size_bytes in inventory.large_files:
+            large_files.append({
+                'file': filepath,
+                'size': human_size(size_bytes),
+                'size_bytes': size_bytes,
+                'type': self._categorize_file(filepath)
+            })
         
         # Find unnecessary directories
         unnecessary_dirs = []
-        patterns = ['node_modules', '__pycache__', '.git', 'venv', 'env', 'alexai_env', '*.tar.gz', '*.zip']
-        
-        for pattern in patterns:
-            try:
+        for pattern in UNNECESSARY_PATTERNS:
+            for path, is_dir in inventory.pattern_matches[pattern]:
                 if pattern.startswith('*'):
                     # Handle file patterns
-                    result = subprocess.run(['find', '.', '-name', pattern], capture_output=True, text=True)
-                    for filepath in result.stdout.strip().split('\n'):
-                        if filepath:
-                            unnecessary_dirs.append({
-                                'path': filepath,
-                                'type': 'archive_file',
-                                'reason': 'Compressed archive - can be regenerated'
-                            })
+                    unnecessary_dirs.append({
+                        'path': path,
+                        'type': 'archive_file',
+                        'reason': 'Compressed archive - can be regenerated',
+                        'size_bytes': inventory.dir_sizes.get(path, 0) if is_dir else self._file_size(path)
+                    })
                 else:
                     # Handle directory patterns
-                    result = subprocess.run(['find', '.', '-name', pattern, '-type', 'd'], capture_output=True, text=True)
-                    for dirpath in result.stdout.strip().split('\n'):
-                        if dirpath:
-                            unnecessary_dirs.append({
-                                'path': dirpath,
-                                'type': 'directory',
-                                'reason': self._get_directory_reason(pattern)
-                            })
-            except Exception as e:
-                print(f"Error finding {pattern}: {e}")
+                    unnecessary_dirs.append({
+                        'path': path,
+                        'type': 'directory',
+                        'reason': self._get_directory_reason(pattern),
+                        'size_bytes': inventory.dir_sizes.get(path, 0)
+                    })
         
         return {
             'large_files': large_files,
             'unnecessary_dirs': unnecessary_dirs,
             'total_large_files': len(large_files),
-            'total_unnecessary_dirs': len(unnecessary_dirs)
+            'total_unnecessary_dirs': len(unnecessary_dirs),
+            'total_bytes': inventory.total_bytes,
+            'total_files': inventory.file_count
         }
     
+    def _file_size(self, filepath: str) -> int:
+        """Size of a file without following symlinks (0 if it vanished)"""
+        try:
+            return os.lstat(filepath).st_size
+        except OSError:
+            return 0
+    
     def _categorize_file(self, filepath: str) -> str:
         """Categorize file by type and importance"""
         if filepath.endswith('.tar.gz') or filepath.endswith('.zip'):
@@ -300,6 +320,8 @@ class RepositoryOptimizationAnalyzer:
         
         return results
     
+    def generate_optimization_report(self, analysis_data: Dict, crew_insights: Dict, 
+                                   optimization_plan: Dict, execution_results: Dict) -> str:
         """Generate comprehensive optimization report"""
         report = f"""
 # Repository Optimization Report
@@ -397,5 +419,16 @@ The Observation Lounge crew has completed a comprehensive analysis of the reposi
         }
 
 if __name__ == "__main__":
-    analyzer = RepositoryOptimizationAnalyzer()
-    results = analyzer.run_complete_optimization()
+    parser = argparse.ArgumentParser(description="Repository Optimization Analysis System")
+    parser.add_argument('--root', default='.', help='Repository root to analyze')
+    parser.add_argument('--exclude', action='append', default=[], metavar='DIR',
+                        help='Directory name to skip entirely (repeatable)')
+    parser.add_argument('--du', type=int, nargs='?', const=2, metavar='DEPTH',
+                        help='Print a du-style size tree (default depth 2) and exit without optimizing')
+    args = parser.parse_args()
+    
+    analyzer = RepositoryOptimizationAnalyzer(root_dir=args.root, exclude_dirs=args.exclude)
+    if args.du is not None:
+        print(analyzer.build_inventory().format_size_tree(max_depth=args.du))
+    else:
+        results = analyzer.run_complete_optimization()
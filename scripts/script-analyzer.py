@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Script Analyzer & Memory System
@@ -17,6 +16,13 @@ import logging
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.content_hash_index import ContentHashIndex
+from utilities.line_metrics import is_large_file, stream_line_metrics
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -53,10 +59,21 @@ class ScriptCategory:
     examples: List[str]
 
 class ScriptAnalyzer:
+    def __init__(self, scripts_dir: str = "scripts"):
+        self.scripts_dir = scripts_dir
+        self.driver = ParallelAnalysisDriver()
+        self.hash_index = ContentHashIndex()
         self.scripts_metadata: List[ScriptMetadata] = []
         self.categories = self.define_categories()
         self.memory_file = "script-memory.json"
         self.analysis_file = "script-analysis.json"
+
+    def __getstate__(self) -> Dict:
+        """Pickled state for worker processes, without the hash index connection or the pool driver"""
+        state = self.__dict__.copy()
+        state['hash_index'] = None
+        state['driver'] = None
+        return state
         
     def define_categories(self) -> Dict[str, ScriptCategory]:
         """Define script categories and their patterns"""
@@ -205,6 +222,10 @@ class ScriptAnalyzer:
             file_name = os.path.basename(file_path)
             file_type = file_path.split('.')[-1].lower()
             
+            # Very large files only get streaming line metrics
+            if is_large_file(file_stat.st_size):
+                return self.analyze_large_script(file_path, file_name, file_type, file_stat)
+            
             # Read file content
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
@@ -213,8 +234,7 @@ class ScriptAnalyzer:
             file_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
             
             # Analyze content
-            lines = content.split('\n')
-            line_count = len(lines)
+            line_count = content.count('\n') + 1
             
             # Extract functions, variables, and comments
             functions = self.extract_functions(content, file_type)
@@ -259,6 +279,38 @@ class ScriptAnalyzer:
             logger.error(f"Error analyzing {file_path}: {e}")
             return None
     
+    def analyze_large_script(self, file_path: str, file_name: str, file_type: str,
+                             file_stat: os.stat_result) -> Optional[ScriptMetadata]:
+        """Metadata from a single streaming pass for files too large for full extraction"""
+        metrics = stream_line_metrics(file_path, file_type, hash_content=True)
+        if metrics is None:
+            return None
+        
+        logger.info(f"📏 {file_name} is {file_stat.st_size} bytes, recording line metrics only")
+        # Keyword heuristics only look at the head of the file
+        category, subcategory = self.categorize_script(metrics.preview, file_name)
+        
+        return ScriptMetadata(
+            file_path=file_path,
+            file_name=file_name,
+            file_type=file_type,
+            size_bytes=file_stat.st_size,
+            line_count=metrics.total_lines,
+            created_date=datetime.fromtimestamp(file_stat.st_ctime).isoformat(),
+            modified_date=datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            hash=metrics.content_hash[:16],
+            purpose=self.determine_purpose(metrics.preview, file_name),
+            category=category,
+            subcategory=subcategory,
+            dependencies=list(set(metrics.imports)),
+            functions=[],
+            variables=[],
+            comments=[],
+            complexity_score=0,
+            tags=self.extract_tags(metrics.preview, file_name),
+            related_scripts=[]
+        )
+    
     def extract_functions(self, content: str, file_type: str) -> List[str]:
         """Extract function definitions from script content"""
         functions = []
@@ -473,15 +525,15 @@ class ScriptAnalyzer:
         
         script_files = []
         for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
+            dirs.sort()
+            for file in sorted(files):
                 if file.endswith(('.sh', '.py', '.js')):
                     script_files.append(os.path.join(root, file))
         
         logger.info(f"Found {len(script_files)} script files")
         
         self.scripts_metadata = []
-        for script_file in script_files:
-            metadata = self.analyze_script(script_file)
+        for metadata in self.driver.map(self.analyze_script, script_files):
             if metadata:
                 self.scripts_metadata.append(metadata)
                 logger.info(f"Analyzed: {metadata.file_name}")
@@ -540,21 +592,15 @@ class ScriptAnalyzer:
         """Find potentially duplicate scripts"""
         duplicates = []
         
-        # Group by hash
-        hash_groups = {}
-        for script in self.scripts_metadata:
-            if script.hash not in hash_groups:
-                hash_groups[script.hash] = []
-            hash_groups[script.hash].append(script)
-        
-        # Find groups with multiple scripts
-        for hash_val, scripts in hash_groups.items():
-            if len(scripts) > 1:
-                duplicates.append({
-                    'hash': hash_val,
-                    'scripts': [s.file_name for s in scripts],
-                    'similarity': 'exact'
-                })
+        # Group byte-identical scripts through the shared content-hash index
+        scripts_by_path = {script.file_path: script for script in self.scripts_metadata}
+        for paths in self.hash_index.duplicate_groups(scripts_by_path):
+            duplicates.append({
+                'hash': self.hash_index.full_hash(paths[0])[:16],
+                'scripts': [scripts_by_path[path].file_name for path in paths],
+                'similarity': 'exact'
+            })
+        self.hash_index.commit()
         
         # Find scripts with similar names and purposes
         for i, script1 in enumerate(self.scripts_metadata):
@@ -697,6 +743,8 @@ class ScriptAnalyzer:
         results.sort(key=lambda x: x[1], reverse=True)
         return [script for script, score in results]
 
+def main():
+    """Main function"""
     print("🔍 Script Analyzer & Memory System")
     print("=" * 50)
     
@@ -737,4 +785,3 @@ class ScriptAnalyzer:
 
 if __name__ == "__main__":
     main()
-
@@ -33,6 +33,24 @@ log_error() {
     echo -e "${RED}❌ $1${NC}"
 }
 
+# Recent workflow analyses, newest first, as "name<TAB>timestamp<TAB>source" lines.
+# The sync appends analyses to sync-run-*.jsonl / change-feed-*.jsonl; older runs wrote one file per workflow.
+recent_analyses() {
+    local limit="$1"
+    local files=()
+    local analysis_file
+    for analysis_file in "$ANALYSIS_DIR"/sync-run-*.jsonl "$ANALYSIS_DIR"/change-feed-*.jsonl "$ANALYSIS_DIR"/*-analysis-*.json; do
+        if [ -f "$analysis_file" ]; then
+            files+=("$analysis_file")
+        fi
+    done
+    if [ ${#files[@]} -eq 0 ]; then
+        return 0
+    fi
+    jq -r '[.workflow_name // "unknown", .analysis_timestamp // "", .change_source // "unknown"] | @tsv' \
+        "${files[@]}" 2>/dev/null | sort -t $'\t' -k2,2r | head -n "$limit"
+}
+
 # Generate dashboard
 generate_dashboard() {
     log_info "Generating bi-directional sync dashboard..."
@@ -204,20 +222,14 @@ EOF
     
     # Add recent changes
     local change_count=0
-    for analysis_file in "$ANALYSIS_DIR"/*-analysis-*.json; do
-        if [ -f "$analysis_file" ] && [ $change_count -lt 10 ]; then
-            local workflow_name=$(jq -r '.workflow_name' "$analysis_file")
-            local timestamp=$(jq -r '.analysis_timestamp' "$analysis_file")
-            local change_source=$(jq -r '.change_source' "$analysis_file")
-            
-            echo "                <li class=\"workflow-item\">" >> "$dashboard_file"
-            echo "                    <span class=\"status-indicator status-active\"></span>" >> "$dashboard_file"
-            echo "                    <strong>$workflow_name</strong> - $timestamp" >> "$dashboard_file"
-            echo "                    <br><small>Source: $change_source</small>" >> "$dashboard_file"
-            echo "                </li>" >> "$dashboard_file"
-            ((change_count++))
-        fi
-    done
+    while IFS=$'\t' read -r workflow_name timestamp change_source; do
+        echo "                <li class=\"workflow-item\">" >> "$dashboard_file"
+        echo "                    <span class=\"status-indicator status-active\"></span>" >> "$dashboard_file"
+        echo "                    <strong>$workflow_name</strong> - $timestamp" >> "$dashboard_file"
+        echo "                    <br><small>Source: $change_source</small>" >> "$dashboard_file"
+        echo "                </li>" >> "$dashboard_file"
+        change_count=$((change_count + 1))
+    done < <(recent_analyses 10)
     
     if [ $change_count -eq 0 ]; then
         echo "                <li class=\"workflow-item\">No recent changes detected</li>" >> "$dashboard_file"
@@ -342,17 +354,12 @@ EOF
     
     # Add recent changes
     local change_count=0
-    for analysis_file in "$ANALYSIS_DIR"/*-analysis-*.json; do
-        if [ -f "$analysis_file" ] && [ $change_count -lt 5 ]; then
-            if [ $change_count -gt 0 ]; then
-                echo "," >> "$json_file"
-            fi
-            
-            local workflow_name=$(jq -r '.workflow_name' "$analysis_file")
-            local timestamp=$(jq -r '.analysis_timestamp' "$analysis_file")
-            local change_source=$(jq -r '.change_source' "$analysis_file")
-            
-            cat >> "$json_file" << EOF
+    while IFS=$'\t' read -r workflow_name timestamp change_source; do
+        if [ $change_count -gt 0 ]; then
+            echo "," >> "$json_file"
+        fi
+        
+        cat >> "$json_file" << EOF
     {
       "workflow_name": "$workflow_name",
       "timestamp": "$timestamp",
@@ -360,9 +367,8 @@ EOF
       "status": "synced"
     }
 EOF
-            ((change_count++))
-        fi
-    done
+        change_count=$((change_count + 1))
+    done < <(recent_analyses 5)
     
     cat >> "$json_file" << EOF
   ],
@@ -417,14 +423,10 @@ EOF
     
     # Add recent activity
     local activity_count=0
-    for analysis_file in "$ANALYSIS_DIR"/*-analysis-*.json; do
-        if [ -f "$analysis_file" ] && [ $activity_count -lt 10 ]; then
-            local workflow_name=$(jq -r '.workflow_name' "$analysis_file")
-            local timestamp=$(jq -r '.analysis_timestamp' "$analysis_file")
-            echo "- **$workflow_name**: $timestamp" >> "$summary_file"
-            ((activity_count++))
-        fi
-    done
+    while IFS=$'\t' read -r workflow_name timestamp change_source; do
+        echo "- **$workflow_name**: $timestamp" >> "$summary_file"
+        activity_count=$((activity_count + 1))
+    done < <(recent_analyses 10)
     
     cat >> "$summary_file" << EOF
 
@@ -1,4 +1,3 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Update Script References
@@ -7,18 +6,33 @@ Update script references and dependencies after consolidation
 """
 
 import os
-import re
+import sys
 import json
+import argparse
 from typing import Dict, List, Set
 import logging
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.repository_scanner import RepositoryScanner
+from utilities.parallel_analysis import ParallelAnalysisDriver
+from utilities.reference_rewriter import ReferenceRewriter, RewriteResult, unified_diff
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class ScriptReferenceUpdater:
+    def __init__(self, scripts_dir: str = "scripts", dry_run: bool = False):
+        self.scripts_dir = scripts_dir
+        self.dry_run = dry_run
+        self.scanner = RepositoryScanner(scripts_dir, extensions=('.sh', '.py', '.js'))
+        self.driver = ParallelAnalysisDriver()
         self.consolidation_mapping = self.load_consolidation_mapping()
+        self.rewriter = self.build_rewriter()
         self.updated_files = []
+        self.diffs = []
         
     def load_consolidation_mapping(self) -> Dict:
         """Load consolidation mapping from plan"""
@@ -30,147 +44,84 @@ class ScriptReferenceUpdater:
             logger.error(f"Error loading consolidation mapping: {e}")
             return {}
     
+    def build_rewriter(self) -> ReferenceRewriter:
+        """Compile the consolidation plan into old-name -> new-reference lookups"""
+        script_paths = {}
+        module_paths = {}
+        
+        for category, data in self.consolidation_mapping.items():
+            subcategory_groups = data.get('subcategory_groups', {})
+            for subcategory, scripts in subcategory_groups.items():
+                for script in scripts:
+                    name = script.get('name')
+                    if not name:
+                        continue
+                    # The first group that lists a script wins, as in the plan's own ordering
+                    script_paths.setdefault(name, f"scripts/{category}/{subcategory}/consolidated_{subcategory}.py")
+                    if name.endswith('.py'):
+                        module_paths.setdefault(name[:-3], f"scripts.{category}.{subcategory}.consolidated_{subcategory}")
+        
+        return ReferenceRewriter(script_paths, module_paths)
+    
     def update_all_references(self) -> bool:
         """Update all script references in the codebase"""
         try:
             logger.info("Updating script references...")
             
-            # Update script files
-            self.update_script_files()
+            # Rewrite scripts, documentation and configuration files in one parallel sweep
+            self.rewrite_files(self.scanner.file_paths() + self.get_documentation_files() + self.get_config_files())
             
             # Update package.json scripts
             self.update_package_json()
             
-            # Update documentation files
-            self.update_documentation()
-            
-            # Update configuration files
-            self.update_config_files()
-            
-            logger.info(f"Updated references in {len(self.updated_files)} files")
+            action = "Would update" if self.dry_run else "Updated"
+            logger.info(f"{action} references in {len(self.updated_files)} files")
             return True
             
         except Exception as e:
             logger.error(f"Error updating references: {e}")
             return False
     
-    def update_script_files(self):
-        """Update references in script files"""
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    self.update_file_references(file_path)
+    def rewrite_files(self, file_paths: List[str]):
+        """Rewrite references in many files across the worker pool"""
+        results = self.driver.starmap(self.rewriter.rewrite_file,
+                                      [(file_path, self.dry_run) for file_path in file_paths])
+        for result in results:
+            if result:
+                self.record_result(result)
+    
+    def record_result(self, result: RewriteResult):
+        """Track a rewritten (or, in dry-run mode, diffed) file"""
+        self.updated_files.append(result.file_path)
+        if result.written:
+            self.scanner.forget(result.file_path)
+            logger.info(f"Updated {result.replacements} references in: {result.file_path}")
+        else:
+            self.diffs.append(result.diff)
     
     def update_file_references(self, file_path: str):
         """Update references in a single file"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            # Update script references
-            content = self.update_script_calls(content)
-            
-            # Update import statements
-            content = self.update_imports(content)
-            
-            # Update relative paths
-            content = self.update_relative_paths(content)
-            
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                self.updated_files.append(file_path)
-                logger.info(f"Updated references in: {file_path}")
+            result = self.rewriter.rewrite_file(file_path, self.dry_run)
+            if result:
+                self.record_result(result)
                 
         except Exception as e:
             logger.error(f"Error updating file {file_path}: {e}")
     
     def update_script_calls(self, content: str) -> str:
-        """Update script calls to use new paths"""
-        # Pattern for script calls
-        patterns = [
-            r'\./scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
-            r'scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
-            r'python3 scripts/([a-zA-Z0-9_-]+\.py)',
-            r'bash scripts/([a-zA-Z0-9_-]+\.sh)',
-            r'node scripts/([a-zA-Z0-9_-]+\.js)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                old_path = f"scripts/{match}"
-                new_path = self.get_new_script_path(match)
-                if new_path and new_path != old_path:
-                    content = content.replace(old_path, new_path)
-        
-        return content
-    
-    def update_imports(self, content: str) -> str:
-        """Update import statements"""
-        # Python imports
-        python_patterns = [
-            r'from scripts\.([a-zA-Z0-9_-]+) import',
-            r'import scripts\.([a-zA-Z0-9_-]+)',
-            r'from \.\.scripts\.([a-zA-Z0-9_-]+) import'
-        ]
-        
-        for pattern in python_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                old_import = f"scripts.{match}"
-                new_import = self.get_new_import_path(match)
-                if new_import:
-                    content = content.replace(old_import, new_import)
-        
-        return content
-    
-    def update_relative_paths(self, content: str) -> str:
-        """Update relative paths to scripts"""
-        # Update relative paths
-        path_patterns = [
-            r'\.\./scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
-            r'\./scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))'
-        ]
-        
-        for pattern in path_patterns:
-            matches = re.findall(pattern, content)
-            for match in matches:
-                old_path = f"scripts/{match}"
-                new_path = self.get_new_script_path(match)
-                if new_path and new_path != old_path:
-                    content = content.replace(old_path, new_path)
-        
-        return content
+        """Update script paths and imports in a piece of text"""
+        return self.rewriter.rewrite_text(content)[0]
     
     def get_new_script_path(self, script_name: str) -> str:
         """Get new path for a script after consolidation"""
-        # Check if script was consolidated
-        for category, data in self.consolidation_mapping.items():
-            subcategory_groups = data.get('subcategory_groups', {})
-            for subcategory, scripts in subcategory_groups.items():
-                for script in scripts:
-                    if script.get('name') == script_name:
-                        return f"scripts/{category}/{subcategory}/consolidated_{subcategory}.py"
-        
         # If not consolidated, return original path
-        return f"scripts/{script_name}"
+        return self.rewriter.script_paths.get(script_name, f"scripts/{script_name}")
     
     def get_new_import_path(self, module_name: str) -> str:
         """Get new import path for a module"""
-        # Check if module was consolidated
-        for category, data in self.consolidation_mapping.items():
-            subcategory_groups = data.get('subcategory_groups', {})
-            for subcategory, scripts in subcategory_groups.items():
-                for script in scripts:
-                    if script.get('name') == f"{module_name}.py":
-                        return f"scripts.{category}.{subcategory}.consolidated_{subcategory}"
-        
         # If not consolidated, return original path
-        return f"scripts.{module_name}"
+        return self.rewriter.module_paths.get(module_name, f"scripts.{module_name}")
     
     def update_package_json(self):
         """Update package.json script references"""
@@ -192,37 +143,39 @@ class ScriptReferenceUpdater:
                 
                 if updated:
                     package_data['scripts'] = scripts
-                    with open(package_json_path, 'w') as f:
-                        json.dump(package_data, f, indent=2)
+                    if self.dry_run:
+                        with open(package_json_path, 'r') as f:
+                            original_text = f.read()
+                        self.diffs.append(unified_diff(package_json_path, original_text,
+                                                       json.dumps(package_data, indent=2)))
+                    else:
+                        with open(package_json_path, 'w') as f:
+                            json.dump(package_data, f, indent=2)
+                        logger.info("Updated package.json scripts")
                     self.updated_files.append(package_json_path)
-                    logger.info("Updated package.json scripts")
                     
             except Exception as e:
                 logger.error(f"Error updating package.json: {e}")
     
-    def update_documentation(self):
-        """Update documentation files"""
+    def get_documentation_files(self) -> List[str]:
+        """Documentation files that may reference scripts"""
         doc_files = [
             "README.md",
             "ALEX_AI_ENABLED_SUMMARY.md",
             "SCRIPT_MEMORY_SYSTEM_SUMMARY.md"
         ]
         
-        for doc_file in doc_files:
-            if os.path.exists(doc_file):
-                self.update_file_references(doc_file)
+        return [doc_file for doc_file in doc_files if os.path.exists(doc_file)]
     
-    def update_config_files(self):
-        """Update configuration files"""
+    def get_config_files(self) -> List[str]:
+        """Configuration files that may reference scripts"""
         config_files = [
             "turbo.json",
             "vercel.json",
             "pnpm-workspace.yaml"
         ]
         
-        for config_file in config_files:
-            if os.path.exists(config_file):
-                self.update_file_references(config_file)
+        return [config_file for config_file in config_files if os.path.exists(config_file)]
     
     def create_script_index(self) -> bool:
         """Create an index of all scripts for easy reference"""
@@ -245,15 +198,14 @@ class ScriptReferenceUpdater:
                         }
             
             # Index remaining scripts
-            for root, dirs, files in os.walk(self.scripts_dir):
-                for file in files:
-                    if file.endswith(('.sh', '.py', '.js')) and not file.startswith('consolidated_'):
-                        file_path = os.path.join(root, file)
-                        relative_path = os.path.relpath(file_path, self.scripts_dir)
-                        script_index["remaining_scripts"][file] = {
-                            "path": relative_path,
-                            "category": self.determine_script_category(file)
-                        }
+            for file_path in self.scanner.file_paths():
+                file = os.path.basename(file_path)
+                if not file.startswith('consolidated_'):
+                    relative_path = os.path.relpath(file_path, self.scripts_dir)
+                    script_index["remaining_scripts"][file] = {
+                        "path": relative_path,
+                        "category": self.determine_script_category(file)
+                    }
             
             # Save index
             with open('scripts/script-index.json', 'w') as f:
@@ -283,18 +235,35 @@ class ScriptReferenceUpdater:
         else:
             return 'utilities'
 
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Update script references after consolidation")
+    parser.add_argument('--dry-run', action='store_true', help='Show a unified diff instead of rewriting files')
+    parser.add_argument('--diff-file', help='Also write the dry-run diff to this file')
+    args = parser.parse_args()
+    
     print("🔄 Updating Script References")
     print("=" * 40)
     
-    updater = ScriptReferenceUpdater()
+    updater = ScriptReferenceUpdater(dry_run=args.dry_run)
     
     # Update all references
     if updater.update_all_references():
-        print("✅ Script references updated successfully")
+        print("✅ Script references updated successfully" if not args.dry_run else "✅ Dry run complete")
     else:
         print("❌ Error updating script references")
         return
     
+    if args.dry_run:
+        diff = ''.join(updater.diffs)
+        print(diff)
+        if args.diff_file:
+            with open(args.diff_file, 'w') as f:
+                f.write(diff)
+            print(f"📄 Diff saved to {args.diff_file}")
+        print(f"\n📊 Files that would change: {len(updater.updated_files)}")
+        return
+    
     # Create script index
     if updater.create_script_index():
         print("✅ Script index created")
@@ -314,11 +283,3 @@ class ScriptReferenceUpdater:
 
 if __name__ == "__main__":
     main()
-
-
-
-
-
-
-
-
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Analysis Cache
+==============
+Persistent SQLite cache for per-file analysis results.
+
+Entries are keyed by (content key, analyzer version) so a result is reused
+only for byte-identical input analyzed by the same analyzer logic. Each entry
+records how long the original analysis took, which lets callers report the
+time a warm run saved.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+from typing import Any, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class AnalysisCache:
+    """Content-hash keyed store of JSON-serializable analysis results"""
+
+    def __init__(self, cache_file: str, analyzer_version: str):
+        self.cache_file = cache_file
+        self.analyzer_version = analyzer_version
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+        cache_dir = os.path.dirname(cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self.connection = sqlite3.connect(cache_file)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                content_key TEXT NOT NULL,
+                analyzer_version TEXT NOT NULL,
+                payload TEXT,
+                elapsed REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (content_key, analyzer_version)
+            )
+        """)
+        self.connection.commit()
+
+    def get(self, content_key: str, default: Any = None) -> Any:
+        """Return the cached payload for a key, counting the hit or miss"""
+        row = self.connection.execute(
+            "SELECT payload, elapsed FROM analysis_cache WHERE content_key = ? AND analyzer_version = ?",
+            (content_key, self.analyzer_version)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.time_saved += row[1]
+        return json.loads(row[0])
+
+    def lookup(self, content_key: str) -> Tuple[bool, Any]:
+        """Return (found, payload); a cached ``None`` result counts as found"""
+        payload = self.get(content_key, _MISSING)
+        return (payload is not _MISSING), (None if payload is _MISSING else payload)
+
+    def put(self, content_key: str, payload: Any, elapsed: float):
+        """Store a payload (``None`` is allowed, e.g. for unparseable files)"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)",
+            (content_key, self.analyzer_version, json.dumps(payload), elapsed, time.time())
+        )
+
+    def commit(self):
+        """Flush pending writes to disk"""
+        self.connection.commit()
+
+    def prune_other_versions(self) -> int:
+        """Delete entries written by other analyzer versions"""
+        cursor = self.connection.execute(
+            "DELETE FROM analysis_cache WHERE analyzer_version != ?", (self.analyzer_version,)
+        )
+        self.connection.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and time saved for this run"""
+        lookups = self.hits + self.misses
+        return {
+            "cache_file": self.cache_file,
+            "analyzer_version": self.analyzer_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "time_saved_seconds": round(self.time_saved, 3)
+        }
+
+    def close(self):
+        """Commit and close the database"""
+        self.connection.commit()
+        self.connection.close()
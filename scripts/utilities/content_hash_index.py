@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Content Hash Index
+==================
+Persistent (size, partial hash, full hash) index of file contents shared by
+the duplicate-detection tools.
+
+Hashes are computed lazily and in tiers: files are first grouped by size,
+only same-size files get a partial hash (first and last block), and only
+files whose size and partial hash both collide are hashed in full. Entries
+are keyed by path and invalidated when size or mtime change, so a repeat
+scan of an unchanged tree costs one ``stat`` per file. Given an executor,
+``duplicate_groups`` reads and hashes each tier's files on its threads.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from dataclasses import dataclass
+from concurrent.futures import Executor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_FILE = "content-hash-index.sqlite"
+DEFAULT_EXCLUDE_DIRS = ('.git', 'node_modules', '__pycache__', '.turbo')
+PARTIAL_BLOCK_SIZE = 4096
+FULL_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def read_partial_hash(file_path: str, size: int) -> Optional[str]:
+    """SHA-256 of the first and last block of a file of the given size"""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read(PARTIAL_BLOCK_SIZE)
+            if size > 2 * PARTIAL_BLOCK_SIZE:
+                f.seek(-PARTIAL_BLOCK_SIZE, os.SEEK_END)
+                data += f.read(PARTIAL_BLOCK_SIZE)
+            elif size > PARTIAL_BLOCK_SIZE:
+                data += f.read()
+    except OSError as e:
+        logger.error(f"Error hashing {file_path}: {e}")
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_full_hash(file_path: str) -> Optional[str]:
+    """SHA-256 of a whole file, read in chunks"""
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FULL_HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError as e:
+        logger.error(f"Error hashing {file_path}: {e}")
+        return None
+    return digest.hexdigest()
+
+
+@dataclass
+class IndexEntry:
+    """Indexed state of one file"""
+    size: int
+    mtime_ns: int
+    partial_hash: Optional[str] = None
+    full_hash: Optional[str] = None
+
+
+class ContentHashIndex:
+    """Incrementally maintained content-hash index with a duplicate-group query API"""
+
+    def __init__(self, index_file: str = DEFAULT_INDEX_FILE):
+        self.index_file = index_file
+        self.stat_calls = 0
+        self.partial_hashes = 0
+        self.full_hashes = 0
+
+        index_dir = os.path.dirname(index_file)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+        self.connection = sqlite3.connect(index_file)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS content_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                partial_hash TEXT,
+                full_hash TEXT,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self.connection.commit()
+
+        self.entries: Dict[str, IndexEntry] = {
+            path: IndexEntry(size, mtime_ns, partial_hash, full_hash)
+            for path, size, mtime_ns, partial_hash, full_hash in self.connection.execute(
+                "SELECT path, size, mtime_ns, partial_hash, full_hash FROM content_hashes"
+            )
+        }
+        self._dirty = set()
+        self._removed = set()
+        self._checked = set()  # keys already stat'ed by this instance
+        self._index_key = os.path.abspath(index_file)
+
+    def refresh(self, file_path: str, stat_result: os.stat_result = None) -> Optional[IndexEntry]:
+        """Bring one file's entry up to date, dropping its hashes if size or mtime changed"""
+        key = os.path.abspath(file_path)
+        if stat_result is None:
+            if key in self._checked:
+                return self.entries.get(key)
+            try:
+                stat_result = os.stat(file_path)
+                self.stat_calls += 1
+            except OSError:
+                self.forget(file_path)
+                return None
+
+        self._checked.add(key)
+        entry = self.entries.get(key)
+        if entry and entry.size == stat_result.st_size and entry.mtime_ns == stat_result.st_mtime_ns:
+            return entry
+
+        entry = IndexEntry(size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns)
+        self.entries[key] = entry
+        self._dirty.add(key)
+        self._removed.discard(key)
+        return entry
+
+    def forget(self, file_path: str):
+        """Drop a file from the index (e.g. after deleting or rewriting it)"""
+        key = os.path.abspath(file_path)
+        if self.entries.pop(key, None) is not None:
+            self._removed.add(key)
+        self._dirty.discard(key)
+        self._checked.discard(key)
+
+    def scan(self, root_dir: str, extensions: Tuple[str, ...] = None,
+             exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS) -> List[str]:
+        """Walk a tree, refresh every file's entry and prune entries for files that disappeared"""
+        exclude_dirs = set(exclude_dirs)
+        file_paths = []
+        skipped_dirs = []  # excluded or unreadable subtrees, whose entries must survive the prune
+        pending = [root_dir]
+
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    dir_entries = sorted(entries, key=lambda entry: entry.name)
+            except OSError as e:
+                logger.error(f"Error scanning {directory}: {e}")
+                skipped_dirs.append(directory)
+                continue
+
+            subdirectories = []
+            for dir_entry in dir_entries:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    if dir_entry.name in exclude_dirs:
+                        skipped_dirs.append(dir_entry.path)
+                    else:
+                        subdirectories.append(dir_entry.path)
+                elif dir_entry.is_file(follow_symlinks=False):
+                    if extensions is not None and not dir_entry.name.endswith(extensions):
+                        continue
+                    if os.path.abspath(dir_entry.path) == self._index_key:
+                        continue
+                    try:
+                        stat_result = dir_entry.stat(follow_symlinks=False)
+                        self.stat_calls += 1
+                    except OSError:
+                        continue
+                    self.refresh(dir_entry.path, stat_result)
+                    file_paths.append(dir_entry.path)
+
+            # Depth-first in name order so results are stable between runs
+            pending.extend(reversed(subdirectories))
+
+        # Only prune what this walk could have seen: another caller may scan the excluded subtrees
+        root_prefix = os.path.join(os.path.abspath(root_dir), '')
+        skipped_prefixes = tuple(os.path.join(os.path.abspath(path), '') for path in skipped_dirs)
+        seen = {os.path.abspath(path) for path in file_paths}
+        for key in [key for key in self.entries
+                    if key.startswith(root_prefix) and key not in seen and not key.startswith(skipped_prefixes)]:
+            if extensions is None or key.endswith(extensions):
+                self.forget(key)
+
+        return file_paths
+
+    def partial_hash(self, file_path: str) -> Optional[str]:
+        """Hash of the first and last block of a file (the whole file if it is small)"""
+        entry = self.refresh(file_path)
+        if entry is None:
+            return None
+        if entry.partial_hash is None:
+            partial = read_partial_hash(file_path, entry.size)
+            if partial is None:
+                return None
+            self._store_partial_hash(file_path, entry, partial)
+        return entry.partial_hash
+
+    def _store_partial_hash(self, file_path: str, entry: IndexEntry, partial: str):
+        entry.partial_hash = partial
+        if entry.size <= 2 * PARTIAL_BLOCK_SIZE:
+            # The partial hash already covers every byte
+            entry.full_hash = partial
+        self.partial_hashes += 1
+        self._dirty.add(os.path.abspath(file_path))
+
+    def full_hash(self, file_path: str) -> Optional[str]:
+        """SHA-256 of the whole file, reused while size and mtime are unchanged"""
+        entry = self.refresh(file_path)
+        if entry is None:
+            return None
+        if entry.full_hash is None and entry.size <= 2 * PARTIAL_BLOCK_SIZE:
+            self.partial_hash(file_path)  # Small files are covered completely by the partial hash
+        if entry.full_hash is None:
+            full = read_full_hash(file_path)
+            if full is None:
+                return None
+            self._store_full_hash(file_path, entry, full)
+        return entry.full_hash
+
+    def _store_full_hash(self, file_path: str, entry: IndexEntry, full: str):
+        entry.full_hash = full
+        self.full_hashes += 1
+        self._dirty.add(os.path.abspath(file_path))
+
+    def prefetch_hashes(self, file_paths: Iterable[str], executor: Executor, full: bool = False):
+        """Compute missing partial (or full) hashes for many files on an executor's threads.
+
+        Only the reading and hashing runs on the threads; index entries are
+        updated on the calling thread.
+        """
+        pending = []
+        for file_path in file_paths:
+            entry = self.refresh(file_path)
+            if entry is None:
+                continue
+            if full and entry.full_hash is None and entry.size > 2 * PARTIAL_BLOCK_SIZE:
+                pending.append((file_path, entry))
+            elif not full and entry.partial_hash is None:
+                pending.append((file_path, entry))
+
+        if full:
+            digests = executor.map(lambda item: read_full_hash(item[0]), pending)
+        else:
+            digests = executor.map(lambda item: read_partial_hash(item[0], item[1].size), pending)
+
+        for (file_path, entry), digest in zip(pending, digests):
+            if digest is None:
+                continue
+            if full:
+                self._store_full_hash(file_path, entry, digest)
+            else:
+                self._store_partial_hash(file_path, entry, digest)
+
+    def duplicate_groups(self, file_paths: Iterable[str], min_size: int = 0,
+                         executor: Executor = None) -> List[List[str]]:
+        """Groups of byte-identical files among the given paths.
+
+        Groups keep the input order of their members and are ordered by their
+        first member. Only files that share a size (and then a partial hash)
+        are read at all. With an ``executor``, each tier is hashed in parallel.
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        by_size: Dict[int, List[str]] = {}
+        for file_path in file_paths:
+            entry = self.refresh(file_path)
+            if entry is not None and entry.size >= min_size:
+                by_size.setdefault(entry.size, []).append(file_path)
+
+        same_size_groups = [same_size for same_size in by_size.values() if len(same_size) > 1]
+        if executor is not None:
+            self.prefetch_hashes((path for group in same_size_groups for path in group), executor)
+
+        candidate_groups = []
+        for same_size in same_size_groups:
+            by_partial: Dict[str, List[str]] = {}
+            for file_path in same_size:
+                partial = self.partial_hash(file_path)
+                if partial is not None:
+                    by_partial.setdefault(partial, []).append(file_path)
+            candidate_groups.extend(candidates for candidates in by_partial.values() if len(candidates) > 1)
+
+        if executor is not None:
+            self.prefetch_hashes((path for group in candidate_groups for path in group), executor, full=True)
+
+        groups: Dict[str, List[str]] = {}
+        for candidates in candidate_groups:
+            for file_path in candidates:
+                full = self.full_hash(file_path)
+                if full is not None:
+                    groups.setdefault(full, []).append(file_path)
+
+        order = {file_path: position for position, file_path in enumerate(file_paths)}
+        duplicate_groups = [sorted(group, key=order.get) for group in groups.values() if len(group) > 1]
+        duplicate_groups.sort(key=lambda group: order[group[0]])
+        return duplicate_groups
+
+    def commit(self):
+        """Write changed entries to disk"""
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO content_hashes VALUES (?, ?, ?, ?, ?, ?)",
+            [(key, entry.size, entry.mtime_ns, entry.partial_hash, entry.full_hash, now)
+             for key, entry in ((key, self.entries[key]) for key in self._dirty)]
+        )
+        self.connection.executemany(
+            "DELETE FROM content_hashes WHERE path = ?", [(key,) for key in self._removed]
+        )
+        self.connection.commit()
+        self._dirty.clear()
+        self._removed.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """I/O performed by this index instance"""
+        return {
+            "index_file": self.index_file,
+            "indexed_files": len(self.entries),
+            "stat_calls": self.stat_calls,
+            "partial_hashes": self.partial_hashes,
+            "full_hashes": self.full_hashes
+        }
+
+    def close(self):
+        """Commit and close the database"""
+        self.commit()
+        self.connection.close()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Debounced Queue
+===============
+Key-coalescing work queue with a single worker thread.
+
+Each ``push(key)`` (re)schedules the key to run ``delay`` seconds after its
+most recent push, so a burst of events for one key (an editor saving a
+workflow several times) is handled once, after the burst. ``max_delay``
+bounds how long a key that keeps changing can be held back. Keys are
+handled one at a time, in due order, by ``handler(key)``. A failing handler
+is logged and does not stop the worker.
+"""
+
+import time
+import heapq
+import logging
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DebouncedQueue:
+    """Run ``handler(key)`` once per burst of pushes of the same key"""
+
+    def __init__(self, handler: Callable[[Hashable], None], delay: float = 1.0, max_delay: float = 10.0):
+        self.handler = handler
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self._condition = threading.Condition()
+        self._due: Dict[Hashable, float] = {}        # key -> when it runs
+        self._first_push: Dict[Hashable, float] = {}  # key -> first push of the pending burst
+        self._heap = []                               # (due, key); stale entries are skipped
+        self._stopped = False
+        self.pushed = 0
+        self.handled = 0
+        self.failed = 0
+        self._worker = threading.Thread(target=self._run, name="debounced-queue", daemon=True)
+        self._worker.start()
+
+    def push(self, key: Hashable):
+        """Schedule a key; pushes within ``delay`` of each other are coalesced"""
+        now = time.monotonic()
+        with self._condition:
+            first = self._first_push.setdefault(key, now)
+            due = min(now + self.delay, first + self.max_delay)
+            self._due[key] = due
+            heapq.heappush(self._heap, (due, key))
+            self.pushed += 1
+            self._condition.notify()
+
+    def pending(self) -> int:
+        """Keys waiting to be handled"""
+        with self._condition:
+            return len(self._due)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return {'pushed': self.pushed, 'pending': len(self._due), 'handled': self.handled, 'failed': self.failed}
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """Stop the worker, first handling every pending key unless ``drain`` is False"""
+        with self._condition:
+            if drain:
+                self._heap = [(0.0, key) for key in self._due]
+                self._due = {key: 0.0 for key in self._due}
+                heapq.heapify(self._heap)
+            else:
+                self._heap, self._due = [], {}
+            self._stopped = True
+            self._condition.notify()
+        self._worker.join(timeout)
+
+    def _next_key(self) -> Optional[Hashable]:
+        """Block until a key is due (or the queue is stopped and empty)"""
+        with self._condition:
+            while True:
+                while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+                    heapq.heappop(self._heap)  # Superseded by a later push
+                if self._heap:
+                    due, key = self._heap[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0 or self._stopped:
+                        heapq.heappop(self._heap)
+                        del self._due[key]
+                        self._first_push.pop(key, None)
+                        return key
+                    self._condition.wait(wait)
+                elif self._stopped:
+                    return None
+                else:
+                    self._condition.wait()
+
+    def _run(self):
+        while True:
+            key = self._next_key()
+            if key is None:
+                return
+            try:
+                self.handler(key)
+                with self._condition:
+                    self.handled += 1
+            except Exception as e:
+                logger.error(f"Handler failed for {key}: {e}")
+                with self._condition:
+                    self.failed += 1
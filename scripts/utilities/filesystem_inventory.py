@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Filesystem Inventory
+====================
+Single-traversal, in-process inventory of a directory tree.
+
+One ``os.scandir`` walk collects everything the cleanup and optimization
+tools used to gather with separate ``find``/``ls``/``du`` subprocesses:
+- exact byte totals per directory (apparent size of regular files, like ``du -b``);
+- per-extension file counts and sizes;
+- files above a size threshold;
+- entries whose names match cleanup patterns (``node_modules``, ``*.zip``, ...).
+
+Excluded directories are pruned without being entered. Symlinks are never
+followed.
+"""
+
+import os
+import re
+import math
+import fnmatch
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIZE_UNITS = 'KMGTPE'
+
+
+def human_size(size_bytes: int) -> str:
+    """Size in ``ls -lh`` notation (1024-based, rounded up, e.g. ``512``, ``4.0K``, ``15M``)"""
+    if size_bytes < 1024:
+        return str(size_bytes)
+    value = float(size_bytes)
+    for unit in SIZE_UNITS:
+        value /= 1024
+        if value < 10:
+            rounded = math.ceil(value * 10) / 10
+            if rounded < 10:
+                return f"{rounded:.1f}{unit}"
+        if math.ceil(value) < 1024 or unit == SIZE_UNITS[-1]:
+            return f"{math.ceil(value)}{unit}"
+    return str(size_bytes)
+
+
+class FilesystemInventory:
+    """Sizes, types and pattern matches for a tree, gathered in one walk"""
+
+    def __init__(self, root_dir: str = '.', patterns: Iterable[str] = (), exclude_dirs: Iterable[str] = (),
+                 large_file_threshold: int = 10 * 1024 * 1024):
+        self.root_dir = root_dir
+        self.patterns = list(patterns)
+        self.exclude_dirs = set(exclude_dirs)
+        self.large_file_threshold = large_file_threshold
+
+        # Plain names (e.g. node_modules) match directories; glob patterns (e.g. *.zip) match any entry
+        self.directory_names = {pattern for pattern in self.patterns if not any(c in pattern for c in '*?[')}
+        self.glob_patterns = [(pattern, re.compile(fnmatch.translate(pattern)).match)
+                              for pattern in self.patterns if pattern not in self.directory_names]
+
+        self.dir_sizes: Dict[str, int] = {}
+        self.dir_depths: Dict[str, int] = {}
+        self.dir_order: List[str] = []  # Post-order (children before parents), like du
+        self.type_totals: Dict[str, List[int]] = {}  # extension -> [file count, bytes]
+        self.large_files: List[Tuple[str, int]] = []
+        self.pattern_matches: Dict[str, List[Tuple[str, bool]]] = {pattern: [] for pattern in self.patterns}
+        self.file_count = 0
+        self.total_bytes = 0
+        self.errors: List[str] = []
+
+    def scan(self) -> 'FilesystemInventory':
+        """Walk the tree once and fill in every statistic"""
+        self.total_bytes = self._walk(self.root_dir, 0)
+        logger.info(f"Inventoried {self.file_count} files in {len(self.dir_sizes)} directories "
+                    f"({human_size(self.total_bytes)})")
+        return self
+
+    def _walk(self, directory: str, depth: int) -> int:
+        """Scan one directory, recurse into subdirectories and return the bytes beneath it"""
+        try:
+            with os.scandir(directory) as entries:
+                dir_entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError as e:
+            self.errors.append(f"{directory}: {e}")
+            logger.error(f"Error scanning {directory}: {e}")
+            dir_entries = []
+
+        total = 0
+        for entry in dir_entries:
+            for pattern, match in self.glob_patterns:
+                if match(entry.name):
+                    self.pattern_matches[pattern].append((entry.path, entry.is_dir(follow_symlinks=False)))
+
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in self.directory_names:
+                        self.pattern_matches[entry.name].append((entry.path, True))
+                    if entry.name in self.exclude_dirs:
+                        continue  # Reported if it matches a pattern, but never entered or sized
+                    total += self._walk(entry.path, depth + 1)
+                elif entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    total += size
+                    self.file_count += 1
+
+                    extension = os.path.splitext(entry.name)[1].lower() or '(none)'
+                    totals = self.type_totals.setdefault(extension, [0, 0])
+                    totals[0] += 1
+                    totals[1] += size
+
+                    if size > self.large_file_threshold:
+                        self.large_files.append((entry.path, size))
+            except OSError as e:
+                self.errors.append(f"{entry.path}: {e}")
+
+        self.dir_sizes[directory] = total
+        self.dir_depths[directory] = depth
+        self.dir_order.append(directory)
+        return total
+
+    def size_tree(self, max_depth: Optional[int] = None, min_bytes: int = 0) -> List[Tuple[str, int]]:
+        """(directory, bytes) pairs in du order, optionally limited in depth and size"""
+        return [(directory, self.dir_sizes[directory]) for directory in self.dir_order
+                if (max_depth is None or self.dir_depths[directory] <= max_depth)
+                and self.dir_sizes[directory] >= min_bytes]
+
+    def format_size_tree(self, max_depth: Optional[int] = None, min_bytes: int = 0,
+                         human_readable: bool = True) -> str:
+        """du-style listing: one ``SIZE<TAB>PATH`` line per directory"""
+        return '\n'.join(f"{human_size(size) if human_readable else size}\t{directory}"
+                         for directory, size in self.size_tree(max_depth, min_bytes))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Latency Histogram
+=================
+Rolling latency histogram with percentile queries for the monitoring tools.
+
+Samples fall into log-spaced buckets (each bucket 10% wider than the one
+before, from 1 ms to 2 minutes), so a percentile is read from the bucket
+counts in O(buckets). The answer is the upper bound of its bucket, at most
+10% above the true value. Only the most recent ``window`` samples count: the
+bucket of every sample is kept in a deque, and the oldest is subtracted
+when a new sample pushes it out.
+"""
+
+import bisect
+from collections import deque
+from typing import Dict, List, Optional
+
+DEFAULT_WINDOW = 1000
+MIN_LATENCY = 0.001
+MAX_LATENCY = 120.0
+BUCKET_GROWTH = 1.1
+
+
+def bucket_bounds(low: float = MIN_LATENCY, high: float = MAX_LATENCY, growth: float = BUCKET_GROWTH) -> List[float]:
+    """Upper bounds of the log-spaced buckets, in seconds"""
+    bounds = [low]
+    while bounds[-1] < high:
+        bounds.append(bounds[-1] * growth)
+    return bounds
+
+
+BUCKET_BOUNDS = bucket_bounds()
+
+
+class LatencyHistogram:
+    """Percentiles over the last ``window`` latency samples"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # The last bucket holds everything above MAX_LATENCY
+        self.samples = deque()
+        self.total_samples = 0
+        self.last: Optional[float] = None
+        self.max_seen = 0.0
+
+    def add(self, latency: float):
+        """Record one latency in seconds"""
+        bucket = bisect.bisect_left(BUCKET_BOUNDS, latency)
+        self.counts[bucket] += 1
+        self.samples.append(bucket)
+        if len(self.samples) > self.window:
+            self.counts[self.samples.popleft()] -= 1
+        self.total_samples += 1
+        self.last = latency
+        self.max_seen = max(self.max_seen, latency)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Latency below which ``percent`` % of the windowed samples fall (None without samples)"""
+        if not self.samples:
+            return None
+        rank = max(1, -(-len(self.samples) * percent // 100))  # ceil, at least the first sample
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.max_seen
+        return self.max_seen
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Sample count, last sample and p50/p95/p99, rounded to milliseconds"""
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+
+        return {
+            'samples': len(self.samples),
+            'last': rounded(self.last),
+            'p50': rounded(self.percentile(50)),
+            'p95': rounded(self.percentile(95)),
+            'p99': rounded(self.percentile(99))
+        }
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Line Metrics
+============
+Single-pass line statistics shared by the script analyzers.
+
+Total, code, comment and blank line counts, the shebang and the import
+statements are gathered while iterating over a buffered file object, so no
+list of lines (or whole-file string) is ever built. Files larger than
+``LARGE_FILE_THRESHOLD`` bytes are meant to get only these metrics; the
+analyzers skip their regex/AST passes for them.
+
+Counts follow the analyzers' existing conventions: ``total_lines`` equals
+``len(content.split('\\n'))`` and a line is a comment when its stripped text
+starts with ``#``.
+"""
+
+import io
+import os
+import re
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Files above this size get streaming metrics only (override with ANALYSIS_LARGE_FILE_BYTES)
+LARGE_FILE_THRESHOLD = int(os.getenv('ANALYSIS_LARGE_FILE_BYTES', 0)) or 1024 * 1024
+READ_BUFFER_SIZE = 1024 * 1024
+PREVIEW_CHARS = 500
+
+# Per-line import patterns; each match yields one imported module or file
+IMPORT_PATTERNS = {
+    'py': [
+        re.compile(r'^\s*import\s+([\w.]+)'),
+        re.compile(r'^\s*from\s+([\w.]+)\s+import\b')
+    ],
+    'sh': [
+        re.compile(r'^\s*(?:source|\.)\s+(\S+)')
+    ],
+    'js': [
+        re.compile(r'require\([\'"]([^\'"]+)[\'"]\)'),
+        re.compile(r'^\s*import\s+.*from\s+[\'"]([^\'"]+)[\'"]'),
+        re.compile(r'^\s*import\s+[\'"]([^\'"]+)[\'"]')
+    ]
+}
+
+
+@dataclass
+class LineMetrics:
+    """Line statistics of one file"""
+    total_lines: int = 0
+    code_lines: int = 0
+    comment_lines: int = 0
+    blank_lines: int = 0
+    size_bytes: int = 0
+    shebang: str = ""
+    imports: List[str] = field(default_factory=list)
+    preview: str = ""
+    content_hash: str = ""
+
+
+def is_large_file(size_bytes: int) -> bool:
+    """Whether a file is too large for full parsing"""
+    return size_bytes > LARGE_FILE_THRESHOLD
+
+
+def measure_lines(lines: Iterable[str], file_type: Optional[str] = None, preview_chars: int = PREVIEW_CHARS,
+                  digest=None) -> LineMetrics:
+    """Accumulate metrics over an iterable of newline-terminated lines (imports only for a known file type)"""
+    metrics = LineMetrics()
+    import_patterns = IMPORT_PATTERNS.get(file_type, [])
+    preview_parts = []
+    preview_remaining = preview_chars
+    line_count = 0
+    last_line = ''
+
+    for line in lines:
+        line_count += 1
+        last_line = line
+        if digest is not None:
+            digest.update(line.encode())
+        if preview_remaining > 0:
+            preview_parts.append(line[:preview_remaining])
+            preview_remaining -= len(preview_parts[-1])
+
+        stripped = line.strip()
+        if not stripped:
+            metrics.blank_lines += 1
+            continue
+        if stripped.startswith('#'):
+            metrics.comment_lines += 1
+            if line_count == 1 and stripped.startswith('#!'):
+                metrics.shebang = stripped
+            continue
+
+        metrics.code_lines += 1
+        for pattern in import_patterns:
+            metrics.imports.extend(pattern.findall(line))
+
+    # split('\n') yields one more item than there are newline-terminated lines
+    metrics.total_lines = line_count
+    if line_count == 0 or last_line.endswith('\n'):
+        metrics.total_lines += 1
+        metrics.blank_lines += 1
+
+    metrics.preview = ''.join(preview_parts)
+    if digest is not None:
+        metrics.content_hash = digest.hexdigest()
+    return metrics
+
+
+def line_metrics_from_text(content: str, file_type: Optional[str] = None,
+                           preview_chars: int = PREVIEW_CHARS) -> LineMetrics:
+    """Metrics for content that is already in memory, without splitting it into a list"""
+    return measure_lines(io.StringIO(content), file_type, preview_chars)
+
+
+def stream_line_metrics(file_path: str, file_type: Optional[str] = None, preview_chars: int = PREVIEW_CHARS,
+                        hash_content: bool = False) -> Optional[LineMetrics]:
+    """Metrics for a file in one buffered pass.
+
+    The file is decoded exactly like the analyzers read it (UTF-8, invalid
+    bytes ignored, universal newlines), so ``content_hash`` matches
+    ``sha256(content.encode())`` of a full read. ``size_bytes`` is the size
+    on disk.
+    """
+    if file_type is None:
+        file_type = file_path.split('.')[-1].lower()
+
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore', buffering=READ_BUFFER_SIZE) as f:
+            metrics = measure_lines(f, file_type, preview_chars, hashlib.sha256() if hash_content else None)
+        metrics.size_bytes = os.path.getsize(file_path)
+    except OSError as e:
+        logger.error(f"Error reading {file_path}: {e}")
+        return None
+    return metrics
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+MinHash / LSH Candidate Generation
+==================================
+Locality-sensitive hashing helpers shared by the similarity-based analyzers.
+
+Each token set is reduced to a fixed-length MinHash signature; signatures are
+cut into bands and items whose band values collide become candidate pairs.
+Candidates are only *likely* similar, so callers confirm every pair with their
+exact similarity check. Band/row counts are chosen from the similarity
+threshold so that a pair at the threshold is missed with negligible
+probability, while dissimilar pairs rarely collide.
+
+Band keys can be prefixed with a bucket key so that items which can never
+match (e.g. functions with different names) never share a bucket.
+"""
+
+import hashlib
+import logging
+import struct
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def jaccard(set1: Set, set2: Set) -> float:
+    """Exact Jaccard similarity (0 when both sets are empty)"""
+    union = len(set1 | set2)
+    return len(set1 & set2) / union if union else 0.0
+
+
+def lsh_parameters(threshold: float, num_perm: int, max_miss_probability: float = 1e-4) -> Tuple[int, int]:
+    """Pick (bands, rows) with the most rows whose miss probability at the threshold is acceptable.
+
+    A pair with Jaccard ``s`` becomes a candidate with probability
+    ``1 - (1 - s**rows)**bands``; more rows per band means fewer false
+    candidates, so the largest row count that still keeps pairs at the
+    threshold is used.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        miss_probability = (1 - threshold ** rows) ** bands
+        if miss_probability <= max_miss_probability:
+            return bands, rows
+    return num_perm, 1
+
+
+class MinHasher:
+    """Compute MinHash signatures from ``num_perm`` independent 32-bit token hashes"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = f"{seed}:".encode()
+        self._unpack = struct.Struct(f'<{num_perm}I').unpack
+        self._token_vectors: Dict[str, Tuple[int, ...]] = {}
+        self._signatures: Dict[FrozenSet[str], Tuple[int, ...]] = {}
+
+    def __getstate__(self) -> Dict:
+        """Pickle only the parameters; the unpacker is rebuilt and the memo tables start empty"""
+        return {'num_perm': self.num_perm, 'seed': self.seed}
+
+    def __setstate__(self, state: Dict):
+        self.num_perm = state['num_perm']
+        self.seed = state['seed']
+        self._unpack = struct.Struct(f'<{self.num_perm}I').unpack
+        self._token_vectors = {}
+        self._signatures = {}
+
+    def token_vector(self, token: str) -> Tuple[int, ...]:
+        """Hash values of one token under every hash function, computed once per distinct token"""
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            # One extendable-output digest supplies all hash values; unlike ``hash()`` it is
+            # stable across processes
+            digest = hashlib.shake_128(self.seed + token.encode('utf-8', errors='ignore')).digest(4 * self.num_perm)
+            vector = self._unpack(digest)
+            self._token_vectors[token] = vector
+        return vector
+
+    def signature(self, tokens: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a non-empty token set (memoized, backup trees repeat whole sets)"""
+        tokens = frozenset(tokens)
+        signature = self._signatures.get(tokens)
+        if signature is None:
+            if not tokens:
+                raise ValueError("cannot compute a MinHash signature for an empty set")
+            vectors = [self.token_vector(token) for token in tokens]
+            # Token vectors repeat across sets, so the signature is an elementwise min over cached vectors
+            signature = vectors[0] if len(vectors) == 1 else tuple(map(min, *vectors))
+            self._signatures[tokens] = signature
+        return signature
+
+
+class LSHIndex:
+    """Band MinHash signatures into buckets and report colliding items as candidate pairs"""
+
+    def __init__(self, threshold: float, num_perm: int = 128, max_miss_probability: float = 1e-4):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_parameters(threshold, num_perm, max_miss_probability)
+        self.buckets: Dict[Hashable, List[int]] = defaultdict(list)
+        self.size = 0
+
+    def insert(self, item: int, signature: Tuple[int, ...], bucket_key: Hashable = None):
+        """Add an item (an integer id) under every band of its signature"""
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets[(bucket_key, band, signature[start:start + self.rows])].append(item)
+        self.size += 1
+
+    def add_to_bucket(self, item: int, bucket_key: Hashable):
+        """Add an item to a single explicit bucket (e.g. items with empty token sets)"""
+        self.buckets[(bucket_key, None, None)].append(item)
+        self.size += 1
+
+    def candidate_pairs(self) -> Set[Tuple[int, int]]:
+        """All (smaller id, larger id) pairs that share at least one bucket"""
+        # Near-duplicates collide in most bands; expand each distinct bucket membership only once
+        memberships = {tuple(sorted(set(items))) for items in self.buckets.values() if len(items) > 1}
+        pairs = set()
+        for unique_items in memberships:
+            for i, item1 in enumerate(unique_items):
+                for item2 in unique_items[i + 1:]:
+                    pairs.add((item1, item2))
+        logger.debug(f"LSH ({self.bands} bands x {self.rows} rows): {len(pairs)} candidate pairs from {self.size} items")
+        return pairs
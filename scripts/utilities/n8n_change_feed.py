@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+N8N Change Feed
+===============
+Small HTTP receiver for workflow change events, used instead of polling
+the full workflow list.
+
+An n8n hook (e.g. an external hook on ``workflow.afterUpdate``, or an HTTP
+Request node in an "n8n Trigger" workflow) POSTs a JSON body naming the
+changed workflow to ``CHANGE_FEED_PATH``:
+
+    {"workflowId": "abc123"}
+
+``workflow_id``, ``id``, ``workflow.id`` and a ``workflowIds`` list are
+accepted too. Every id is handed to ``on_change``, normally a debounced
+queue, and the request returns 202 immediately. When a token is
+configured, requests must carry it in the ``X-Change-Feed-Token`` header.
+``GET /health`` returns the receiver's counters.
+"""
+
+import json
+import hmac
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_PATH = "/n8n/workflow-changed"
+HEALTH_PATH = "/health"
+DEFAULT_CHANGE_FEED_PORT = 5680
+MAX_EVENT_BYTES = 64 * 1024
+
+
+def extract_workflow_ids(payload: Any) -> List[str]:
+    """Workflow ids named in a change event"""
+    if not isinstance(payload, dict):
+        return []
+    ids = []
+    for key in ('workflowId', 'workflow_id', 'id'):
+        if payload.get(key):
+            ids.append(str(payload[key]))
+            break
+    workflow = payload.get('workflow')
+    if not ids and isinstance(workflow, dict) and workflow.get('id'):
+        ids.append(str(workflow['id']))
+    ids.extend(str(workflow_id) for workflow_id in payload.get('workflowIds') or [] if workflow_id)
+    return list(dict.fromkeys(ids))
+
+
+class ChangeFeedServer:
+    """Threaded HTTP endpoint that forwards changed workflow ids to a callback"""
+
+    def __init__(self, host: str, port: int, on_change: Callable[[str], None], token: Optional[str] = None,
+                 stats: Callable[[], Dict] = None):
+        self.on_change = on_change
+        self.token = token
+        self.stats = stats or dict
+        self.events = 0
+        self.rejected = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class ChangeFeedHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def send_json(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.split('?')[0] != HEALTH_PATH:
+                    return self.send_json(404, {'error': 'not found'})
+                self.send_json(200, {'status': 'ok', 'events': server.events, 'rejected': server.rejected,
+                                     **server.stats()})
+
+            def do_POST(self):
+                if self.path.split('?')[0] != CHANGE_FEED_PATH:
+                    return self.send_json(404, {'error': 'not found'})
+                if server.token and not hmac.compare_digest(self.headers.get('X-Change-Feed-Token', ''),
+                                                            server.token):
+                    server.rejected += 1
+                    return self.send_json(401, {'error': 'invalid token'})
+
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > MAX_EVENT_BYTES:
+                    server.rejected += 1
+                    return self.send_json(413, {'error': 'event too large'})
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    payload = None
+                workflow_ids = extract_workflow_ids(payload)
+                if not workflow_ids:
+                    server.rejected += 1
+                    return self.send_json(400, {'error': 'no workflow id in event'})
+
+                for workflow_id in workflow_ids:
+                    server.on_change(workflow_id)
+                server.events += 1
+                self.send_json(202, {'queued': workflow_ids})
+
+        return ChangeFeedHandler
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="change-feed", daemon=True)
+        self._thread.start()
+        logger.info(f"📡 Change feed listening on {self.address}{CHANGE_FEED_PATH}")
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
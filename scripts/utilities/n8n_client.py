@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+N8N API Client
+==============
+Pooled, paginated access to the n8n public REST API, shared by the sync and
+monitoring tools.
+
+One ``requests.Session`` is reused for every call, so connections stay
+alive between requests. Its connection pool is sized to the fetch worker
+count. Listing follows ``nextCursor`` until the last page.
+``fetch_changed_workflows`` compares each listed workflow's ``updatedAt``
+with the values recorded at the last sync. Only workflows whose timestamp
+differs are downloaded in full, on a bounded thread pool. When the list
+endpoint already returns full workflows (the public API does unless a
+server trims it), those bodies are used and no per-workflow request is made.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 250  # Largest page the n8n API accepts
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_TIMEOUT = 30
+
+
+class N8NAPIError(Exception):
+    """A request to the n8n API failed or returned an unexpected status"""
+
+
+@dataclass
+class WorkflowSummary:
+    """Listing entry of one workflow"""
+    id: str
+    name: str
+    updated_at: Optional[str]
+    active: bool = False
+    body: Optional[Dict] = None  # The full workflow, when the list endpoint returned its nodes
+
+
+class N8NClient:
+    """Keep-alive session for the n8n API with paginated listing and concurrent fetches"""
+
+    def __init__(self, base_url: str, api_key: Optional[str], timeout: float = DEFAULT_TIMEOUT,
+                 max_workers: int = DEFAULT_FETCH_WORKERS, page_size: int = DEFAULT_PAGE_SIZE):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.page_size = page_size
+        self.requests_made = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'X-N8N-API-KEY': api_key or '',
+            'Content-Type': 'application/json'
+        })
+
+    def get(self, path: str, params: Dict[str, Any] = None) -> Dict:
+        """GET an API path and return the decoded JSON body"""
+        self.requests_made += 1
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise N8NAPIError(f"GET {path} failed: {e}") from e
+        if response.status_code != 200:
+            raise N8NAPIError(f"GET {path} returned {response.status_code}")
+        return response.json()
+
+    def list_workflows(self) -> List[WorkflowSummary]:
+        """Every workflow's id, name and updatedAt, following the pagination cursor"""
+        summaries = []
+        params = {'limit': self.page_size, 'excludePinnedData': 'true'}
+        while True:
+            page = self.get("/api/v1/workflows", params)
+            for entry in page.get('data', []):
+                summaries.append(WorkflowSummary(
+                    id=entry.get('id'),
+                    name=entry.get('name', 'unnamed'),
+                    updated_at=entry.get('updatedAt'),
+                    active=bool(entry.get('active')),
+                    body=entry if 'nodes' in entry else None
+                ))
+            cursor = page.get('nextCursor')
+            if not cursor:
+                return summaries
+            params = {**params, 'cursor': cursor}
+
+    def fetch_workflow(self, workflow_id: str) -> Dict:
+        """Full definition (nodes and connections) of one workflow"""
+        return self.get(f"/api/v1/workflows/{workflow_id}")
+
+    def fetch_workflows(self, workflow_ids: Iterable[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """Full definitions of several workflows, fetched concurrently, plus the ids that failed (logged)"""
+        workflow_ids = list(workflow_ids)
+
+        def fetch(workflow_id: str) -> Optional[Dict]:
+            try:
+                return self.fetch_workflow(workflow_id)
+            except N8NAPIError as e:
+                logger.error(f"Failed to fetch workflow {workflow_id}: {e}")
+                return None
+
+        if len(workflow_ids) <= 1 or self.max_workers == 1:
+            bodies = [fetch(workflow_id) for workflow_id in workflow_ids]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                bodies = list(executor.map(fetch, workflow_ids))
+        fetched = {workflow_id: body for workflow_id, body in zip(workflow_ids, bodies) if body is not None}
+        failed = [workflow_id for workflow_id, body in zip(workflow_ids, bodies) if body is None]
+        return fetched, failed
+
+    def fetch_changed_workflows(self, known_updated_at: Dict[str, str]
+                                ) -> Tuple[List[WorkflowSummary], List[Dict], List[WorkflowSummary]]:
+        """List all workflows and return (summaries, full bodies of those whose updatedAt changed,
+        summaries of changed workflows whose download failed)"""
+        summaries = self.list_workflows()
+        changed = [summary for summary in summaries
+                   if summary.updated_at is None or known_updated_at.get(summary.id) != summary.updated_at]
+
+        fetched, failed_ids = self.fetch_workflows(summary.id for summary in changed if summary.body is None)
+        failed_ids = set(failed_ids)
+        bodies = []
+        failed = []
+        for summary in changed:
+            if summary.id in failed_ids:
+                failed.append(summary)
+            else:
+                bodies.append(summary.body if summary.body is not None else fetched[summary.id])
+
+        logger.info(f"Listed {len(summaries)} workflows, {len(changed)} changed since last sync "
+                    f"({len(fetched)} fetched individually, {len(failed)} failed, "
+                    f"{self.requests_made} requests so far)")
+        return summaries, bodies, failed
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
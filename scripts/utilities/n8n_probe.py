@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+N8N Probe
+=========
+Timed health and API probes of one n8n instance, shared by the sync monitor
+and the fleet monitor.
+
+A probe is one GET on a keep-alive ``requests.Session``. Each monitoring
+tick makes one probe per endpoint (``run_cycle``), and the results are
+shared by every health, status and dashboard computation of that tick.
+A probe is ok when the endpoint answers 200; only probes whose data is
+used parse the body as JSON. Every probe, failed ones included, feeds a
+rolling per-endpoint latency histogram, and failures are also counted
+per endpoint so a struggling instance does not look fast.
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import requests
+
+from utilities.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PATH = "/health"
+WORKFLOWS_PATH = "/api/v1/workflows"
+HEALTH_TIMEOUT = 10
+WORKFLOWS_TIMEOUT = 30
+
+
+@dataclass
+class ProbeResult:
+    """One timed request to an N8N endpoint"""
+    path: str
+    ok: bool
+    status_code: Optional[int]
+    latency: float
+    data: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class MonitorCycle:
+    """The probes of one monitor tick, shared by health, status and dashboard computation"""
+    health: ProbeResult
+    workflows: ProbeResult
+
+
+class N8NProber:
+    """Keep-alive session to one n8n instance with per-endpoint latency histograms"""
+
+    def __init__(self, base_url: str, api_key: Optional[str]):
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.session.headers.update({
+            'X-N8N-API-KEY': api_key or '',
+            'Content-Type': 'application/json'
+        })
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.failures: Dict[str, int] = {}
+
+    def probe(self, path: str, timeout: float = WORKFLOWS_TIMEOUT, parse_json: bool = False) -> ProbeResult:
+        """Time one GET request and record its latency (and any failure) for the endpoint.
+
+        With ``parse_json`` a 200 response must carry a JSON body, which becomes
+        the result's ``data``; otherwise only the status code decides ``ok``.
+        """
+        start_time = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{path}", timeout=timeout)
+            result = ProbeResult(path, response.status_code == 200, response.status_code,
+                                 time.perf_counter() - start_time)
+            if result.ok and parse_json:
+                try:
+                    result.data = response.json()
+                except ValueError as e:
+                    result.ok = False
+                    result.error = f"Invalid JSON response: {e}"
+        except requests.RequestException as e:
+            logger.error(f"Probe of {self.base_url}{path} failed: {e}")
+            result = ProbeResult(path, False, None, time.perf_counter() - start_time, error=str(e))
+
+        self.latency.setdefault(path, LatencyHistogram()).add(result.latency)
+        if not result.ok:
+            self.failures[path] = self.failures.get(path, 0) + 1
+        return result
+
+    def run_cycle(self, health_timeout: float = HEALTH_TIMEOUT,
+                  workflows_timeout: float = WORKFLOWS_TIMEOUT) -> MonitorCycle:
+        """Probe each endpoint once"""
+        return MonitorCycle(
+            health=self.probe(HEALTH_PATH, timeout=health_timeout),
+            workflows=self.probe(WORKFLOWS_PATH, timeout=workflows_timeout, parse_json=True)
+        )
+
+    def latency_percentiles(self) -> Dict[str, Dict]:
+        """Rolling p50/p95/p99 latency and the failed probe count per probed endpoint"""
+        return {path: {**histogram.summary(), 'failed': self.failures.get(path, 0)}
+                for path, histogram in self.latency.items()}
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+N8N Stub Server
+===============
+Local stand-in for an n8n instance, for load-testing webhook clients
+without touching production.
+
+Webhooks are registered from workflow definitions: every webhook node's
+``path`` is served at ``POST /webhook/<path>``, and other paths get n8n's
+404. Each request waits ``latency`` +/- ``jitter`` seconds (on its own
+thread, so concurrent requests overlap as they would against n8n). It then
+fails with a 500 at ``error_rate``, or answers with a RAG-style JSON
+response. ``GET /api/v1/workflows`` lists the workflows and ``GET /healthz``
+returns the counters, including the peak number of requests in flight.
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PREFIX = "/webhook/"
+WORKFLOWS_PATH = "/api/v1/workflows"
+HEALTH_PATH = "/healthz"
+WEBHOOK_TYPE = 'n8n-nodes-base.webhook'
+MAX_BODY_BYTES = 1024 * 1024
+# Listen backlog; the default of 5 drops connections under a burst of concurrent clients
+REQUEST_QUEUE_SIZE = 256
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
+def webhook_paths(workflows: List[Dict]) -> Dict[str, str]:
+    """Webhook path -> workflow name, from the webhook nodes of the given workflows"""
+    paths = {}
+    for workflow in workflows:
+        for node in workflow.get('nodes') or []:
+            path = (node.get('parameters') or {}).get('path')
+            if node.get('type') == WEBHOOK_TYPE and path:
+                paths[path.strip('/')] = workflow.get('name', 'unnamed')
+    return paths
+
+
+class N8NStubServer:
+    """Threaded HTTP server answering webhooks with configurable latency and failures"""
+
+    def __init__(self, workflows: List[Dict] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.workflows = workflows or []
+        self.webhooks = webhook_paths(self.workflows)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests: Counter = Counter()  # Webhook path -> requests received
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self.httpd = _StubHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'requests': sum(self.requests.values()), 'by_webhook': dict(self.requests),
+                    'in_flight': self.in_flight, 'peak_in_flight': self.peak_in_flight}
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.error_rate
+
+    def _handler_class(self):
+        server = self
+
+        class StubHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, as clients pool connections
+            # Headers and body go out as separate writes; with Nagle they stall on delayed ACKs (~40 ms)
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def send_json(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == HEALTH_PATH:
+                    return self.send_json(200, {'status': 'ok', **server.stats()})
+                if path == WORKFLOWS_PATH:
+                    return self.send_json(200, {'data': [
+                        {'id': workflow.get('id', str(i)), 'name': workflow.get('name'),
+                         'active': workflow.get('active', False)}
+                        for i, workflow in enumerate(server.workflows)
+                    ]})
+                self.send_json(404, {'message': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(min(length, MAX_BODY_BYTES))
+                path = self.path.split('?')[0]
+                webhook = path[len(WEBHOOK_PREFIX):].strip('/') if path.startswith(WEBHOOK_PREFIX) else None
+                if webhook not in server.webhooks:
+                    return self.send_json(404, {'code': 404, 'message':
+                                                f'The requested webhook "POST {webhook or path}" is not registered.'})
+                try:
+                    payload = json.loads(body or b'{}')
+                except ValueError:
+                    return self.send_json(400, {'message': 'Invalid JSON body'})
+
+                with server._lock:
+                    server.requests[webhook] += 1
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    time.sleep(server._delay())
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+                if server._fails():
+                    return self.send_json(500, {'message': 'Error in workflow'})
+                query = payload.get('query') if isinstance(payload, dict) else None
+                self.send_json(200, {
+                    'crew_member': webhook,
+                    'workflow': server.webhooks[webhook],
+                    'query': query,
+                    'response': f"Stub response to: {query}",
+                    'similar_memories_found': 0,
+                    'timestamp': datetime.now().isoformat()
+                })
+
+        return StubHandler
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="n8n-stub", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 N8N stub serving {len(self.webhooks)} webhooks on {self.address}")
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+N8N Workflow Diff
+=================
+Structural hashing and semantic diffing of n8n workflow definitions.
+
+A workflow is reduced to three canonical parts before hashing: its nodes
+without canvas-only fields (positions, node ids, webhook ids), its edges and
+its behavioural settings (name, active, settings, tag names). Everything else
+at workflow level, such as updatedAt, versionId or staticData, is ignored.
+Nodes are keyed by name, which is how connections refer to them.
+Connections become a set of edges
+``(source, output type, output index, target, input type, input index)``.
+Nodes, edges and workflow settings are hashed independently and combined,
+so the structural hash only changes when the workflow itself does.
+``diff_workflows`` reports which nodes and edges were added, removed or
+modified.
+"""
+
+import json
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Node fields that only affect the editor canvas or are regenerated on import
+VOLATILE_NODE_FIELDS = {'id', 'position', 'webhookId'}
+# Workflow-level fields compared as "settings" (nodes and connections are compared separately)
+SETTINGS_FIELDS = ('name', 'active', 'settings', 'tags')
+
+Edge = Tuple[str, str, int, str, str, int]
+
+
+def stable_hash(value: Any) -> str:
+    """Short hash of a JSON-serializable value, independent of key order"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def canonical_node(node: Dict) -> Dict:
+    """A node without its volatile fields"""
+    return {key: value for key, value in node.items() if key not in VOLATILE_NODE_FIELDS}
+
+
+def canonical_settings(workflow: Dict) -> Dict:
+    """Workflow-level settings that matter for behaviour (tags by name only)"""
+    settings = {key: workflow.get(key) for key in SETTINGS_FIELDS if key in workflow}
+    if isinstance(settings.get('tags'), list):
+        settings['tags'] = sorted(tag.get('name', '') if isinstance(tag, dict) else str(tag)
+                                  for tag in settings['tags'])
+    return settings
+
+
+def workflow_edges(connections: Dict) -> Set[Edge]:
+    """Flatten n8n's nested connections mapping into a set of edges"""
+    edges = set()
+    for source, outputs_by_type in (connections or {}).items():
+        for output_type, outputs in (outputs_by_type or {}).items():
+            for output_index, targets in enumerate(outputs or []):
+                for target in targets or []:
+                    if isinstance(target, str):
+                        # Hand-written workflows sometimes list bare target names
+                        target = {'node': target}
+                    edges.add((source, output_type, output_index,
+                               target.get('node'), target.get('type', output_type), target.get('index', 0)))
+    return edges
+
+
+def format_edge(edge: Edge) -> str:
+    """Readable form of an edge, e.g. ``Webhook[main:0] -> HTTP[main:0]``"""
+    source, output_type, output_index, target, input_type, input_index = edge
+    return f"{source}[{output_type}:{output_index}] -> {target}[{input_type}:{input_index}]"
+
+
+def node_hashes(workflow: Dict) -> Dict[str, str]:
+    """Structural hash of every node, keyed by node name"""
+    return {node.get('name', ''): stable_hash(canonical_node(node)) for node in workflow.get('nodes') or []}
+
+
+def structural_hash(workflow: Dict) -> str:
+    """Hash of a workflow's nodes, connections and settings, ignoring volatile fields"""
+    return stable_hash({
+        'settings': stable_hash(canonical_settings(workflow)),
+        'nodes': sorted(node_hashes(workflow).items()),
+        'edges': stable_hash(sorted(workflow_edges(workflow.get('connections')), key=repr))
+    })
+
+
+@dataclass
+class WorkflowDiff:
+    """Semantic differences between two versions of a workflow"""
+    added_nodes: List[str] = field(default_factory=list)
+    removed_nodes: List[str] = field(default_factory=list)
+    modified_nodes: Dict[str, List[str]] = field(default_factory=dict)  # node name -> changed fields
+    added_edges: List[str] = field(default_factory=list)
+    removed_edges: List[str] = field(default_factory=list)
+    changed_settings: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return any((self.added_nodes, self.removed_nodes, self.modified_nodes,
+                    self.added_edges, self.removed_edges, self.changed_settings))
+
+    def summary(self) -> str:
+        """One-line description, e.g. ``+1 nodes, ~2 nodes, -1 edges``"""
+        parts = []
+        for count, label in ((len(self.added_nodes), '+{} nodes'), (len(self.removed_nodes), '-{} nodes'),
+                             (len(self.modified_nodes), '~{} nodes'), (len(self.added_edges), '+{} edges'),
+                             (len(self.removed_edges), '-{} edges'), (len(self.changed_settings), '~{} settings')):
+            if count:
+                parts.append(label.format(count))
+        return ', '.join(parts) if parts else 'no structural changes'
+
+    def to_dict(self) -> Dict:
+        return {
+            'added_nodes': self.added_nodes,
+            'removed_nodes': self.removed_nodes,
+            'modified_nodes': self.modified_nodes,
+            'added_edges': self.added_edges,
+            'removed_edges': self.removed_edges,
+            'changed_settings': self.changed_settings,
+            'summary': self.summary()
+        }
+
+
+def diff_workflows(old: Optional[Dict], new: Dict) -> WorkflowDiff:
+    """Added, removed and modified nodes and edges between two workflow versions (old may be None)"""
+    old = old or {}
+    diff = WorkflowDiff()
+
+    old_nodes = {node.get('name', ''): canonical_node(node) for node in old.get('nodes') or []}
+    new_nodes = {node.get('name', ''): canonical_node(node) for node in new.get('nodes') or []}
+    diff.added_nodes = sorted(set(new_nodes) - set(old_nodes))
+    diff.removed_nodes = sorted(set(old_nodes) - set(new_nodes))
+    for name in sorted(set(old_nodes) & set(new_nodes)):
+        old_node, new_node = old_nodes[name], new_nodes[name]
+        if old_node != new_node:
+            diff.modified_nodes[name] = sorted(key for key in set(old_node) | set(new_node)
+                                               if old_node.get(key) != new_node.get(key))
+
+    old_edges = workflow_edges(old.get('connections'))
+    new_edges = workflow_edges(new.get('connections'))
+    diff.added_edges = sorted(format_edge(edge) for edge in new_edges - old_edges)
+    diff.removed_edges = sorted(format_edge(edge) for edge in old_edges - new_edges)
+
+    old_settings, new_settings = canonical_settings(old), canonical_settings(new)
+    diff.changed_settings = sorted(key for key in set(old_settings) | set(new_settings)
+                                   if old_settings.get(key) != new_settings.get(key))
+    return diff
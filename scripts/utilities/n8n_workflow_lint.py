@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+N8N Workflow Lint
+=================
+Rule-based lint engine for n8n workflow definitions.
+
+``WorkflowIndex`` reads a workflow once and indexes its nodes by type and by
+name, plus the adjacency of its connection graph. Rules are plain functions
+over that index. They are registered in ``LINT_RULES`` with the
+``lint_rule`` decorator and run in registration order. Each rule returns
+``LintFinding``s with a severity, a message and a recommendation.
+``lint_workflow`` lints one workflow. ``lint_directory`` lints every
+workflow file under a directory on a process pool.
+"""
+
+import os
+import json
+import glob
+import logging
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from utilities.n8n_workflow_diff import workflow_edges
+from utilities.parallel_analysis import ParallelAnalysisDriver
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_TYPE = 'n8n-nodes-base.webhook'
+RESPOND_TO_WEBHOOK_TYPE = 'n8n-nodes-base.respondToWebhook'
+FUNCTION_TYPE = 'n8n-nodes-base.function'
+HTTP_REQUEST_TYPE = 'n8n-nodes-base.httpRequest'
+# Canvas annotations, not part of the execution graph
+NON_EXECUTING_TYPES = {'n8n-nodes-base.stickyNote'}
+# Trigger nodes whose type name does not end in "Trigger"
+TRIGGER_TYPES = {WEBHOOK_TYPE, 'n8n-nodes-base.cron', 'n8n-nodes-base.interval', 'n8n-nodes-base.start'}
+
+SEVERITIES = ('info', 'warning', 'error')
+
+
+@dataclass
+class LintFinding:
+    """One problem reported by a rule"""
+    rule: str
+    severity: str
+    message: str
+    recommendation: Optional[str] = None
+    nodes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class LintRule:
+    """A registered rule: a check over a WorkflowIndex"""
+    rule_id: str
+    severity: str
+    check: Callable[['WorkflowIndex'], Iterable[LintFinding]]
+    description: str = ''
+
+
+@dataclass
+class LintReport:
+    """Lint results of one workflow"""
+    workflow_name: str
+    metrics: Dict[str, int]
+    findings: List[LintFinding] = field(default_factory=list)
+    file_path: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class WorkflowIndex:
+    """Nodes by type and name plus the connection graph, built in one pass over the workflow"""
+
+    def __init__(self, workflow: Dict):
+        self.workflow = workflow
+        self.name = workflow.get('name', 'unnamed')
+        self.nodes: List[Dict] = workflow.get('nodes') or []
+        self.connections: Dict = workflow.get('connections') or {}
+        self.by_type: Dict[str, List[Dict]] = {}
+        self.by_name: Dict[str, List[Dict]] = {}
+        for node in self.nodes:
+            self.by_type.setdefault(node.get('type', ''), []).append(node)
+            self.by_name.setdefault(node.get('name', ''), []).append(node)
+        self._successors: Optional[Dict[str, Set[str]]] = None
+        self._reachable: Dict[frozenset, Set[str]] = {}
+
+    def of_type(self, node_type: str) -> List[Dict]:
+        return self.by_type.get(node_type, [])
+
+    def count(self, node_type: str) -> int:
+        return len(self.by_type.get(node_type, []))
+
+    @property
+    def successors(self) -> Dict[str, Set[str]]:
+        """Execution adjacency: main outputs point downstream, sub-node links (ai_*) point into the sub-node"""
+        if self._successors is None:
+            self._successors = {}
+            # n8n links nodes by name; hand-written workflows in this repo often use node ids instead
+            ids = {node['id']: node.get('name', '') for node in self.nodes
+                   if node.get('id') and node['id'] not in self.by_name}
+            for source, output_type, _, target, _, _ in workflow_edges(self.connections):
+                source, target = ids.get(source, source), ids.get(target, target)
+                if output_type == 'main':
+                    self._successors.setdefault(source, set()).add(target)
+                else:
+                    # e.g. a language model attached to an agent: the agent reaches its model
+                    self._successors.setdefault(target, set()).add(source)
+        return self._successors
+
+    def reachable_from(self, start_names: Iterable[str]) -> Set[str]:
+        """Names of the nodes reachable from the given nodes (breadth-first, including them)"""
+        key = frozenset(start_names)
+        if key not in self._reachable:
+            successors = self.successors
+            seen = set(key)
+            queue = deque(seen)
+            while queue:
+                for successor in successors.get(queue.popleft(), ()):
+                    if successor not in seen:
+                        seen.add(successor)
+                        queue.append(successor)
+            self._reachable[key] = seen
+        return self._reachable[key]
+
+    def trigger_names(self) -> List[str]:
+        return [node.get('name', '') for node in self.nodes if is_trigger(node)]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            'node_count': len(self.nodes),
+            'connection_count': len(self.connections),
+            'webhook_count': self.count(WEBHOOK_TYPE),
+            'function_count': self.count(FUNCTION_TYPE),
+            'http_request_count': self.count(HTTP_REQUEST_TYPE)
+        }
+
+
+def is_trigger(node: Dict) -> bool:
+    """Whether a node starts executions"""
+    node_type = node.get('type', '')
+    return node_type in TRIGGER_TYPES or node_type.lower().endswith('trigger')
+
+
+LINT_RULES: List[LintRule] = []
+
+
+def lint_rule(rule_id: str, severity: str, description: str = ''):
+    """Register a rule function ``check(index) -> Iterable[LintFinding]``"""
+    if severity not in SEVERITIES:
+        raise ValueError(f"Unknown severity {severity!r} for rule {rule_id}")
+
+    def register(check: Callable[[WorkflowIndex], Iterable[LintFinding]]):
+        LINT_RULES.append(LintRule(rule_id, severity, check, description or (check.__doc__ or '').strip()))
+        return check
+    return register
+
+
+@lint_rule('no-webhook-trigger', 'info')
+def check_webhook_trigger(index: WorkflowIndex):
+    """The workflow has no webhook trigger"""
+    if not index.count(WEBHOOK_TYPE):
+        yield LintFinding('no-webhook-trigger', 'info', "No webhook triggers found",
+                          "Consider adding webhook triggers for external access")
+
+
+@lint_rule('no-response-node', 'warning')
+def check_response_node(index: WorkflowIndex):
+    """The workflow has no Respond to Webhook node"""
+    if not index.count(RESPOND_TO_WEBHOOK_TYPE):
+        yield LintFinding('no-response-node', 'warning', "No response nodes found",
+                          "Add response nodes for proper webhook responses")
+
+
+@lint_rule('function-nodes', 'info')
+def check_function_nodes(index: WorkflowIndex):
+    """The workflow runs custom function code"""
+    nodes = index.of_type(FUNCTION_TYPE)
+    if nodes:
+        yield LintFinding('function-nodes', 'info', "Contains custom functions - review code",
+                          "Review custom function code for security and functionality",
+                          [node.get('name', '') for node in nodes])
+
+
+@lint_rule('http-request-nodes', 'info')
+def check_http_nodes(index: WorkflowIndex):
+    """The workflow calls HTTP endpoints"""
+    nodes = index.of_type(HTTP_REQUEST_TYPE)
+    if nodes:
+        yield LintFinding('http-request-nodes', 'info', "Contains HTTP requests - verify endpoints",
+                          "Verify all HTTP endpoints are accessible and secure",
+                          [node.get('name', '') for node in nodes])
+
+
+@lint_rule('duplicate-node-names', 'error')
+def check_duplicate_names(index: WorkflowIndex):
+    """Several nodes share a name (connections refer to nodes by name)"""
+    duplicates = sorted(name for name, nodes in index.by_name.items() if len(nodes) > 1)
+    if duplicates:
+        yield LintFinding('duplicate-node-names', 'error', f"Duplicate node names: {duplicates}",
+                          "Rename duplicate nodes to avoid conflicts", duplicates)
+
+
+@lint_rule('webhook-response-unreachable', 'error')
+def check_webhook_response_reachable(index: WorkflowIndex):
+    """A webhook waits for a Respond to Webhook node that it never reaches"""
+    responders = {node.get('name', '') for node in index.of_type(RESPOND_TO_WEBHOOK_TYPE)}
+    for webhook in index.of_type(WEBHOOK_TYPE):
+        if (webhook.get('parameters') or {}).get('responseMode') != 'responseNode':
+            continue
+        if not responders & index.reachable_from([webhook.get('name', '')]):
+            yield LintFinding('webhook-response-unreachable', 'error',
+                              f"Webhook '{webhook.get('name', '')}' waits for a response node that it never reaches",
+                              "Connect a Respond to Webhook node downstream of the webhook",
+                              [webhook.get('name', '')])
+
+
+@lint_rule('unreachable-nodes', 'warning')
+def check_unreachable_nodes(index: WorkflowIndex):
+    """Nodes that no trigger leads to never run"""
+    triggers = index.trigger_names()
+    if not triggers:
+        return  # Sub-workflows and manual workflows have no trigger to traverse from
+    reachable = index.reachable_from(triggers)
+    unreachable = sorted(node.get('name', '') for node in index.nodes
+                         if node.get('name', '') not in reachable and node.get('type') not in NON_EXECUTING_TYPES)
+    if unreachable:
+        yield LintFinding('unreachable-nodes', 'warning', f"Unreachable nodes: {unreachable}",
+                          "Connect or remove nodes that no trigger leads to", unreachable)
+
+
+def lint_workflow(workflow: Dict, rules: Iterable[str] = None) -> LintReport:
+    """Run the registered rules (or only those named) over one workflow"""
+    index = WorkflowIndex(workflow)
+    selected = set(rules) if rules else None
+    findings = []
+    for rule in LINT_RULES:
+        if selected is None or rule.rule_id in selected:
+            findings.extend(rule.check(index))
+    return LintReport(workflow_name=index.name, metrics=index.metrics(), findings=findings)
+
+
+def lint_file(file_path: str, rules: Optional[List[str]] = None) -> LintReport:
+    """Lint one workflow JSON file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            workflow = json.load(f)
+    except (OSError, ValueError) as e:
+        return LintReport(workflow_name=os.path.basename(file_path), metrics={}, file_path=file_path, error=str(e))
+    if not isinstance(workflow, dict) or 'nodes' not in workflow:
+        return LintReport(workflow_name=os.path.basename(file_path), metrics={}, file_path=file_path,
+                          error="Not an n8n workflow (no nodes)")
+
+    try:
+        report = lint_workflow(workflow, rules)
+    except (AttributeError, TypeError) as e:
+        return LintReport(workflow_name=workflow.get('name', os.path.basename(file_path)), metrics={},
+                          file_path=file_path, error=f"Malformed workflow: {e}")
+    report.file_path = file_path
+    return report
+
+
+def workflow_files(directory: str) -> List[str]:
+    """Every ``*.json`` file under a directory (backups such as ``x.json.backup.123`` are not matched)"""
+    return sorted(glob.glob(os.path.join(directory, '**', '*.json'), recursive=True))
+
+
+def lint_directory(directory: str, rules: Optional[List[str]] = None, max_workers: int = None) -> List[LintReport]:
+    """Lint every workflow file under a directory, on a process pool when there are many"""
+    driver = ParallelAnalysisDriver(max_workers=max_workers)
+    return driver.starmap(lint_file, [(file_path, rules) for file_path in workflow_files(directory)])
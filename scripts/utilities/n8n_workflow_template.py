@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+N8N Workflow Template
+=====================
+Render many variants of one workflow skeleton cheaply.
+
+A ``WorkflowTemplate`` holds the skeleton, which is built once. ``render``
+applies a variant's patches (top-level fields, plus values at paths inside
+nodes) by path copying. Only the dicts and lists on the way to a patched
+value are copied; every untouched node, parameter block and the
+connections are shared with the skeleton. Rendered workflows are therefore
+read-only: ``copy.deepcopy`` one before editing it in place.
+
+``dumps`` produces the same text as ``json.dumps(indent=2)`` but caches the
+text of shared subtrees, so a variant costs only its patched parts.
+``write_if_changed`` writes a file only when its content changed, so
+regenerating hundreds of unchanged variants does not rewrite any files.
+"""
+
+import os
+import json
+import tempfile
+from typing import Any, Dict, Sequence, Tuple, Union
+
+# A key inside a node, or a path of keys / list indexes, e.g. ('parameters', 'messages', 0, 'content')
+PatchPath = Union[str, Tuple[Union[str, int], ...]]
+
+
+def set_in(obj: Any, path: Sequence[Union[str, int]], value: Any) -> Any:
+    """Copy of ``obj`` with ``value`` at ``path``; only the containers along the path are copied"""
+    if not path:
+        return value
+    key, rest = path[0], path[1:]
+    copied = list(obj) if isinstance(obj, list) else dict(obj)
+    copied[key] = set_in(obj[key], rest, value)
+    return copied
+
+
+class WorkflowTemplate:
+    """A workflow skeleton rendered into variants by patching node parameters"""
+
+    def __init__(self, skeleton: Dict[str, Any]):
+        self.skeleton = skeleton
+        self.node_positions = {node['id']: i for i, node in enumerate(skeleton.get('nodes', []))}
+        self._shared = {}         # id -> container of the skeleton (kept alive so ids stay unique)
+        self._shared_text = {}    # (id, depth) -> serialized text
+        self._collect_shared(skeleton)
+
+    def _collect_shared(self, obj: Any):
+        if isinstance(obj, (dict, list)):
+            self._shared[id(obj)] = obj
+            for value in obj.values() if isinstance(obj, dict) else obj:
+                self._collect_shared(value)
+
+    def render(self, fields: Dict[str, Any] = None,
+               node_patches: Dict[str, Dict[PatchPath, Any]] = None) -> Dict[str, Any]:
+        """A variant: ``fields`` replace top-level keys, ``node_patches`` map node id -> {path: value}"""
+        workflow = dict(self.skeleton)
+        workflow.update(fields or {})
+        if node_patches:
+            nodes = list(self.skeleton['nodes'])
+            for node_id, patches in node_patches.items():
+                position = self.node_positions[node_id]
+                node = nodes[position]
+                for path, value in patches.items():
+                    node = set_in(node, (path,) if isinstance(path, str) else path, value)
+                nodes[position] = node
+            workflow['nodes'] = nodes
+        return workflow
+
+    def dumps(self, obj: Any, depth: int = 0) -> str:
+        """``json.dumps(obj, indent=2)``, reusing the text of subtrees shared with the skeleton"""
+        key = (id(obj), depth)
+        if key in self._shared_text:
+            return self._shared_text[key]
+        if isinstance(obj, dict) and obj:
+            inner = '\n' + '  ' * (depth + 1)
+            text = '{' + inner + (',' + inner).join(
+                json.dumps(k) + ': ' + self.dumps(v, depth + 1) for k, v in obj.items()) + '\n' + '  ' * depth + '}'
+        elif isinstance(obj, list) and obj:
+            inner = '\n' + '  ' * (depth + 1)
+            text = '[' + inner + (',' + inner).join(self.dumps(v, depth + 1) for v in obj) + '\n' + '  ' * depth + ']'
+        else:
+            return json.dumps(obj)
+        if id(obj) in self._shared:
+            self._shared_text[key] = text
+        return text
+
+
+def write_if_changed(file_path: str, content: str) -> bool:
+    """Write ``content`` unless the file already holds exactly that; True if written"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(temp_path, 0o644)  # mkstemp creates 0600 files
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return True
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Clustering
+=========================
+Cluster text files whose shingle sets overlap above a Jaccard threshold.
+
+Each document is tokenized once into a shingle set (``shingle_size`` = 1 is
+the plain word set). MinHash/LSH proposes candidate pairs, every candidate is
+confirmed with the exact Jaccard similarity, and confirmed pairs are merged
+with union-find, so clusters are the connected components of the
+"similar to" relation.
+"""
+
+import logging
+from typing import Callable, Dict, FrozenSet, List
+
+from utilities.minhash_lsh import MinHasher, LSHIndex, jaccard
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind:
+    """Disjoint sets over integer ids with path halving and union by size"""
+
+    def __init__(self):
+        self.parent: List[int] = []
+        self.size: List[int] = []
+
+    def add(self) -> int:
+        """Create a new singleton set and return its id"""
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, item: int) -> int:
+        """Return the representative of an item's set"""
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, item1: int, item2: int):
+        """Merge the sets containing two items"""
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return
+        if self.size[root1] < self.size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.size[root1] += self.size[root2]
+
+
+def shingle(text: str, shingle_size: int = 1) -> FrozenSet[str]:
+    """Lowercased, whitespace-tokenized shingles of a document"""
+    words = text.lower().split()
+    if shingle_size <= 1:
+        return frozenset(words)
+    return frozenset(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+
+class NearDuplicateClusterer:
+    """Group documents into clusters of near-duplicates"""
+
+    def __init__(self, threshold: float = 0.7, shingle_size: int = 1, num_perm: int = 128):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.minhasher = MinHasher(num_perm=num_perm)
+        self.keys: List[str] = []
+        self.shingles: List[FrozenSet[str]] = []
+        self.stats: Dict[str, int] = {}
+
+    def add(self, key: str, text: str):
+        """Tokenize a document once and keep its shingle set"""
+        self.keys.append(key)
+        self.shingles.append(shingle(text, self.shingle_size))
+
+    def subset(self, keep: Callable[[str], bool]) -> 'NearDuplicateClusterer':
+        """A clusterer over the documents whose key passes ``keep``, reusing their shingle sets"""
+        clusterer = NearDuplicateClusterer(self.threshold, self.shingle_size, self.minhasher.num_perm)
+        for key, shingles in zip(self.keys, self.shingles):
+            if keep(key):
+                clusterer.keys.append(key)
+                clusterer.shingles.append(shingles)
+        return clusterer
+
+    def clusters(self) -> List[List[str]]:
+        """Clusters with more than one member, in insertion order of their first member"""
+        index = LSHIndex(self.threshold, self.minhasher.num_perm)
+        for item, shingles in enumerate(self.shingles):
+            if shingles:  # Empty documents are never similar to anything
+                index.insert(item, self.minhasher.signature(shingles))
+
+        candidate_pairs = index.candidate_pairs()
+        components = UnionFind()
+        for _ in self.keys:
+            components.add()
+
+        confirmed = 0
+        for item1, item2 in candidate_pairs:
+            if components.find(item1) == components.find(item2):
+                continue  # Already connected, the exact check cannot change the clusters
+            shingles1, shingles2 = self.shingles[item1], self.shingles[item2]
+            # Jaccard can never exceed the size ratio, which is far cheaper to check
+            if min(len(shingles1), len(shingles2)) <= self.threshold * max(len(shingles1), len(shingles2)):
+                continue
+            if jaccard(shingles1, shingles2) > self.threshold:
+                components.union(item1, item2)
+                confirmed += 1
+
+        members: Dict[int, List[str]] = {}
+        for item, key in enumerate(self.keys):
+            members.setdefault(components.find(item), []).append(key)
+
+        self.stats = {
+            "documents": len(self.keys),
+            "candidate_pairs": len(candidate_pairs),
+            "confirmed_pairs": confirmed
+        }
+        logger.info(f"Clustered {len(self.keys)} documents: {len(candidate_pairs)} LSH candidates, "
+                    f"{confirmed} confirmed merges")
+        return [group for group in members.values() if len(group) > 1]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Parallel Analysis Driver
+========================
+Shared process-pool driver for the script analyzers.
+
+Analyzers plug in their per-file function (usually a bound ``analyze_script``
+method); the driver fans the work out in chunks across a process pool and
+returns the results in input order, so reports are identical to a serial run.
+I/O-bound work (e.g. remote model calls) can use a thread pool instead.
+"""
+
+import os
+import pickle
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Per-file function installed once in each worker process by the pool initializer
+_worker_function: Optional[Callable] = None
+
+
+def _init_worker(analyze_file: Callable):
+    """Install the analyzer function in a worker process"""
+    global _worker_function
+    _worker_function = analyze_file
+
+
+def _call_safely(analyze_file: Callable, args: tuple) -> Any:
+    """Call the analyzer function, turning an exception into a logged ``None`` result"""
+    try:
+        return analyze_file(*args)
+    except Exception as e:
+        logger.error(f"Error analyzing {args[0] if args else '?'}: {e}")
+        return None
+
+
+def _analyze_chunk(chunk: Sequence[tuple]) -> List[Any]:
+    """Run the installed analyzer function over one chunk of argument tuples"""
+    return [_call_safely(_worker_function, args) for args in chunk]
+
+
+class ParallelAnalysisDriver:
+    """Run a per-file analysis function across a process (or thread) pool with ordered results"""
+
+    def __init__(self, max_workers: int = None, chunk_size: int = None, min_parallel_items: int = 32,
+                 use_threads: bool = False):
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_WORKERS', 0)) or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel_items = min_parallel_items
+        self.use_threads = use_threads
+
+    def map(self, analyze_file: Callable, items: Iterable[Any]) -> List[Any]:
+        """Apply ``analyze_file(item)`` to every item, preserving input order"""
+        return self.starmap(analyze_file, [(item,) for item in items])
+
+    def starmap(self, analyze_file: Callable, arg_tuples: Iterable[tuple]) -> List[Any]:
+        """Apply ``analyze_file(*args)`` to every argument tuple, preserving input order"""
+        arg_tuples = [tuple(args) for args in arg_tuples]
+
+        if self.use_threads and self.max_workers > 1 and len(arg_tuples) > 1:
+            return self._run_threaded(analyze_file, arg_tuples)
+
+        if self.use_threads or self.max_workers <= 1 or len(arg_tuples) < self.min_parallel_items:
+            return self._run_serial(analyze_file, arg_tuples)
+
+        chunks = self.make_chunks(arg_tuples)
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     initializer=_init_worker,
+                                     initargs=(analyze_file,)) as executor:
+                results = []
+                # executor.map yields chunk results in submission order
+                for chunk_results in executor.map(_analyze_chunk, chunks):
+                    results.extend(chunk_results)
+                return results
+        # Unpicklable state (connections, locks) raises TypeError rather than PicklingError
+        except (OSError, RuntimeError, ImportError, AttributeError, TypeError, pickle.PicklingError) as e:
+            logger.warning(f"Process pool unavailable ({e}), falling back to serial analysis")
+            return self._run_serial(analyze_file, arg_tuples)
+
+    def make_chunks(self, arg_tuples: List[tuple]) -> List[List[tuple]]:
+        """Split work items into chunks, roughly four per worker by default"""
+        chunk_size = self.chunk_size or max(1, -(-len(arg_tuples) // (self.max_workers * 4)))
+        return [arg_tuples[i:i + chunk_size] for i in range(0, len(arg_tuples), chunk_size)]
+
+    def _run_threaded(self, analyze_file: Callable, arg_tuples: List[tuple]) -> List[Any]:
+        """Run the analysis on a thread pool; threads overlap waiting on I/O, not CPU work"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda args: _call_safely(analyze_file, args), arg_tuples))
+
+    def _run_serial(self, analyze_file: Callable, arg_tuples: List[tuple]) -> List[Any]:
+        """Run the analysis in-process"""
+        _init_worker(analyze_file)
+        return _analyze_chunk(arg_tuples)
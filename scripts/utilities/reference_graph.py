@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Reference Graph
+===============
+Persistent script reference graph for incremental validation.
+
+For every scanned file the graph stores a stat stamp (mtime, size, mode),
+the script paths the file references and the per-file validation results.
+A reverse index (referenced path -> referencing files) is maintained next to
+it, so the files affected by a change are the changed files plus the files
+that reference them. Everything is saved as one JSON file together with the
+git commit it was last synced at and any extra state the caller keeps
+(e.g. functional test results).
+"""
+
+import os
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+GRAPH_VERSION = 1
+
+
+@dataclass
+class FileRecord:
+    """Indexed state of one file"""
+    stamp: List[int]
+    references: List[str] = field(default_factory=list)
+    results: Dict[str, Any] = field(default_factory=dict)
+
+
+def file_stamp(stat_result: os.stat_result) -> List[int]:
+    """Change stamp of a file; the mode is included so chmod +x counts as a change"""
+    return [stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_mode]
+
+
+class ReferenceGraph:
+    """Forward and reverse script references, persisted between validation runs"""
+
+    def __init__(self, graph_file: str):
+        self.graph_file = graph_file
+        self.files: Dict[str, FileRecord] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self.git_commit: Optional[str] = None
+        self.state: Dict[str, Any] = {}
+        self.loaded = self.load()
+
+    def load(self) -> bool:
+        """Load the saved graph; returns False when there is none (or it is from another version)"""
+        try:
+            with open(self.graph_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable reference graph {self.graph_file}: {e}")
+            return False
+
+        if data.get("version") != GRAPH_VERSION:
+            return False
+
+        self.files = {path: FileRecord(**record) for path, record in data.get("files", {}).items()}
+        self.dependents = {target: set(sources) for target, sources in data.get("dependents", {}).items()}
+        self.git_commit = data.get("git_commit")
+        self.state = data.get("state", {})
+        return True
+
+    def save(self):
+        """Write the graph to disk"""
+        data = {
+            "version": GRAPH_VERSION,
+            "git_commit": self.git_commit,
+            "files": {path: asdict(record) for path, record in sorted(self.files.items())},
+            "dependents": {target: sorted(sources) for target, sources in sorted(self.dependents.items())},
+            "state": self.state
+        }
+        graph_dir = os.path.dirname(self.graph_file)
+        if graph_dir:
+            os.makedirs(graph_dir, exist_ok=True)
+        temp_file = f"{self.graph_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_file, self.graph_file)
+
+    def is_current(self, file_path: str, stat_result: os.stat_result) -> bool:
+        """Whether the stored record still describes the file on disk"""
+        record = self.files.get(file_path)
+        return record is not None and record.stamp == file_stamp(stat_result)
+
+    def update(self, file_path: str, stat_result: os.stat_result, references: Iterable[str],
+               results: Dict[str, Any] = None) -> FileRecord:
+        """Store a file's references and results, replacing its outgoing edges"""
+        self._drop_edges(file_path)
+        record = FileRecord(stamp=file_stamp(stat_result), references=list(references), results=results or {})
+        self.files[file_path] = record
+        for target in set(record.references):
+            self.dependents.setdefault(target, set()).add(file_path)
+        return record
+
+    def remove(self, file_path: str):
+        """Drop a deleted file (its incoming edges stay: the files referencing it are now broken)"""
+        self._drop_edges(file_path)
+        self.files.pop(file_path, None)
+
+    def affected(self, changed_paths: Iterable[str]) -> Set[str]:
+        """Changed files that are still indexed plus every indexed file referencing a changed path"""
+        affected = set()
+        for path in changed_paths:
+            if path in self.files:
+                affected.add(path)
+            affected.update(source for source in self.dependents.get(path, ()) if source in self.files)
+        return affected
+
+    def _drop_edges(self, file_path: str):
+        record = self.files.get(file_path)
+        if record is None:
+            return
+        for target in set(record.references):
+            sources = self.dependents.get(target)
+            if sources is not None:
+                sources.discard(file_path)
+                if not sources:
+                    del self.dependents[target]
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Reference Rewriter
+==================
+Single-pass rewrite engine for script path and module references.
+
+The old-to-new mapping is compiled into dictionaries and every reference
+form (``scripts/name.sh`` paths and ``scripts.module`` imports) is matched
+by one combined regex. Each file is rewritten with a single ``re.sub`` whose
+callback looks the reference up, so the cost per file is one scan no matter
+how large the mapping is.
+"""
+
+import re
+import difflib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Path references and module references in import statements (``from [..]scripts.x import``,
+# ``import scripts.x``); the boundaries keep e.g. scripts/app.js from matching inside scripts/app.json
+# and pkg.scripts.x or self.scripts.x from matching at all
+REFERENCE_PATTERN = re.compile(
+    r'(?<![\w.-])scripts/(?P<script>[a-zA-Z0-9_-]+\.(?:sh|py|js))(?![\w-])'
+    r'|(?P<prefix>(?<![\w.])(?:from|import)[ \t]+(?:\.\.)?)scripts\.(?P<module>[a-zA-Z0-9_-]+)(?![\w-])'
+)
+
+
+@dataclass
+class RewriteResult:
+    """Outcome of rewriting one file"""
+    file_path: str
+    replacements: int
+    written: bool
+    diff: str = ""
+
+
+class ReferenceRewriter:
+    """Rewrite references according to a script-name and module-name mapping"""
+
+    def __init__(self, script_paths: Dict[str, str], module_paths: Dict[str, str]):
+        self.script_paths = script_paths  # "name.sh" -> "scripts/category/sub/consolidated_sub.py"
+        self.module_paths = module_paths  # "name" -> "scripts.category.sub.consolidated_sub"
+
+    def rewrite_text(self, content: str) -> Tuple[str, int]:
+        """Rewrite every mapped reference in one pass, returning the new text and replacement count"""
+        if not self.script_paths and not self.module_paths:
+            return content, 0
+
+        replacements = 0
+
+        def replace(match) -> str:
+            nonlocal replacements
+            if match.group('script'):
+                new_reference = self.script_paths.get(match.group('script'))
+            else:
+                new_reference = self.module_paths.get(match.group('module'))
+                if new_reference is not None:
+                    new_reference = match.group('prefix') + new_reference
+            if new_reference is None or new_reference == match.group(0):
+                return match.group(0)
+            replacements += 1
+            return new_reference
+
+        return REFERENCE_PATTERN.sub(replace, content), replacements
+
+    def rewrite_file(self, file_path: str, dry_run: bool = False) -> Optional[RewriteResult]:
+        """Rewrite one file in place (or only diff it in dry-run mode)"""
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        new_content, replacements = self.rewrite_text(content)
+        if not replacements:
+            return None
+
+        if dry_run:
+            return RewriteResult(file_path, replacements, written=False,
+                                 diff=unified_diff(file_path, content, new_content))
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+        return RewriteResult(file_path, replacements, written=True)
+
+
+def unified_diff(file_path: str, old_content: str, new_content: str) -> str:
+    """Unified diff between two versions of a file"""
+    return ''.join(difflib.unified_diff(
+        old_content.splitlines(keepends=True), new_content.splitlines(keepends=True),
+        fromfile=f"a/{file_path}", tofile=f"b/{file_path}"
+    ))
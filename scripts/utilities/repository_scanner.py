@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Repository Scanner
+==================
+Single-pass file scanner shared by the script maintenance tools.
+
+The tree is walked once and file contents and hashes are cached keyed by
+(mtime, size). Registered probes are evaluated together in one pass per file:
+"any match" probes are folded into a single alternation regex, and extractors
+collect every match from the same in-memory content.
+
+Case-insensitive probes are matched against a lowercased copy of the content
+with lowercased patterns; Python's ``re`` loses its literal-prefix scanning
+under IGNORECASE, which makes the combined alternation an order of magnitude
+slower otherwise.
+"""
+
+import os
+import re
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXCLUDE_DIRS = ('.git', 'node_modules', '__pycache__', '.turbo')
+
+
+@dataclass
+class ScannedFile:
+    """Cached content and probe results for one file"""
+    path: str
+    size: int
+    mtime: float
+    content_hash: str
+    content: str
+    probe_hits: Set[str] = field(default_factory=set)
+    extractions: Dict[str, List[str]] = field(default_factory=dict)
+    probe_version: int = -1
+
+
+class RepositoryScanner:
+    """Walk a tree once and evaluate every registered probe in one read per file"""
+
+    def __init__(self, root_dir: str, extensions: Tuple[str, ...] = None,
+                 exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS):
+        self.root_dir = root_dir
+        self.extensions = extensions
+        self.exclude_dirs = set(exclude_dirs)
+        self.probes: Dict[str, str] = {}  # probe name -> regex group id
+        self.probe_patterns: Dict[str, str] = {}  # regex group id -> alternation source
+        self.case_insensitive: Set[str] = set()  # regex group ids matched against lowercased content
+        self.extractors: Dict[str, List[Pattern]] = {}
+        self._cache: Dict[str, ScannedFile] = {}
+        self._file_paths: Optional[List[str]] = None
+        self._combined: Dict[FrozenSet[str], Pattern] = {}
+        self._probe_version = 0
+
+    def register_probe(self, name: str, patterns: List[str], ignore_case: bool = True):
+        """Register an "any of these patterns matches" probe"""
+        group_id = f"probe_{len(self.probe_patterns)}"
+        if ignore_case:
+            patterns = [lowercase_pattern(pattern) for pattern in patterns]
+            self.case_insensitive.add(group_id)
+        self.probes[name] = group_id
+        self.probe_patterns[group_id] = '|'.join(f'(?:{pattern})' for pattern in patterns)
+        self._combined.clear()
+        self._probe_version += 1
+
+    def register_extractor(self, name: str, patterns: List[str], flags: int = 0):
+        """Register an extractor that collects every ``findall`` match of its patterns"""
+        self.extractors[name] = [re.compile(pattern, flags) for pattern in patterns]
+        self._probe_version += 1
+
+    def file_paths(self, refresh: bool = False) -> List[str]:
+        """List matching files under the root, walking the tree only once"""
+        if self._file_paths is None or refresh:
+            file_paths = []
+            for root, dirs, files in os.walk(self.root_dir):
+                dirs[:] = sorted(d for d in dirs if d not in self.exclude_dirs)
+                for file in sorted(files):
+                    if self.extensions is None or file.endswith(self.extensions):
+                        file_paths.append(os.path.join(root, file))
+            self._file_paths = file_paths
+        return self._file_paths
+
+    def get(self, file_path: str) -> ScannedFile:
+        """Return cached file content, re-reading only when mtime or size changed"""
+        stat = os.stat(file_path)
+        cached = self._cache.get(file_path)
+        if cached and cached.mtime == stat.st_mtime and cached.size == stat.st_size:
+            return cached
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+
+        scanned = ScannedFile(
+            path=file_path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=hashlib.sha256(raw).hexdigest(),
+            content=raw.decode('utf-8', errors='ignore')
+        )
+        self._cache[file_path] = scanned
+        return scanned
+
+    def read_text(self, file_path: str) -> str:
+        """Read a file through the cache"""
+        return self.get(file_path).content
+
+    def forget(self, file_path: str):
+        """Drop a file from the cache after it has been rewritten"""
+        self._cache.pop(file_path, None)
+
+    def evaluate(self, file_path: str) -> ScannedFile:
+        """Read a file (through the cache) and evaluate all probes and extractors on it"""
+        scanned = self.get(file_path)
+        if scanned.probe_version != self._probe_version:
+            scanned.probe_hits = self.match_probes(scanned.content)
+            scanned.extractions = {
+                name: [match for pattern in patterns for match in pattern.findall(scanned.content)]
+                for name, patterns in self.extractors.items()
+            }
+            scanned.probe_version = self._probe_version
+        return scanned
+
+    def scan(self, refresh: bool = False) -> Dict[str, ScannedFile]:
+        """Evaluate every registered probe over every file in one I/O pass"""
+        results = {}
+        for file_path in self.file_paths(refresh):
+            try:
+                results[file_path] = self.evaluate(file_path)
+            except OSError as e:
+                logger.error(f"Error scanning {file_path}: {e}")
+        return results
+
+    def probe_hits(self, name: str) -> Set[str]:
+        """Paths of files in which the named probe matched"""
+        return {path for path, scanned in self.scan().items() if name in scanned.probe_hits}
+
+    def extractions(self, name: str) -> Dict[str, List[str]]:
+        """Matches of the named extractor, per file"""
+        return {path: scanned.extractions.get(name, []) for path, scanned in self.scan().items()}
+
+    def match_probes(self, content: str) -> Set[str]:
+        """Find which probes match, scanning the content with one combined regex"""
+        group_names = {group_id: name for name, group_id in self.probes.items()}
+        hits = set()
+
+        case_insensitive = self.case_insensitive & set(group_names)
+        for text, remaining in ((content.lower(), case_insensitive),
+                                (content, set(group_names) - case_insensitive)):
+            position = 0
+            while remaining:
+                match = self.combined_pattern(frozenset(remaining)).search(text, position)
+                if not match:
+                    break
+                hits.add(group_names[match.lastgroup])
+                remaining.discard(match.lastgroup)
+                # Other probes may also match at this position; resume from it without the satisfied probe
+                position = match.start()
+
+        return hits
+
+    def combined_pattern(self, group_ids: FrozenSet[str]) -> Pattern:
+        """Compile (and memoize) one alternation over the given probes"""
+        if group_ids not in self._combined:
+            ordered = [group_id for group_id in self.probe_patterns if group_id in group_ids]
+            self._combined[group_ids] = re.compile(
+                '|'.join(f'(?P<{group_id}>{self.probe_patterns[group_id]})' for group_id in ordered)
+            )
+        return self._combined[group_ids]
+
+
+def lowercase_pattern(pattern: str) -> str:
+    """Lowercase the literal characters of a regex, leaving escapes such as \\S or \\W intact"""
+    result = []
+    escaped = False
+    for char in pattern:
+        result.append(char if escaped else char.lower())
+        escaped = char == '\\' and not escaped
+    return ''.join(result)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Source Edit Plan
+================
+Batch function extraction and removal for Python, Bash and JavaScript files.
+
+A ``FileEditPlan`` collects every extraction and removal requested for one
+file, parses the file once to locate function spans (``ast`` with
+``end_lineno`` for Python, a small quote/comment/heredoc-aware brace
+tokenizer for Bash and JavaScript), and applies all edits in a single write.
+"""
+
+import re
+import ast
+import logging
+import textwrap
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BASH_FUNCTION_PATTERN = re.compile(
+    r'^[ \t]*(?:function[ \t]+(?P<kw_name>[A-Za-z_][\w:-]*)(?:[ \t]*\([ \t]*\))?'
+    r'|(?P<name>[A-Za-z_][\w:-]*)[ \t]*\([ \t]*\))[ \t]*(?:\n[ \t]*)?\{',
+    re.MULTILINE
+)
+JAVASCRIPT_FUNCTION_PATTERN = re.compile(
+    r'^[ \t]*(?:export[ \t]+)?(?:(?:async[ \t]+)?function[ \t]*\*?[ \t]*(?P<name>[A-Za-z_$][\w$]*)[ \t]*\('
+    r'|(?:const|let|var)[ \t]+(?P<var_name>[A-Za-z_$][\w$]*)[ \t]*=[ \t]*(?:async[ \t]+)?(?:function\b[^(]*)?\()',
+    re.MULTILINE
+)
+HEREDOC_PATTERN = re.compile(r'<<-?[ \t]*([\'"]?)([A-Za-z_][\w]*)\1')
+
+
+@dataclass
+class FunctionSpan:
+    """Location of one function definition"""
+    name: str
+    start: int  # first line (0-based, decorators included)
+    end: int  # line after the last line of the function
+    def_line: int  # line with the def/function keyword (0-based)
+    indent: str = ""
+    parent: Optional[int] = None  # id of the enclosing Python body, for keeping it non-empty
+    parent_size: int = 0
+
+
+def locate_functions(file_path: str, content: str) -> List[FunctionSpan]:
+    """Locate every function definition in a source file"""
+    if file_path.endswith('.py'):
+        return locate_python_functions(content)
+    if file_path.endswith('.sh'):
+        return locate_brace_functions(content, BASH_FUNCTION_PATTERN, 'bash')
+    if file_path.endswith('.js'):
+        return locate_brace_functions(content, JAVASCRIPT_FUNCTION_PATTERN, 'javascript')
+    return []
+
+
+def locate_python_functions(content: str) -> List[FunctionSpan]:
+    """Locate Python functions with the AST, falling back to indentation for unparseable files"""
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        return locate_python_functions_by_indent(content)
+
+    lines = content.split('\n')
+    spans = []
+    for parent in ast.walk(tree):
+        for field in ('body', 'orelse', 'finalbody'):
+            body = getattr(parent, field, None)
+            if not isinstance(body, list):
+                continue
+            for node in body:
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    start = min([node.lineno] + [decorator.lineno for decorator in node.decorator_list]) - 1
+                    def_line = node.lineno - 1
+                    spans.append(FunctionSpan(
+                        name=node.name,
+                        start=start,
+                        end=node.end_lineno,
+                        def_line=def_line,
+                        indent=re.match(r'[ \t]*', lines[def_line]).group(0),
+                        parent=id(body),
+                        parent_size=len(body)
+                    ))
+    spans.sort(key=lambda span: span.start)
+    return spans
+
+
+def locate_python_functions_by_indent(content: str) -> List[FunctionSpan]:
+    """Indentation-based fallback for Python files that do not parse"""
+    lines = content.split('\n')
+    spans = []
+    for i, line in enumerate(lines):
+        match = re.match(r'([ \t]*)(?:async[ \t]+)?def[ \t]+([A-Za-z_]\w*)[ \t]*\(', line)
+        if not match:
+            continue
+        indent = match.group(1)
+
+        start = i
+        while start > 0 and lines[start - 1].startswith(indent + '@'):
+            start -= 1
+
+        end = i + 1
+        last_code_line = i
+        while end < len(lines):
+            current = lines[end]
+            if current.strip():
+                current_indent = len(current) - len(current.lstrip())
+                if current_indent <= len(indent) and not current.lstrip().startswith((')', ']', '}')):
+                    break
+                last_code_line = end
+            end += 1
+
+        spans.append(FunctionSpan(name=match.group(2), start=start, end=last_code_line + 1,
+                                  def_line=i, indent=indent))
+    return spans
+
+
+def locate_brace_functions(content: str, header_pattern, language: str) -> List[FunctionSpan]:
+    """Locate Bash/JavaScript functions whose body is a brace-delimited block"""
+    spans = []
+    for match in header_pattern.finditer(content):
+        name = next(group for group in match.groups() if group)
+        open_index = find_body_start(content, match, language)
+        if open_index is None:
+            continue
+
+        close_index = find_block_end(content, open_index, language)
+        start = content.count('\n', 0, match.start())
+        end = content.count('\n', 0, close_index) + 1
+        line_start = content.rfind('\n', 0, match.start()) + 1
+        spans.append(FunctionSpan(
+            name=name,
+            start=start,
+            end=end,
+            def_line=start,
+            indent=re.match(r'[ \t]*', content[line_start:]).group(0)
+        ))
+
+    # Drop functions nested inside an earlier one (they go with their parent)
+    top_level = []
+    for span in spans:
+        if not top_level or span.start >= top_level[-1].end:
+            top_level.append(span)
+    return top_level
+
+
+def find_body_start(content: str, header, language: str) -> Optional[int]:
+    """Index of the opening brace of a function body"""
+    if language == 'bash':
+        return header.end() - 1
+
+    # JavaScript: skip the parameter list, then an optional arrow
+    index = find_block_end(content, header.end() - 1, language, open_char='(', close_char=')')
+    while index < len(content) and content[index] in ' \t\r\n':
+        index += 1
+    if content.startswith('=>', index):
+        index += 2
+        while index < len(content) and content[index] in ' \t\r\n':
+            index += 1
+    if index < len(content) and content[index] == '{':
+        return index
+    return None  # Expression-bodied arrow functions have no block to move
+
+
+def find_block_end(content: str, open_index: int, language: str,
+                   open_char: str = '{', close_char: str = '}') -> int:
+    """Index just past the bracket matching the one at ``open_index``"""
+    depth = 0
+    pending_heredocs: List[Tuple[str, bool]] = []
+    i = open_index
+    n = len(content)
+
+    while i < n:
+        char = content[i]
+
+        if char == '\n' and pending_heredocs:
+            i = skip_heredocs(content, i + 1, pending_heredocs)
+            pending_heredocs = []
+            continue
+
+        if char == '\\':
+            i += 2
+            continue
+
+        if char in '\'"' or (char == '`' and language == 'javascript'):
+            i = skip_string(content, i, language)
+            continue
+
+        if language == 'bash':
+            if char == '#' and (i == 0 or content[i - 1] in ' \t\n;'):
+                i = content.find('\n', i)
+                i = n if i == -1 else i
+                continue
+            if char == '<' and content.startswith('<<', i) and not content.startswith('<<<', i):
+                heredoc = HEREDOC_PATTERN.match(content, i)
+                if heredoc:
+                    pending_heredocs.append((heredoc.group(2), content.startswith('<<-', i)))
+                    i = heredoc.end()
+                    continue
+        else:
+            if content.startswith('//', i):
+                i = content.find('\n', i)
+                i = n if i == -1 else i
+                continue
+            if content.startswith('/*', i):
+                i = content.find('*/', i + 2)
+                i = n if i == -1 else i + 2
+                continue
+
+        if char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+
+    return n
+
+
+def skip_string(content: str, index: int, language: str) -> int:
+    """Index just past the string literal starting at ``index``"""
+    quote = content[index]
+    i = index + 1
+    # Bash single quotes have no escapes
+    escapes = not (language == 'bash' and quote == "'")
+    while i < len(content):
+        if escapes and content[i] == '\\':
+            i += 2
+            continue
+        if content[i] == quote:
+            return i + 1
+        i += 1
+    return len(content)
+
+
+def skip_heredocs(content: str, index: int, heredocs: List[Tuple[str, bool]]) -> int:
+    """Skip heredoc bodies that start at ``index``, returning the index after the last terminator"""
+    for terminator, strip_tabs in heredocs:
+        while index < len(content):
+            line_end = content.find('\n', index)
+            line_end = len(content) if line_end == -1 else line_end
+            line = content[index:line_end]
+            index = line_end + 1
+            if (line.lstrip('\t') if strip_tabs else line) == terminator:
+                break
+    return min(index, len(content))
+
+
+class FileEditPlan:
+    """All function extractions and removals for one file, applied with one parse and one write"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.extractions: List[Tuple[str, Optional[int]]] = []
+        self.removals: List[Tuple[str, Optional[int]]] = []
+
+    def extract(self, func_name: str, line: Optional[int] = None):
+        """Queue a function for extraction (``line`` disambiguates same-named definitions)"""
+        self.extractions.append((func_name, line))
+
+    def remove(self, func_name: str, line: Optional[int] = None):
+        """Queue a function for removal"""
+        self.removals.append((func_name, line))
+
+    def apply(self, write: bool = True) -> Dict[str, str]:
+        """Parse the file once, return extracted sources by name and write the file once"""
+        with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        lines = content.split('\n')
+        spans = locate_functions(self.file_path, content)
+
+        extracted = {}
+        for func_name, line in self.extractions:
+            span = self.resolve(spans, func_name, line)
+            if span is None:
+                extracted[func_name] = f"# Function {func_name} could not be extracted"
+                continue
+            source = '\n'.join(lines[span.start:span.end])
+            extracted[func_name] = textwrap.dedent(source) if self.file_path.endswith('.py') else source
+
+        removed_spans = []
+        for func_name, line in self.removals:
+            span = self.resolve(spans, func_name, line)
+            if span is None:
+                logger.warning(f"Function '{func_name}' not found (or ambiguous) in {self.file_path}")
+            elif span not in removed_spans:
+                removed_spans.append(span)
+
+        if removed_spans and write:
+            new_content = self.remove_spans(lines, removed_spans)
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            logger.info(f"Removed {len(removed_spans)} functions from {self.file_path}")
+
+        return extracted
+
+    @staticmethod
+    def resolve(spans: List[FunctionSpan], func_name: str, line: Optional[int]) -> Optional[FunctionSpan]:
+        """Pick the span for a function: the definition at the given (0-based) line, or the only one.
+
+        Same-named definitions without a matching line are ambiguous and resolve to ``None``, so
+        a removal never hits a definition other than the recommended one.
+        """
+        candidates = [span for span in spans if span.name == func_name]
+        if line is not None:
+            for span in candidates:
+                if span.start <= line <= span.def_line:
+                    return span
+        return candidates[0] if len(candidates) == 1 else None
+
+    @staticmethod
+    def remove_spans(lines: List[str], spans: List[FunctionSpan]) -> str:
+        """Drop the given spans, keeping Python blocks that would become empty valid with ``pass``"""
+        removed_per_parent: Dict[int, int] = {}
+        for span in spans:
+            if span.parent is not None:
+                removed_per_parent[span.parent] = removed_per_parent.get(span.parent, 0) + 1
+
+        replacements: Dict[int, Tuple[int, List[str]]] = {}
+        placeholder_parents = set()
+        for span in sorted(spans, key=lambda span: span.start):
+            if any(other is not span and other.start <= span.start and span.end <= other.end for other in spans):
+                continue  # Nested inside another removed function
+            replacement = []
+            if (span.parent is not None and span.parent not in placeholder_parents
+                    and removed_per_parent[span.parent] >= span.parent_size):
+                replacement = [f"{span.indent}pass"]
+                placeholder_parents.add(span.parent)
+            replacements[span.start] = (span.end, replacement)
+
+        new_lines = []
+        i = 0
+        while i < len(lines):
+            if i in replacements:
+                end, replacement = replacements[i]
+                new_lines.extend(replacement)
+                # Collapse the blank line that separated the removed function from the next block
+                if end < len(lines) and not lines[end].strip() and new_lines and not new_lines[-1].strip():
+                    end += 1
+                i = end
+                continue
+            new_lines.append(lines[i])
+            i += 1
+
+        return '\n'.join(new_lines)
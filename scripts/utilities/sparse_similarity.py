@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Sparse Similarity
+=================
+Weighted set-similarity matrices over sparse binary feature vectors.
+
+Every item is stored once as a row of feature ids, split into weighted
+families (e.g. functions, imports, name tokens). The similarity of two rows
+is the weighted sum of their per-family Jaccard similarities, and the
+per-family intersection sizes come from the sparse product ``X @ X.T``. That
+product is computed from posting lists (feature id -> rows). Only pairs that
+share a feature ever get touched, so a block of the matrix costs the number
+of co-occurrences, not the number of pairs.
+
+With a similarity threshold, families whose total weight cannot lift a pair
+above the threshold on their own are dropped from candidate generation.
+Their overlaps are then computed exactly for the surviving candidates only.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SparseFeatureMatrix:
+    """Rows of binary features grouped into weighted families"""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = dict(weights)  # Similarity terms are summed in this order
+        self.families = list(self.weights)
+        self.vocabulary: Dict[Tuple[str, Hashable], int] = {}
+        self.rows: List[Tuple[FrozenSet[int], ...]] = []
+
+    def add_row(self, features: Dict[str, Iterable[Hashable]]) -> int:
+        """Add one item's features (by family) and return its row id"""
+        row = []
+        for family in self.families:
+            feature_ids = set()
+            for feature in features.get(family, ()):
+                key = (family, feature)
+                feature_id = self.vocabulary.get(key)
+                if feature_id is None:
+                    feature_id = len(self.vocabulary)
+                    self.vocabulary[key] = feature_id
+                feature_ids.add(feature_id)
+            row.append(frozenset(feature_ids))
+        self.rows.append(tuple(row))
+        return len(self.rows) - 1
+
+    def similarity(self, row1: int, row2: int, overlaps: Sequence[int] = None) -> float:
+        """Weighted Jaccard similarity of two rows (0-1); ``overlaps`` are precomputed intersection sizes"""
+        similarity = 0.0
+        for index, family in enumerate(self.families):
+            features1, features2 = self.rows[row1][index], self.rows[row2][index]
+            shared = overlaps[index] if overlaps is not None and overlaps[index] is not None \
+                else len(features1 & features2)
+            if shared:
+                similarity += shared / (len(features1) + len(features2) - shared) * self.weights[family]
+        return min(similarity, 1.0)
+
+    def candidate_families(self, rows: Sequence[int], threshold: float) -> List[int]:
+        """Family indexes whose shared features must generate candidate pairs for the given threshold.
+
+        A pair that shares nothing in the candidate families scores at most the
+        weight of the other families. So the costliest families (by sum of
+        squared document frequencies) are left out while that weight stays at
+        or below the threshold.
+        """
+        indexes = list(range(len(self.families)))
+        if threshold <= 0:
+            return indexes
+
+        costs = {}
+        for index in indexes:
+            frequencies = Counter()
+            for row in rows:
+                frequencies.update(self.rows[row][index])
+            costs[index] = sum(count * count for count in frequencies.values())
+
+        excluded_weight = 0.0
+        candidates = set(indexes)
+        for index in sorted(indexes, key=lambda index: costs[index], reverse=True):
+            weight = self.weights[self.families[index]]
+            if excluded_weight + weight <= threshold and len(candidates) > 1:
+                candidates.discard(index)
+                excluded_weight += weight
+        return sorted(candidates)
+
+    def pairwise_similarities(self, rows: Sequence[int], threshold: float = 0.0,
+                              groups: Sequence[Hashable] = None) -> Dict[Tuple[int, int], float]:
+        """Upper triangle of the similarity matrix block for ``rows``, keyed by positions in ``rows``.
+
+        Only pairs scoring above ``threshold`` are returned (pairs with no
+        shared feature score 0). When ``groups`` is given, pairs whose
+        positions share a group are skipped. Keys are in row-major order.
+        """
+        candidate_families = self.candidate_families(rows, threshold)
+        # None marks families whose overlap is computed exactly, only for the final candidates
+        empty_counts = [0 if index in candidate_families else None for index in range(len(self.families))]
+
+        overlaps: Dict[Tuple[int, int], List[int]] = {}
+        for index in candidate_families:
+            postings = defaultdict(list)
+            for position, row in enumerate(rows):
+                for feature_id in self.rows[row][index]:
+                    postings[feature_id].append(position)
+
+            for positions in postings.values():
+                for i, position1 in enumerate(positions):
+                    group = groups[position1] if groups is not None else None
+                    for position2 in positions[i + 1:]:
+                        if groups is not None and groups[position2] == group:
+                            continue
+                        counts = overlaps.get((position1, position2))
+                        if counts is None:
+                            counts = empty_counts.copy()
+                            overlaps[(position1, position2)] = counts
+                        counts[index] += 1
+
+        similarities = {}
+        for position1, position2 in sorted(overlaps):
+            similarity = self.similarity(rows[position1], rows[position2], overlaps[(position1, position2)])
+            if similarity > threshold:
+                similarities[(position1, position2)] = similarity
+
+        logger.debug(f"Similarity block of {len(rows)} rows: {len(overlaps)} co-occurring pairs, "
+                     f"{len(similarities)} above {threshold}")
+        return similarities
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Sync History Store
+==================
+Append-only SQLite store for n8n sync history, shared by the sync and
+monitoring tools.
+
+Sync operations are appended as rows indexed by time. Time-window queries
+(e.g. "the last 24 hours") are index range scans, O(log n) plus the rows
+returned, however long the history grows. Per-workflow state (structural
+hash and updatedAt) lives in a summary table with one row per workflow, and
+scalar values such as ``last_sync`` in a key/value table. Writing one
+operation or one workflow's state touches only that row, never the whole
+history. ``compact`` drops operations older than the retention period and
+returns the freed pages to the filesystem.
+
+The database runs in WAL mode, so the monitor can read while a sync writes.
+A history kept in the older ``n8n-sync-history.json`` format is imported
+once by ``import_legacy_history``.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_DB = "n8n-sync-history.sqlite"
+DEFAULT_RETENTION_DAYS = 90
+
+
+def timestamp_to_epoch(timestamp: Optional[str]) -> float:
+    """Epoch seconds of an ISO timestamp (naive timestamps are local time); now if missing or invalid"""
+    if not timestamp:
+        return time.time()
+    try:
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return time.time()
+
+
+class SyncHistoryStore:
+    """Time-indexed sync operations plus a per-workflow summary table"""
+
+    def __init__(self, db_file: str = DEFAULT_HISTORY_DB):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_file)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Shared by the sync worker threads; every access goes through the lock
+        self.connection = sqlite3.connect(db_file, check_same_thread=False)
+        self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Only effective on a new database
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS sync_operations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                operation TEXT,
+                workflow_id TEXT,
+                status TEXT,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sync_operations_ts ON sync_operations (ts);
+            CREATE TABLE IF NOT EXISTS workflow_state (
+                workflow_id TEXT PRIMARY KEY,
+                hash TEXT,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS sync_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.connection.commit()
+
+    def append_operation(self, operation: Dict):
+        """Append one sync operation (a dict with at least a ``timestamp``)"""
+        with self._lock:
+            self.connection.execute(
+                "INSERT INTO sync_operations (ts, operation, workflow_id, status, payload) VALUES (?, ?, ?, ?, ?)",
+                (timestamp_to_epoch(operation.get('timestamp')), operation.get('operation'),
+                 operation.get('workflow_id'), operation.get('status'), json.dumps(operation))
+            )
+
+    def operations_since(self, since: float, status: str = None) -> List[Dict]:
+        """Operations at or after an epoch time, oldest first (optionally only one status)"""
+        query = "SELECT payload FROM sync_operations WHERE ts >= ?"
+        params: List[Any] = [since]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self.connection.execute(query + " ORDER BY ts", params).fetchall()
+        return [json.loads(payload) for payload, in rows]
+
+    def count_since(self, since: float, status: str = None) -> int:
+        """Number of operations at or after an epoch time (optionally only one status)"""
+        query = "SELECT COUNT(*) FROM sync_operations WHERE ts >= ?"
+        params: List[Any] = [since]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            return self.connection.execute(query, params).fetchone()[0]
+
+    def operation_times(self, since: float = None, limit: int = None) -> List[float]:
+        """Epoch times of operations, oldest first: those since a time, or the most recent ``limit``"""
+        with self._lock:
+            if since is not None:
+                rows = self.connection.execute(
+                    "SELECT ts FROM sync_operations WHERE ts >= ? ORDER BY ts", (since,)
+                ).fetchall()
+            else:
+                rows = self.connection.execute(
+                    "SELECT ts FROM sync_operations ORDER BY ts DESC LIMIT ?", (limit or -1,)
+                ).fetchall()[::-1]
+        return [ts for ts, in rows]
+
+    def recent_operations(self, limit: int = 10) -> List[Dict]:
+        """The most recent operations, oldest first"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT payload FROM sync_operations ORDER BY ts DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(payload) for payload, in reversed(rows)]
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        """A value from the key/value table"""
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM sync_meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value: Any):
+        """Store a JSON-serializable value in the key/value table"""
+        with self._lock:
+            self.connection.execute("INSERT OR REPLACE INTO sync_meta VALUES (?, ?)", (key, json.dumps(value)))
+
+    def workflow_state(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Recorded hash and updatedAt of every workflow, keyed by workflow id"""
+        with self._lock:
+            rows = self.connection.execute("SELECT workflow_id, hash, updated_at FROM workflow_state").fetchall()
+        return {workflow_id: {'hash': hash_, 'updated_at': updated_at} for workflow_id, hash_, updated_at in rows}
+
+    def set_workflow_state(self, workflow_id: str, workflow_hash: str = None, updated_at: str = None):
+        """Upsert one workflow's summary row; ``None`` leaves a field unchanged"""
+        with self._lock:
+            self.connection.execute("""
+                INSERT INTO workflow_state (workflow_id, hash, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (workflow_id) DO UPDATE SET
+                    hash = COALESCE(excluded.hash, hash),
+                    updated_at = COALESCE(excluded.updated_at, updated_at)
+            """, (workflow_id, workflow_hash, updated_at))
+
+    def compact(self, retention_days: int = DEFAULT_RETENTION_DAYS) -> int:
+        """Delete operations older than the retention period; returns the number removed"""
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            removed = self.connection.execute("DELETE FROM sync_operations WHERE ts < ?", (cutoff,)).rowcount
+            self.connection.commit()
+            if removed:
+                # executescript steps the pragma to completion (execute() frees one page per step)
+                self.connection.executescript("PRAGMA incremental_vacuum; PRAGMA wal_checkpoint(TRUNCATE);")
+        return removed
+
+    def import_legacy_history(self, json_file: str) -> bool:
+        """Import a JSON history file once, into an empty store; returns True if anything was imported"""
+        if not os.path.exists(json_file) or self.get_meta('legacy_import') is not None:
+            return False
+        with self._lock:
+            has_rows = self.connection.execute("SELECT 1 FROM sync_operations LIMIT 1").fetchone()
+        if has_rows:
+            return False
+
+        try:
+            with open(json_file, 'r') as f:
+                history = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to import sync history {json_file}: {e}")
+            return False
+
+        for operation in history.get('sync_operations', []):
+            self.append_operation(operation)
+        updated_at = history.get('workflow_updated_at', {})
+        for workflow_id in set(history.get('workflow_hashes', {})) | set(updated_at):
+            self.set_workflow_state(workflow_id, history.get('workflow_hashes', {}).get(workflow_id),
+                                    updated_at.get(workflow_id))
+        if history.get('last_sync'):
+            self.set_meta('last_sync', history['last_sync'])
+        self.set_meta('legacy_import', json_file)
+        self.commit()
+        logger.info(f"Imported {len(history.get('sync_operations', []))} sync operations from {json_file}")
+        return True
+
+    def commit(self):
+        """Flush pending writes to disk"""
+        with self._lock:
+            self.connection.commit()
+
+    def close(self):
+        """Commit and close the database"""
+        self.commit()
+        self.connection.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Webhook Load Test
+=================
+Concurrent load generator for n8n webhooks, with per-webhook latency
+percentiles, error breakdown and throughput.
+
+``concurrency`` worker threads (each with its own keep-alive session) take
+request numbers from a shared counter. Request ``k`` goes to target
+``k % len(targets)`` with the next payload of that target's corpus, so
+webhooks receive an even, interleaved load. With a ``rate``, request ``k``
+is sent at a precomputed offset. The rate climbs linearly from zero over
+``ramp_up`` seconds, then holds (open loop; ``max_schedule_lag`` shows when
+the workers could not keep up). Without a rate, every worker sends
+back-to-back, and the workers start one by one across ``ramp_up``. A run
+ends after ``requests`` requests or ``duration`` seconds. With neither,
+every target is called once.
+
+Payload corpora are JSON (a list of payloads for every target, or lists
+keyed by target name, ``"*"`` for the rest) or JSONL (one payload per line).
+"""
+
+import json
+import math
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, asdict, replace
+from typing import Any, Dict, List, Optional
+
+import requests
+
+# Percentiles reported for every webhook
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class LoadProfile:
+    """How much load to send, and how fast"""
+    concurrency: int = 4
+    rate: Optional[float] = None      # Requests per second across all targets; None sends as fast as possible
+    requests: Optional[int] = None    # Total requests
+    duration: Optional[float] = None  # Seconds
+    ramp_up: float = 0.0              # Seconds to reach the full rate (or concurrency)
+    timeout: float = 30.0
+
+
+@dataclass
+class WebhookTarget:
+    """One webhook and the payloads sent to it in turn"""
+    name: str
+    url: str
+    payloads: List[Any] = field(default_factory=lambda: [{}])
+
+
+@dataclass
+class TargetStats:
+    """Outcomes of the requests sent to one target"""
+    latencies: List[float] = field(default_factory=list)  # Successful requests only
+    status_codes: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)      # "HTTP 500", "ReadTimeout", ...
+    ok: int = 0
+    failed: int = 0
+    bytes_received: int = 0
+
+
+def load_payload_corpus(file_path: str) -> Dict[str, List[Any]]:
+    """Payloads per target name from a JSON file ({name: [payloads]} or a list for every target) or JSONL"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if file_path.endswith('.jsonl'):
+            return {'*': [json.loads(line) for line in f if line.strip()]}
+        corpus = json.load(f)
+    if isinstance(corpus, list):
+        return {'*': corpus}
+    if isinstance(corpus, dict) and all(isinstance(payloads, list) for payloads in corpus.values()):
+        return corpus
+    raise ValueError(f"{file_path}: expected a list of payloads or an object of payload lists")
+
+
+def scheduled_offset(index: int, rate: float, ramp_up: float) -> float:
+    """Send time of request ``index`` (seconds from start) under a linear ramp to ``rate``"""
+    ramp_requests = rate * ramp_up / 2  # Requests sent while ramping up
+    if index < ramp_requests:
+        return math.sqrt(2 * index * ramp_up / rate)
+    return ramp_up + (index - ramp_requests) / rate
+
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list (None when empty)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """Min, mean, percentiles and max in milliseconds"""
+    values = sorted(latencies)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 1) if value is not None else None
+
+    summary = {'min_ms': ms(values[0] if values else None),
+               'mean_ms': ms(sum(values) / len(values) if values else None)}
+    summary.update({f'p{p}_ms': ms(percentile(values, p)) for p in PERCENTILES})
+    summary['max_ms'] = ms(values[-1] if values else None)
+    return summary
+
+
+class WebhookLoadTester:
+    """Send a load profile at a set of webhooks and report per-webhook statistics"""
+
+    def __init__(self, targets: List[WebhookTarget], profile: LoadProfile, headers: Dict[str, str] = None):
+        if not targets:
+            raise ValueError("No webhook targets to load test")
+        self.targets = targets
+        if profile.requests is None and profile.duration is None:
+            profile = replace(profile, requests=len(targets))
+        self.profile = profile
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.stats = {target.name: TargetStats() for target in targets}
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._local = threading.local()
+        self.max_schedule_lag = 0.0
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _claim(self) -> Optional[int]:
+        """Next request number, or None when the run is complete"""
+        with self._lock:
+            index = self._next_index
+            if self.profile.requests is not None and index >= self.profile.requests:
+                return None
+            self._next_index += 1
+            return index
+
+    def _send(self, index: int):
+        target = self.targets[index % len(self.targets)]
+        payload = target.payloads[(index // len(self.targets)) % len(target.payloads)]
+        start = time.perf_counter()
+        try:
+            response = self._session().post(target.url, json=payload, headers=self.headers,
+                                            timeout=self.profile.timeout)
+            latency = time.perf_counter() - start
+            error = None if response.ok else f"HTTP {response.status_code}"
+            status_code, size = response.status_code, len(response.content)
+        except requests.RequestException as e:
+            error, status_code, size, latency = type(e).__name__, None, 0, None
+
+        with self._lock:
+            stats = self.stats[target.name]
+            if status_code is not None:
+                stats.status_codes[status_code] += 1
+                stats.bytes_received += size
+            if error:
+                stats.failed += 1
+                stats.errors[error] += 1
+            else:
+                stats.ok += 1
+                stats.latencies.append(latency)
+
+    def _worker(self, worker: int, started: float, deadline: Optional[float]):
+        profile = self.profile
+        if not profile.rate and profile.ramp_up:
+            time.sleep(worker * profile.ramp_up / profile.concurrency)
+        while True:
+            index = self._claim()
+            if index is None:
+                return
+            if profile.rate:
+                send_at = started + scheduled_offset(index, profile.rate, profile.ramp_up)
+                if deadline is not None and send_at >= deadline:
+                    return
+                delay = send_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    with self._lock:
+                        self.max_schedule_lag = max(self.max_schedule_lag, -delay)
+            elif deadline is not None and time.perf_counter() >= deadline:
+                return
+            self._send(index)
+
+    def run(self) -> Dict[str, Any]:
+        """Run the profile to completion and return the report"""
+        profile = self.profile
+        started = time.perf_counter()
+        deadline = started + profile.duration if profile.duration is not None else None
+        workers = [threading.Thread(target=self._worker, args=(i, started, deadline), name=f"load-{i}", daemon=True)
+                   for i in range(max(1, profile.concurrency))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Totals and per-webhook latency percentiles, errors and throughput"""
+        targets = {}
+        for target in self.targets:
+            stats = self.stats[target.name]
+            sent = stats.ok + stats.failed
+            targets[target.name] = {
+                'url': target.url,
+                'requests': sent,
+                'ok': stats.ok,
+                'failed': stats.failed,
+                'error_rate': round(stats.failed / sent, 4) if sent else 0.0,
+                'throughput_rps': round(sent / elapsed, 2) if elapsed else 0.0,
+                'latency': latency_summary(stats.latencies),
+                'status_codes': {str(code): count for code, count in sorted(stats.status_codes.items())},
+                'errors': dict(stats.errors.most_common()),
+                'bytes_received': stats.bytes_received
+            }
+
+        all_stats = self.stats.values()
+        sent = sum(stats.ok + stats.failed for stats in all_stats)
+        failed = sum(stats.failed for stats in all_stats)
+        errors = Counter()
+        for stats in all_stats:
+            errors.update(stats.errors)
+        return {
+            'profile': asdict(self.profile),
+            'elapsed_seconds': round(elapsed, 3),
+            'max_schedule_lag_seconds': round(self.max_schedule_lag, 3),
+            'totals': {
+                'requests': sent,
+                'ok': sent - failed,
+                'failed': failed,
+                'error_rate': round(failed / sent, 4) if sent else 0.0,
+                'throughput_rps': round(sent / elapsed, 2) if elapsed else 0.0,
+                'latency': latency_summary([latency for stats in all_stats for latency in stats.latencies]),
+                'errors': dict(errors.most_common())
+            },
+            'targets': targets
+        }
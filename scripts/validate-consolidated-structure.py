@@ -1,22 +1,65 @@
-from scripts.utilities.shared_functions import *
 #!/usr/bin/env python3
 """
 Validate Consolidated Structure
 ==============================
 Validate the consolidated script structure and test functionality
+
+Every run persists a reference graph (per-file references and results plus
+the reverse "referenced by" index). With --incremental, only files changed
+since the last run (according to git, or to mtimes) and the files that
+reference them are re-validated, and only functional tests whose inputs
+changed are re-run; all other results come from the graph.
 """
 
 import os
+import sys
 import json
+import argparse
 import subprocess
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import logging
 
+# Add scripts directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utilities.repository_scanner import RepositoryScanner
+from utilities.reference_graph import ReferenceGraph
+from utilities.parallel_analysis import ParallelAnalysisDriver
+
+DEFAULT_GRAPH_FILE = "script-validation-graph.json"
+
+# Functional tests and the paths (relative to the scripts directory) whose changes make their results stale
+FUNCTIONAL_TEST_INPUTS = {
+    "script_analyzer": ("script-analyzer.py", "utilities/"),
+    "intelligent_discovery": ("intelligent-script-discovery.py", "utilities/")
+}
+CONSOLIDATED_SCRIPTS_TESTED = 5
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def walk_order_key(path: str) -> List[Tuple[int, str]]:
+    """Sort key reproducing a sorted os.walk: a directory's files come before its subdirectories"""
+    parts = os.path.normpath(path).split(os.sep)
+    return [(1, part) for part in parts[:-1]] + [(0, parts[-1])]
+
+
 class StructureValidator:
+    def __init__(self, scripts_dir: str = "scripts", graph_file: str = DEFAULT_GRAPH_FILE,
+                 test_workers: Optional[int] = None, test_timeout: Optional[int] = None):
+        self.scripts_dir = scripts_dir
+        self.graph = ReferenceGraph(graph_file)
+        self.test_workers = test_workers
+        self.test_timeout = test_timeout  # Overrides the per-test timeouts when set
+        self.scanner = RepositoryScanner(scripts_dir)
+        self.scanner.register_extractor("script_references", [
+            r'\./scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
+            r'scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
+            r'python3 scripts/([a-zA-Z0-9_-]+\.py)',
+            r'bash scripts/([a-zA-Z0-9_-]+\.sh)',
+            r'node scripts/([a-zA-Z0-9_-]+\.js)'
+        ])
         self.validation_results = {
             "structure_valid": True,
             "consolidated_scripts": [],
@@ -26,8 +69,13 @@ class StructureValidator:
             "recommendations": []
         }
     
-    def validate_structure(self) -> Dict:
+    def validate_structure(self, incremental: bool = False, change_source: str = "git") -> Dict:
         """Validate the consolidated script structure"""
+        if incremental:
+            if self.graph.loaded and self.graph.state.get("scripts_dir") == self.scripts_dir:
+                return self.validate_incremental(change_source)
+            logger.info("No reference graph yet, running a full validation to build it")
+        
         logger.info("Validating consolidated structure...")
         
         # Validate directory structure
@@ -48,8 +96,159 @@ class StructureValidator:
         # Generate recommendations
         self.generate_recommendations()
         
+        # Persist the reference graph for incremental runs
+        self.record_graph()
+        
         return self.validation_results
     
+    def validate_incremental(self, change_source: str = "git") -> Dict:
+        """Re-validate only changed files and the files referencing them, reusing the stored graph"""
+        logger.info("Validating consolidated structure incrementally...")
+        
+        self.validate_directory_structure()
+        
+        changed = self.detect_changes(change_source)
+        for file_path in sorted(changed):
+            try:
+                stat_result = os.stat(file_path)
+            except FileNotFoundError:
+                self.graph.remove(file_path)
+                continue
+            self.scanner.forget(file_path)
+            self.refresh_file(file_path, stat_result)
+        
+        affected = self.graph.affected(changed)
+        for file_path in affected:
+            record = self.graph.files[file_path]
+            record.results["broken_references"] = self.broken_references_from(file_path, record.references)
+        logger.info(f"{len(changed)} changed files, {len(affected)} files re-validated "
+                    f"({len(self.graph.files)} in graph)")
+        
+        # Aggregate every file's stored results in the order a full scan would report them
+        file_paths = sorted(self.graph.files, key=walk_order_key)
+        consolidated_scripts = [path for path in file_paths if os.path.basename(path).startswith('consolidated_')]
+        self.validation_results["consolidated_scripts"] = consolidated_scripts
+        self.validation_results["remaining_scripts"] = [path for path in file_paths if self.is_remaining_script(path)]
+        self.validation_results["broken_references"] = [
+            ref for path in file_paths for ref in self.graph.files[path].results.get("broken_references", [])
+        ]
+        logger.info(f"Found {len(consolidated_scripts)} consolidated scripts")
+        logger.info(f"Found {len(self.validation_results['remaining_scripts'])} remaining scripts")
+        if self.validation_results["broken_references"]:
+            logger.warning(f"Found {len(self.validation_results['broken_references'])} broken references")
+        else:
+            logger.info("✅ No broken references found")
+        
+        self.test_functionality(stale_tests=self.stale_tests(changed))
+        self.generate_recommendations()
+        self.save_graph()
+        
+        return self.validation_results
+    
+    def detect_changes(self, change_source: str = "git") -> Set[str]:
+        """Paths whose stored record no longer matches the file on disk (new and deleted files included)"""
+        if change_source == "git":
+            candidates = self.git_changed_paths(self.graph.git_commit)
+            if candidates is not None:
+                # Files git reported as changed at the last run may since have been reverted
+                candidates.update(self.graph.state.get("git_changed_paths", []))
+                return {path for path in candidates if self.is_scanned_path(path) and self.is_stale(path)}
+            logger.warning("Could not get changes from git, comparing mtimes instead")
+        
+        on_disk = set(self.scanner.file_paths(refresh=True))
+        changed = {path for path in on_disk if self.is_stale(path)}
+        changed.update(path for path in self.graph.files if path not in on_disk)
+        return changed
+    
+    def git_changed_paths(self, commit: Optional[str]) -> Optional[Set[str]]:
+        """Files under the scripts directory that differ from a commit, plus untracked files"""
+        if not commit:
+            return None
+        commands = [
+            ["git", "diff", "--name-only", "--relative", commit, "--", self.scripts_dir],
+            ["git", "ls-files", "--others", "--exclude-standard", "--", self.scripts_dir]
+        ]
+        paths = set()
+        for command in commands:
+            try:
+                result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"git unavailable: {e}")
+                return None
+            if result.returncode != 0:
+                return None
+            paths.update(os.path.normpath(line) for line in result.stdout.splitlines() if line)
+        return paths
+    
+    def git_head(self) -> Optional[str]:
+        """Current commit, or None outside a git work tree"""
+        try:
+            result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+    
+    def is_scanned_path(self, path: str) -> bool:
+        """Whether a path is one the scanner would list"""
+        relative = os.path.relpath(path, self.scripts_dir)
+        if relative.startswith(os.pardir):
+            return False
+        return not any(part in self.scanner.exclude_dirs for part in relative.split(os.sep)[:-1])
+    
+    def is_stale(self, path: str) -> bool:
+        """Whether the graph's record of a path is missing or out of date"""
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return path in self.graph.files
+        return os.path.isfile(path) and not self.graph.is_current(path, stat_result)
+    
+    def refresh_file(self, file_path: str, stat_result: os.stat_result):
+        """Re-validate one changed file and store its references and results in the graph"""
+        results = {}
+        if os.path.basename(file_path).startswith('consolidated_'):
+            if file_path.endswith('.sh') and not os.access(file_path, os.X_OK):
+                logger.warning(f"Consolidated script not executable: {file_path}")
+            results["structure_ok"] = self.check_script_structure(file_path)
+            if not results["structure_ok"]:
+                logger.warning(f"Consolidated script has issues: {file_path}")
+        
+        try:
+            references = self.script_references(file_path)
+        except Exception as e:
+            logger.error(f"Error checking references in {file_path}: {e}")
+            references = []
+        self.graph.update(file_path, stat_result, references, results)
+    
+    def record_graph(self):
+        """Rebuild the reference graph from a full validation (file contents come from the scanner cache)"""
+        consolidated_scripts = set(self.validation_results["consolidated_scripts"])
+        self.graph.files.clear()
+        self.graph.dependents.clear()
+        
+        for file_path in self.scanner.file_paths():
+            try:
+                stat_result = os.stat(file_path)
+                references = self.script_references(file_path)
+            except Exception as e:
+                logger.error(f"Error recording {file_path}: {e}")
+                continue
+            results = {"broken_references": self.broken_references_from(file_path, references)}
+            if file_path in consolidated_scripts:
+                results["structure_ok"] = self.check_script_structure(file_path)
+            self.graph.update(file_path, stat_result, references, results)
+        
+        self.save_graph()
+    
+    def save_graph(self):
+        """Persist the graph with the commit (and changed files) it is in sync with"""
+        self.graph.git_commit = self.git_head()
+        changed = self.git_changed_paths(self.graph.git_commit)
+        self.graph.state["git_changed_paths"] = sorted(changed or [])
+        self.graph.state["scripts_dir"] = self.scripts_dir
+        self.graph.state["test_results"] = self.validation_results["test_results"]
+        self.graph.save()
+    
     def validate_directory_structure(self):
         """Validate the new directory structure"""
         expected_categories = [
@@ -69,19 +268,18 @@ class StructureValidator:
         """Validate consolidated scripts"""
         consolidated_scripts = []
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.startswith('consolidated_'):
-                    script_path = os.path.join(root, file)
-                    consolidated_scripts.append(script_path)
-                    
-                    # Check if script is executable
-                    if file.endswith('.sh') and not os.access(script_path, os.X_OK):
-                        logger.warning(f"Consolidated script not executable: {script_path}")
-                    
-                    # Check if script has proper structure
-                    if not self.check_script_structure(script_path):
-                        logger.warning(f"Consolidated script has issues: {script_path}")
+        for script_path in self.scanner.file_paths():
+            file = os.path.basename(script_path)
+            if file.startswith('consolidated_'):
+                consolidated_scripts.append(script_path)
+                
+                # Check if script is executable
+                if file.endswith('.sh') and not os.access(script_path, os.X_OK):
+                    logger.warning(f"Consolidated script not executable: {script_path}")
+                
+                # Check if script has proper structure
+                if not self.check_script_structure(script_path):
+                    logger.warning(f"Consolidated script has issues: {script_path}")
         
         self.validation_results["consolidated_scripts"] = consolidated_scripts
         logger.info(f"Found {len(consolidated_scripts)} consolidated scripts")
@@ -90,27 +288,34 @@ class StructureValidator:
         """Validate remaining scripts"""
         remaining_scripts = []
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if (file.endswith(('.sh', '.py', '.js')) and 
-                    not file.startswith('consolidated_') and
-                    not file.startswith('.')):
-                    script_path = os.path.join(root, file)
-                    remaining_scripts.append(script_path)
+        for script_path in self.scanner.file_paths():
+            if self.is_remaining_script(script_path):
+                remaining_scripts.append(script_path)
         
         self.validation_results["remaining_scripts"] = remaining_scripts
         logger.info(f"Found {len(remaining_scripts)} remaining scripts")
     
+    @staticmethod
+    def is_remaining_script(script_path: str) -> bool:
+        """Whether a file is a script that has not been consolidated"""
+        file = os.path.basename(script_path)
+        return (file.endswith(('.sh', '.py', '.js')) and
+                not file.startswith('consolidated_') and
+                not file.startswith('.'))
+    
     def check_script_structure(self, script_path: str) -> bool:
         """Check if script has proper structure"""
         try:
-            with open(script_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            content = self.scanner.read_text(script_path)
             
             # Check for basic structure elements
             if script_path.endswith('.py'):
+                return ('def main(' in content or 'if __name__' in content)
+            elif script_path.endswith('.sh'):
                 return ('#!/bin/bash' in content or 'main()' in content)
             elif script_path.endswith('.js'):
+                return ('function main(' in content or 'if (require.main' in content)
+            
             return True
             
         except Exception as e:
@@ -121,13 +326,11 @@ class StructureValidator:
         """Check for broken script references"""
         broken_references = []
         
-        for root, dirs, files in os.walk(self.scripts_dir):
-            for file in files:
-                if file.endswith(('.sh', '.py', '.js')):
-                    file_path = os.path.join(root, file)
-                    broken_refs = self.find_broken_references(file_path)
-                    if broken_refs:
-                        broken_references.extend(broken_refs)
+        for file_path in self.scanner.file_paths():
+            if file_path.endswith(('.sh', '.py', '.js')):
+                broken_refs = self.find_broken_references(file_path)
+                if broken_refs:
+                    broken_references.extend(broken_refs)
         
         self.validation_results["broken_references"] = broken_references
         if broken_references:
@@ -140,56 +343,81 @@ class StructureValidator:
         broken_refs = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Look for script references
-            import re
-            patterns = [
-                r'\./scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
-                r'scripts/([a-zA-Z0-9_-]+\.(?:sh|py|js))',
-                r'python3 scripts/([a-zA-Z0-9_-]+\.py)',
-                r'bash scripts/([a-zA-Z0-9_-]+\.sh)',
-                r'node scripts/([a-zA-Z0-9_-]+\.js)'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    ref_path = f"scripts/{match}"
-                    if not os.path.exists(ref_path):
-                        broken_refs.append(f"{file_path}: {ref_path}")
-            
+            broken_refs = self.broken_references_from(file_path, self.script_references(file_path))
         except Exception as e:
             logger.error(f"Error checking references in {file_path}: {e}")
         
         return broken_refs
     
-    def test_functionality(self):
-        """Test functionality of key scripts"""
-        test_results = {}
-        
-        # Test script analyzer
-        test_results["script_analyzer"] = self.test_script_analyzer()
+    def script_references(self, file_path: str) -> List[str]:
+        """Script paths referenced by a file"""
+        if not file_path.endswith(('.sh', '.py', '.js')):
+            return []
+        # Script references are extracted in the scanner's single read of the file
+        matches = self.scanner.evaluate(file_path).extractions["script_references"]
+        return [f"scripts/{match}" for match in matches]
+    
+    @staticmethod
+    def broken_references_from(file_path: str, references: List[str]) -> List[str]:
+        """References of a file that point at missing scripts"""
+        return [f"{file_path}: {ref_path}" for ref_path in references if not os.path.exists(ref_path)]
+    
+    def test_functionality(self, stale_tests: Optional[Set[str]] = None):
+        """Test functionality of key scripts, running the tests in parallel subprocesses.
+
+        With ``stale_tests``, only those tests (and tests without a stored
+        result) are run; the others keep their result from the graph.
+        """
+        tests = {
+            "script_analyzer": self.test_script_analyzer,
+            "intelligent_discovery": self.test_intelligent_discovery,
+            "consolidated_scripts": self.test_consolidated_scripts
+        }
+        previous_results = self.graph.state.get("test_results", {})
+        to_run = [name for name in tests
+                  if stale_tests is None or name in stale_tests or name not in previous_results]
         
-        # Test intelligent discovery
-        test_results["intelligent_discovery"] = self.test_intelligent_discovery()
+        driver = ParallelAnalysisDriver(max_workers=self.test_workers or len(tests), use_threads=True)
+        outcomes = dict(zip(to_run, driver.map(lambda name: tests[name](), to_run)))
         
-        # Test consolidated scripts
-        test_results["consolidated_scripts"] = self.test_consolidated_scripts()
+        test_results = {}
+        for name in tests:
+            test_results[name] = outcomes[name] if name in outcomes else previous_results[name]
+        if len(to_run) < len(tests):
+            logger.info(f"Ran {len(to_run)} of {len(tests)} functional tests, reused the others")
         
         self.validation_results["test_results"] = test_results
     
+    def stale_tests(self, changed_paths: Set[str]) -> Set[str]:
+        """Functional tests whose inputs changed since their stored results"""
+        stale = set()
+        relative_paths = [os.path.relpath(path, self.scripts_dir) for path in changed_paths]
+        for name, inputs in FUNCTIONAL_TEST_INPUTS.items():
+            if any(path.startswith(inputs) for path in relative_paths):
+                stale.add(name)
+        
+        tested_scripts = self.validation_results["consolidated_scripts"][:CONSOLIDATED_SCRIPTS_TESTED]
+        previous_results = self.graph.state.get("test_results", {}).get("consolidated_scripts")
+        tested_before = list(previous_results) if isinstance(previous_results, dict) else None
+        if tested_before != [path for path in tested_scripts if path.endswith(('.py', '.sh'))] \
+                or changed_paths & set(tested_scripts):
+            stale.add("consolidated_scripts")
+        return stale
+    
+    def run_test_command(self, command: List[str], timeout: int) -> bool:
+        """Run one test command; it passes when it exits with status 0 within the timeout"""
+        result = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=self.test_timeout or timeout
+        )
+        return result.returncode == 0
+    
     def test_script_analyzer(self) -> bool:
         """Test script analyzer functionality"""
         try:
-            result = subprocess.run(
-                ["python3", "scripts/script-analyzer.py"],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.returncode == 0
+            return self.run_test_command(["python3", "scripts/script-analyzer.py"], 30)
         except Exception as e:
             logger.error(f"Error testing script analyzer: {e}")
             return False
@@ -197,45 +425,32 @@ class StructureValidator:
     def test_intelligent_discovery(self) -> bool:
         """Test intelligent discovery functionality"""
         try:
-            result = subprocess.run([
+            return self.run_test_command([
                 "python3", "scripts/intelligent-script-discovery.py",
                 "test discovery", "--category", "testing"
-            ], capture_output=True, text=True, timeout=10)
-            return result.returncode == 0
+            ], 10)
         except Exception as e:
             logger.error(f"Error testing intelligent discovery: {e}")
             return False
     
     def test_consolidated_scripts(self) -> Dict:
-        """Test consolidated scripts"""
-        test_results = {}
+        """Test consolidated scripts (in parallel)"""
+        commands = []
+        for script_path in self.validation_results["consolidated_scripts"][:CONSOLIDATED_SCRIPTS_TESTED]:
+            if script_path.endswith('.py'):
+                commands.append((script_path, ["python3", script_path, "--help"]))
+            elif script_path.endswith('.sh'):
+                commands.append((script_path, ["bash", script_path, "--help"]))
         
-        for script_path in self.validation_results["consolidated_scripts"][:5]:  # Test first 5
+        def run_script_test(script_path: str, command: List[str]) -> bool:
             try:
-                if script_path.endswith('.py'):
-                    result = subprocess.run(
-                        ["python3", script_path, "--help"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                elif script_path.endswith('.sh'):
-                    result = subprocess.run(
-                        ["bash", script_path, "--help"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                else:
-                    continue
-                
-                test_results[script_path] = result.returncode == 0
-                
+                return self.run_test_command(command, 5)
             except Exception as e:
                 logger.error(f"Error testing {script_path}: {e}")
-                test_results[script_path] = False
+                return False
         
-        return test_results
+        driver = ParallelAnalysisDriver(max_workers=self.test_workers or len(commands) or 1, use_threads=True)
+        return dict(zip([script_path for script_path, _ in commands], driver.starmap(run_script_test, commands)))
     
     def generate_recommendations(self):
         """Generate recommendations for improvement"""
@@ -313,11 +528,24 @@ class StructureValidator:
         
         return "\n".join(report)
 
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Validate the consolidated script structure")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Re-validate only files changed since the last run and the files referencing them")
+    parser.add_argument('--changes', choices=['git', 'mtime'], default='git',
+                        help="How incremental runs find changed files (default: git, falling back to mtime)")
+    parser.add_argument('--graph-file', default=DEFAULT_GRAPH_FILE, help="Persisted reference graph")
+    parser.add_argument('--test-workers', type=int, default=None, help="Functional tests run at the same time")
+    parser.add_argument('--test-timeout', type=int, default=None, help="Timeout in seconds for every functional test")
+    args = parser.parse_args()
+    
     print("🔍 Validating Consolidated Structure")
     print("=" * 45)
     
-    validator = StructureValidator()
-    results = validator.validate_structure()
+    validator = StructureValidator(graph_file=args.graph_file, test_workers=args.test_workers,
+                                   test_timeout=args.test_timeout)
+    results = validator.validate_structure(incremental=args.incremental, change_source=args.changes)
     
     # Print summary
     print(f"\n📊 Validation Summary:")
@@ -352,11 +580,3 @@ class StructureValidator:
 
 if __name__ == "__main__":
     main()
-
-
-
-
-
-
-
-
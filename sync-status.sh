@@ -24,15 +24,16 @@ fi
 
 echo ""
 echo "Recent Sync Operations:"
-if [ -f "n8n-sync-history.json" ]; then
+if [ -f "n8n-sync-history.sqlite" ]; then
     python3 -c "
-import json
+import sys
+sys.path.insert(0, 'scripts')
 try:
-    with open('n8n-sync-history.json', 'r') as f:
-        data = json.load(f)
-    operations = data.get('sync_operations', [])
-    for op in operations[-5:]:
+    from utilities.sync_history_store import SyncHistoryStore
+    store = SyncHistoryStore('n8n-sync-history.sqlite')
+    for op in store.recent_operations(5):
         print(f'  {op.get(\"timestamp\", \"Unknown\")} - {op.get(\"operation\", \"Unknown\")} - {op.get(\"workflow_name\", \"Unknown\")}')
+    store.close()
 except Exception as e:
     print(f'  Error reading sync history: {e}')
 "
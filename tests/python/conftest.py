@@ -0,0 +1,8 @@
+"""Make the ``utilities`` package under scripts/ importable from the tests"""
+
+import os
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
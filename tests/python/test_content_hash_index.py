@@ -0,0 +1,157 @@
+"""Tests for utilities.content_hash_index"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utilities.content_hash_index import PARTIAL_BLOCK_SIZE, ContentHashIndex
+
+
+def write(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    big = os.urandom(3 * PARTIAL_BLOCK_SIZE)
+    # Same first and last block as ``big``, different middle
+    big_variant = big[:PARTIAL_BLOCK_SIZE] + os.urandom(PARTIAL_BLOCK_SIZE) + big[-PARTIAL_BLOCK_SIZE:]
+    files = {
+        "a.sh": write(root / "a.sh", b"echo one\n"),
+        "b.sh": write(root / "sub" / "b.sh", b"echo one\n"),
+        "c.sh": write(root / "c.sh", b"echo two\n"),  # same size, different content
+        "big1": write(root / "big1.bin", big),
+        "big2": write(root / "sub" / "big2.bin", big),
+        "big3": write(root / "big3.bin", big_variant),
+        "unique": write(root / "unique.txt", b"only me"),
+    }
+    return root, files
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ContentHashIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_duplicate_groups(tree, index):
+    root, files = tree
+    paths = index.scan(str(root))
+    groups = index.duplicate_groups(paths)
+    assert sorted(sorted(group) for group in groups) == sorted([
+        sorted([files["a.sh"], files["b.sh"]]),
+        sorted([files["big1"], files["big2"]]),
+    ])
+    # Only same-size files are hashed; only big files with colliding partial hashes are read in full
+    assert index.partial_hashes == 6
+    assert index.full_hashes == 3
+
+
+def test_duplicate_groups_keep_input_order(tree, index):
+    _, files = tree
+    order = [files["b.sh"], files["big2"], files["a.sh"], files["big1"]]
+    assert index.duplicate_groups(order) == [[files["b.sh"], files["a.sh"]], [files["big2"], files["big1"]]]
+
+
+def test_executor_gives_same_groups(tree, index):
+    root, _ = tree
+    paths = index.scan(str(root))
+    expected = index.duplicate_groups(paths)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        fresh = ContentHashIndex(index.index_file + ".threads")
+        try:
+            assert fresh.duplicate_groups(paths, executor=executor) == expected
+        finally:
+            fresh.close()
+
+
+def test_min_size(tree, index):
+    root, files = tree
+    groups = index.duplicate_groups(index.scan(str(root)), min_size=PARTIAL_BLOCK_SIZE)
+    assert groups == [[files["big1"], files["big2"]]]
+
+
+def test_hashes_persist_between_instances(tree, tmp_path):
+    root, _ = tree
+    index_file = str(tmp_path / "persist.sqlite")
+    first = ContentHashIndex(index_file)
+    expected = first.duplicate_groups(first.scan(str(root)))
+    first.close()
+
+    second = ContentHashIndex(index_file)
+    try:
+        assert second.duplicate_groups(second.scan(str(root))) == expected
+        assert second.partial_hashes == 0
+        assert second.full_hashes == 0
+    finally:
+        second.close()
+
+
+def test_changed_file_is_rehashed(tree, index):
+    root, files = tree
+    before = index.full_hash(files["a.sh"])
+    with open(files["a.sh"], "wb") as f:
+        f.write(b"echo changed\n")
+    os.utime(files["a.sh"], ns=(0, 0))
+    index.forget(files["a.sh"])  # drop the per-instance stat cache
+    assert index.full_hash(files["a.sh"]) != before
+    assert all(files["a.sh"] not in group for group in index.duplicate_groups(index.scan(str(root))))
+
+
+def test_scan_prunes_deleted_files(tree, index):
+    root, files = tree
+    index.scan(str(root))
+    assert os.path.abspath(files["unique"]) in index.entries
+    os.remove(files["unique"])
+    index.scan(str(root))
+    assert os.path.abspath(files["unique"]) not in index.entries
+
+
+def test_scan_keeps_entries_of_excluded_subtrees(tree, index):
+    root, files = tree
+    backup = write(root / "project_backup_1" / "a.sh", b"echo one\n")
+    index.duplicate_groups(index.scan(str(root)))
+    hashed = index.partial_hashes
+
+    # A scan that leaves the backup tree out must not forget what another scan hashed there
+    paths = index.scan(str(root), exclude_dirs=("project_backup_1",))
+    assert backup not in paths
+    assert os.path.abspath(backup) in index.entries
+    assert index.entries[os.path.abspath(backup)].full_hash is not None
+
+    groups = index.duplicate_groups(index.scan(str(root)))
+    assert [files["a.sh"], backup, files["b.sh"]] in groups
+    assert index.partial_hashes == hashed
+
+
+def test_scan_prunes_deleted_subtrees(tree, index):
+    root, files = tree
+    index.scan(str(root))
+    for name in ("b.sh", "big2"):
+        os.remove(files[name])
+    os.rmdir(root / "sub")
+    index.scan(str(root), exclude_dirs=("other",))
+    assert os.path.abspath(files["b.sh"]) not in index.entries
+    assert os.path.abspath(files["big2"]) not in index.entries
+
+
+def test_scan_filters_extensions_and_skips_index_file(tree, tmp_path):
+    root, files = tree
+    index = ContentHashIndex(str(root / "index.sqlite"))
+    try:
+        assert sorted(index.scan(str(root), extensions=(".sh",))) == sorted([files["a.sh"], files["b.sh"], files["c.sh"]])
+        assert all(not path.endswith("index.sqlite") for path in index.scan(str(root)))
+    finally:
+        index.close()
+
+
+def test_missing_file(tmp_path, index):
+    missing = str(tmp_path / "missing")
+    assert index.refresh(missing) is None
+    assert index.full_hash(missing) is None
+    assert index.duplicate_groups([missing]) == []
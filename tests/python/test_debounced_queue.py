@@ -0,0 +1,109 @@
+"""Tests for utilities.debounced_queue"""
+
+import threading
+import time
+
+import pytest
+
+from utilities.debounced_queue import DebouncedQueue
+
+
+class Recorder:
+    """Handler that records keys and can be told to fail"""
+
+    def __init__(self, fail_on=()):
+        self.keys = []
+        self.fail_on = set(fail_on)
+        self.event = threading.Event()
+
+    def __call__(self, key):
+        self.keys.append(key)
+        self.event.set()
+        if key in self.fail_on:
+            raise RuntimeError(f"cannot handle {key}")
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("timed out waiting for the queue")
+        time.sleep(0.005)
+
+
+def test_burst_is_coalesced():
+    recorder = Recorder()
+    queue = DebouncedQueue(recorder, delay=0.05, max_delay=1.0)
+    try:
+        for _ in range(5):
+            queue.push("wf-1")
+        queue.push("wf-2")
+        assert queue.pending() == 2
+        wait_until(lambda: queue.stats()['handled'] == 2)
+        assert sorted(recorder.keys) == ["wf-1", "wf-2"]
+        assert queue.stats() == {'pushed': 6, 'pending': 0, 'handled': 2, 'failed': 0}
+    finally:
+        queue.stop()
+
+
+def test_push_postpones_key():
+    recorder = Recorder()
+    queue = DebouncedQueue(recorder, delay=0.1, max_delay=5.0)
+    try:
+        queue.push("wf")
+        time.sleep(0.06)
+        queue.push("wf")
+        time.sleep(0.06)
+        # 0.12s after the first push, but only 0.06s after the last one
+        assert recorder.keys == []
+        wait_until(lambda: recorder.keys == ["wf"])
+    finally:
+        queue.stop()
+
+
+def test_max_delay_bounds_a_busy_key():
+    recorder = Recorder()
+    queue = DebouncedQueue(recorder, delay=0.1, max_delay=0.2)
+    try:
+        started = time.monotonic()
+        while not recorder.event.is_set() and time.monotonic() - started < 1.0:
+            queue.push("wf")
+            time.sleep(0.02)
+        assert recorder.event.is_set()
+        assert time.monotonic() - started < 0.5
+    finally:
+        queue.stop()
+
+
+def test_failing_handler_does_not_stop_worker():
+    recorder = Recorder(fail_on={"bad"})
+    queue = DebouncedQueue(recorder, delay=0.01)
+    try:
+        queue.push("bad")
+        wait_until(lambda: queue.stats()['failed'] == 1)
+        queue.push("good")
+        wait_until(lambda: queue.stats()['handled'] == 1)
+        assert recorder.keys == ["bad", "good"]
+    finally:
+        queue.stop()
+
+
+def test_stop_drains_pending_keys():
+    recorder = Recorder()
+    queue = DebouncedQueue(recorder, delay=60.0)
+    queue.push("a")
+    queue.push("b")
+    queue.stop(drain=True, timeout=2.0)
+    assert sorted(recorder.keys) == ["a", "b"]
+    assert queue.stats()['pending'] == 0
+    assert not queue._worker.is_alive()
+
+
+def test_stop_without_drain_discards_pending_keys():
+    recorder = Recorder()
+    queue = DebouncedQueue(recorder, delay=60.0)
+    queue.push("a")
+    queue.stop(drain=False, timeout=2.0)
+    assert recorder.keys == []
+    assert queue.pending() == 0
+    assert not queue._worker.is_alive()
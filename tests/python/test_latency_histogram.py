@@ -0,0 +1,69 @@
+"""Tests for utilities.latency_histogram"""
+
+import math
+import random
+
+import pytest
+
+from utilities.latency_histogram import BUCKET_BOUNDS, BUCKET_GROWTH, MAX_LATENCY, LatencyHistogram
+
+
+def exact_percentile(samples, percent):
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(len(ordered) * percent / 100))
+    return ordered[rank - 1]
+
+
+def test_bucket_bounds_cover_range():
+    assert BUCKET_BOUNDS[0] == 0.001
+    assert BUCKET_BOUNDS[-1] >= MAX_LATENCY
+    assert all(high == pytest.approx(low * BUCKET_GROWTH) for low, high in zip(BUCKET_BOUNDS, BUCKET_BOUNDS[1:]))
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.summary() == {'samples': 0, 'last': None, 'p50': None, 'p95': None, 'p99': None}
+
+
+@pytest.mark.parametrize("percent", [1, 50, 90, 95, 99, 100])
+def test_percentile_within_bucket_error(percent):
+    rng = random.Random(percent)
+    samples = [rng.lognormvariate(-2, 1) for _ in range(500)]
+    histogram = LatencyHistogram(window=len(samples))
+    for sample in samples:
+        histogram.add(sample)
+    exact = exact_percentile(samples, percent)
+    estimate = histogram.percentile(percent)
+    # The estimate is the upper bound of the exact sample's bucket
+    assert exact <= estimate <= max(exact * BUCKET_GROWTH, BUCKET_BOUNDS[0]) + 1e-12
+
+
+def test_window_drops_oldest_samples():
+    histogram = LatencyHistogram(window=10)
+    for _ in range(10):
+        histogram.add(10.0)
+    for _ in range(10):
+        histogram.add(0.01)
+    assert histogram.summary()['samples'] == 10
+    assert histogram.percentile(100) < 0.012
+    assert histogram.total_samples == 20
+    assert histogram.max_seen == 10.0
+    assert sum(histogram.counts) == 10
+
+
+def test_samples_above_max_latency_report_max_seen():
+    histogram = LatencyHistogram()
+    histogram.add(0.5)
+    histogram.add(MAX_LATENCY * 3)
+    assert histogram.percentile(100) == MAX_LATENCY * 3
+
+
+def test_summary_rounds_to_milliseconds():
+    histogram = LatencyHistogram()
+    histogram.add(0.123456)
+    summary = histogram.summary()
+    assert summary['samples'] == 1
+    assert summary['last'] == 0.123
+    assert summary['p50'] == summary['p99']
+    assert 0.123 <= summary['p50'] <= round(0.123456 * BUCKET_GROWTH, 3)
@@ -0,0 +1,82 @@
+"""Tests for utilities.minhash_lsh"""
+
+import pickle
+import random
+from itertools import combinations
+
+from utilities.minhash_lsh import LSHIndex, MinHasher, jaccard, lsh_parameters
+
+
+def make_corpus(seed: int = 7, families: int = 20, members: int = 4, vocabulary: int = 2000):
+    """Families of token sets that share most tokens, plus unrelated sets"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(families):
+        base = set(rng.sample(range(vocabulary), 60))
+        for _ in range(members):
+            variant = set(base)
+            for token in rng.sample(sorted(base), rng.randint(0, 8)):
+                variant.discard(token)
+            variant.update(rng.sample(range(vocabulary), rng.randint(0, 8)))
+            corpus.append(frozenset(f"t{token}" for token in variant))
+    return corpus
+
+
+def test_jaccard():
+    assert jaccard({1, 2, 3}, {2, 3, 4}) == 0.5
+    assert jaccard(set(), set()) == 0.0
+    assert jaccard({1}, {1}) == 1.0
+
+
+def test_lsh_parameters_respect_miss_probability():
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.9):
+        bands, rows = lsh_parameters(threshold, 128)
+        assert bands * rows <= 128
+        assert (1 - threshold ** rows) ** bands <= 1e-4
+
+
+def test_signature_is_deterministic_and_survives_pickling():
+    tokens = {"alpha", "beta", "gamma"}
+    signature = MinHasher().signature(tokens)
+    assert len(signature) == 128
+    assert MinHasher().signature(tokens) == signature
+
+    restored = pickle.loads(pickle.dumps(MinHasher()))
+    assert restored.signature(tokens) == signature
+
+
+def test_signature_agreement_estimates_jaccard():
+    minhasher = MinHasher(num_perm=256)
+    set1 = {f"t{i}" for i in range(100)}
+    set2 = {f"t{i}" for i in range(50, 150)}
+    signature1, signature2 = minhasher.signature(set1), minhasher.signature(set2)
+    estimate = sum(a == b for a, b in zip(signature1, signature2)) / len(signature1)
+    assert abs(estimate - jaccard(set1, set2)) < 0.1
+
+
+def test_candidates_cover_every_pair_above_threshold():
+    threshold = 0.7
+    corpus = make_corpus()
+    minhasher = MinHasher()
+    index = LSHIndex(threshold, minhasher.num_perm)
+    for item, tokens in enumerate(corpus):
+        index.insert(item, minhasher.signature(tokens))
+
+    exact_pairs = {(i, j) for i, j in combinations(range(len(corpus)), 2)
+                   if jaccard(corpus[i], corpus[j]) > threshold}
+    candidates = index.candidate_pairs()
+
+    assert exact_pairs
+    assert exact_pairs <= candidates
+    # Candidates stay far below the brute-force pair count
+    assert len(candidates) < len(corpus) * (len(corpus) - 1) // 2 // 4
+
+
+def test_bucket_keys_keep_items_apart():
+    minhasher = MinHasher()
+    index = LSHIndex(0.7, minhasher.num_perm)
+    signature = minhasher.signature({"same", "tokens"})
+    index.insert(0, signature, bucket_key="a")
+    index.insert(1, signature, bucket_key="b")
+    index.insert(2, signature, bucket_key="a")
+    assert index.candidate_pairs() == {(0, 2)}
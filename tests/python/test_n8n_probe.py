@@ -0,0 +1,96 @@
+"""Tests for utilities.n8n_probe"""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from utilities.n8n_probe import HEALTH_PATH, WORKFLOWS_PATH, N8NProber
+
+RESPONSES = {
+    HEALTH_PATH: (200, "text/plain", b"OK"),
+    WORKFLOWS_PATH: (200, "application/json", json.dumps({"data": [{"id": "1", "active": True}]}).encode()),
+    "/broken-json": (200, "application/json", b"<html>maintenance</html>"),
+    "/error": (500, "text/plain", b"boom"),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, content_type, body = RESPONSES.get(self.path, (404, "text/plain", b"not found"))
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def prober(base_url):
+    prober = N8NProber(base_url, "key")
+    yield prober
+    prober.close()
+
+
+def test_plain_text_health_is_ok(prober):
+    result = prober.probe(HEALTH_PATH, timeout=2)
+    assert result.ok
+    assert result.status_code == 200
+    assert result.data is None
+
+
+def test_cycle_parses_workflows(prober):
+    cycle = prober.run_cycle(2, 2)
+    assert cycle.health.ok and cycle.workflows.ok
+    assert cycle.workflows.data == {"data": [{"id": "1", "active": True}]}
+
+
+def test_invalid_json_fails_only_when_parsed(prober):
+    assert prober.probe("/broken-json", timeout=2).ok
+    result = prober.probe("/broken-json", timeout=2, parse_json=True)
+    assert not result.ok
+    assert result.status_code == 200
+    assert "Invalid JSON" in result.error
+
+
+def test_failed_probes_are_recorded(prober):
+    prober.probe(HEALTH_PATH, timeout=2)
+    prober.probe("/error", timeout=2)
+    prober.probe("/error", timeout=2)
+    percentiles = prober.latency_percentiles()
+    assert percentiles[HEALTH_PATH]['failed'] == 0
+    assert percentiles["/error"]['failed'] == 2
+    assert percentiles["/error"]['samples'] == 2
+
+
+def test_unreachable_instance_is_recorded():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    prober = N8NProber(f"http://127.0.0.1:{port}", None)
+    try:
+        result = prober.probe(HEALTH_PATH, timeout=1)
+        assert not result.ok
+        assert result.status_code is None
+        assert result.error
+        assert prober.latency_percentiles()[HEALTH_PATH]['failed'] == 1
+        assert prober.latency_percentiles()[HEALTH_PATH]['samples'] == 1
+    finally:
+        prober.close()
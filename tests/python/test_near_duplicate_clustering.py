@@ -0,0 +1,113 @@
+"""Tests for utilities.near_duplicate_clustering and the purge grouping built on it"""
+
+import importlib.util
+import os
+import random
+from itertools import combinations
+
+from utilities.minhash_lsh import jaccard
+from utilities.near_duplicate_clustering import NearDuplicateClusterer, UnionFind, shingle
+
+from conftest import SCRIPTS_DIR
+
+
+def load_purge_module():
+    spec = importlib.util.spec_from_file_location(
+        "intelligent_script_purge", os.path.join(SCRIPTS_DIR, "intelligent-script-purge.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def brute_force_clusters(documents, threshold):
+    """Connected components of the exact "Jaccard above threshold" relation"""
+    components = UnionFind()
+    for _ in documents:
+        components.add()
+    shingles = [shingle(text) for _, text in documents]
+    for i, j in combinations(range(len(documents)), 2):
+        if shingles[i] and shingles[j] and jaccard(shingles[i], shingles[j]) > threshold:
+            components.union(i, j)
+    members = {}
+    for item, (key, _) in enumerate(documents):
+        members.setdefault(components.find(item), []).append(key)
+    return sorted(sorted(group) for group in members.values() if len(group) > 1)
+
+
+def make_documents(seed: int = 3, families: int = 15, members: int = 3):
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(3000)]
+    documents = []
+    for family in range(families):
+        base = rng.sample(vocabulary, 80)
+        for member in range(members):
+            words = base[:] if member == 0 else base[:80 - rng.randint(0, 10)] + rng.sample(vocabulary, 5)
+            documents.append((f"f{family}-{member}.sh", ' '.join(words)))
+    for noise in range(20):
+        documents.append((f"noise{noise}.sh", ' '.join(rng.sample(vocabulary, 80))))
+    documents.append(("empty.sh", ""))
+    return documents
+
+
+def test_union_find_merges_sets():
+    components = UnionFind()
+    items = [components.add() for _ in range(5)]
+    components.union(items[0], items[1])
+    components.union(items[3], items[4])
+    components.union(items[1], items[4])
+    assert len({components.find(item) for item in items}) == 2
+    assert components.find(items[0]) == components.find(items[3])
+    assert components.find(items[2]) == items[2]
+
+
+def test_shingle():
+    assert shingle("A b  a") == frozenset({"a", "b"})
+    assert shingle("a b c", shingle_size=2) == frozenset({"a b", "b c"})
+
+
+def test_clusters_match_brute_force_components():
+    documents = make_documents()
+    clusterer = NearDuplicateClusterer(threshold=0.7)
+    for key, text in documents:
+        clusterer.add(key, text)
+
+    clusters = clusterer.clusters()
+    assert sorted(sorted(group) for group in clusters) == brute_force_clusters(documents, 0.7)
+    assert clusterer.stats["documents"] == len(documents)
+    assert all("empty.sh" not in group for group in clusters)
+
+
+def test_subset_reuses_shingles_of_kept_documents():
+    clusterer = NearDuplicateClusterer(threshold=0.5)
+    clusterer.add("live/a.sh", "one two three four")
+    clusterer.add("backup/a.sh", "one two three four five")
+    clusterer.add("live/b.sh", "one two three four six")
+    assert len(clusterer.clusters()) == 1
+
+    live = clusterer.subset(lambda key: key.startswith("live/"))
+    assert live.keys == ["live/a.sh", "live/b.sh"]
+    assert live.clusters() == [["live/a.sh", "live/b.sh"]]
+
+
+def test_purge_groups_never_keep_backup_copies(tmp_path, monkeypatch):
+    body = "\n".join(f"echo step {i} of the deployment" for i in range(40))
+    live = tmp_path / "scripts"
+    backup = tmp_path / "scripts_backup_20250101_000000"
+    for tree in (live, backup):
+        tree.mkdir()
+    for name in ("deploy-a.sh", "deploy-b.sh", "deploy-c.sh"):
+        (live / name).write_text(body + f"\necho {name}\n")
+    # The backup copy is the largest, which used to make it the script to keep
+    (backup / "deploy-a.sh").write_text(body + "\necho deploy-a.sh\necho extra\n")
+
+    monkeypatch.chdir(tmp_path)
+    purge = load_purge_module().IntelligentScriptPurge("scripts")
+    purge.identify_consolidation_candidates()
+
+    planned = purge.purge_plan["scripts_to_keep"] + purge.purge_plan["scripts_to_consolidate"]
+    assert len(planned) == 3
+    assert all(path.startswith("scripts" + os.sep) for path in planned)
+    assert purge.purge_plan["backup_matches"] == [{
+        "scripts": sorted(planned),
+        "backup_copies": [os.path.join("scripts_backup_20250101_000000", "deploy-a.sh")]
+    }]
@@ -0,0 +1,77 @@
+"""Tests for utilities.sparse_similarity"""
+
+import random
+from itertools import combinations
+
+import pytest
+
+from utilities.minhash_lsh import jaccard
+from utilities.sparse_similarity import SparseFeatureMatrix
+
+WEIGHTS = {"functions": 0.5, "imports": 0.3, "tokens": 0.2}
+
+
+def make_matrix(seed: int = 11, rows: int = 60):
+    rng = random.Random(seed)
+    matrix = SparseFeatureMatrix(WEIGHTS)
+    features = []
+    for _ in range(rows):
+        item = {
+            "functions": set(rng.sample(range(40), rng.randint(0, 6))),
+            "imports": set(rng.sample(range(10), rng.randint(0, 3))),
+            "tokens": set(rng.sample(range(200), rng.randint(1, 20))),
+        }
+        matrix.add_row(item)
+        features.append(item)
+    return matrix, features
+
+
+def expected_similarity(item1, item2):
+    return min(1.0, sum(jaccard(item1[family], item2[family]) * weight for family, weight in WEIGHTS.items()))
+
+
+def test_similarity_is_weighted_jaccard():
+    matrix = SparseFeatureMatrix(WEIGHTS)
+    row1 = matrix.add_row({"functions": ["a", "b"], "imports": ["os"], "tokens": ["x"]})
+    row2 = matrix.add_row({"functions": ["b", "c"], "imports": ["os"]})
+    assert matrix.similarity(row1, row2) == pytest.approx(0.5 / 3 + 0.3)
+    assert matrix.similarity(row1, row1) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.15, 0.3, 0.5])
+def test_pairwise_similarities_match_brute_force(threshold):
+    matrix, features = make_matrix()
+    rows = list(range(len(features)))
+
+    expected = {}
+    for i, j in combinations(rows, 2):
+        similarity = expected_similarity(features[i], features[j])
+        if similarity > threshold:
+            expected[(i, j)] = similarity
+
+    actual = matrix.pairwise_similarities(rows, threshold)
+    assert set(actual) == set(expected)
+    for pair, similarity in expected.items():
+        assert actual[pair] == pytest.approx(similarity)
+
+
+def test_pairwise_similarities_skip_pairs_within_a_group():
+    matrix, features = make_matrix()
+    rows = list(range(len(features)))
+    groups = [row % 3 for row in rows]
+
+    actual = matrix.pairwise_similarities(rows, 0.0, groups=groups)
+    assert actual
+    assert all(groups[i] != groups[j] for i, j in actual)
+    assert set(actual) == {pair for pair in matrix.pairwise_similarities(rows, 0.0)
+                           if groups[pair[0]] != groups[pair[1]]}
+
+
+def test_candidate_families_keep_enough_weight_for_the_threshold():
+    matrix, features = make_matrix()
+    rows = list(range(len(features)))
+    for threshold in (0.1, 0.25, 0.45, 0.8):
+        kept = matrix.candidate_families(rows, threshold)
+        dropped_weight = sum(WEIGHTS[family] for index, family in enumerate(matrix.families) if index not in kept)
+        assert kept
+        assert dropped_weight <= threshold
@@ -0,0 +1,99 @@
+"""Tests for utilities.sync_history_store"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from utilities.sync_history_store import SyncHistoryStore, timestamp_to_epoch
+
+
+def iso(days_ago: float = 0, seconds: float = 0) -> str:
+    return (datetime.now() - timedelta(days=days_ago) + timedelta(seconds=seconds)).isoformat()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SyncHistoryStore(str(tmp_path / "history.sqlite"))
+    yield store
+    store.close()
+
+
+def test_timestamp_to_epoch():
+    assert timestamp_to_epoch("2025-01-01T00:00:00Z") == datetime.fromisoformat("2025-01-01T00:00:00+00:00").timestamp()
+    now = time.time()
+    assert timestamp_to_epoch(None) >= now
+    assert timestamp_to_epoch("not a timestamp") >= now
+
+
+def test_time_window_queries(store):
+    for days_ago, status in ((3, "success"), (0.5, "failed"), (0.1, "success"), (0.01, "success")):
+        store.append_operation({"timestamp": iso(days_ago), "operation": "pull", "status": status})
+    store.commit()
+
+    since = time.time() - 86400
+    assert store.count_since(since) == 3
+    assert store.count_since(since, status="success") == 2
+    operations = store.operations_since(since)
+    assert [op["status"] for op in operations] == ["failed", "success", "success"]
+    assert store.operation_times(since) == sorted(store.operation_times(since))
+    assert len(store.operation_times(limit=2)) == 2
+
+
+def test_recent_operations_are_the_newest_oldest_first(store):
+    for index in range(8):
+        store.append_operation({"timestamp": iso(seconds=index), "operation": f"op{index}"})
+    assert [op["operation"] for op in store.recent_operations(3)] == ["op5", "op6", "op7"]
+
+
+def test_workflow_state_upsert_keeps_unset_fields(store):
+    store.set_workflow_state("wf1", workflow_hash="h1", updated_at="t1")
+    store.set_workflow_state("wf1", updated_at="t2")
+    store.set_workflow_state("wf2", workflow_hash="h2")
+    assert store.workflow_state() == {
+        "wf1": {"hash": "h1", "updated_at": "t2"},
+        "wf2": {"hash": "h2", "updated_at": None},
+    }
+
+
+def test_meta_round_trip(store):
+    assert store.get_meta("last_sync", "never") == "never"
+    store.set_meta("last_sync", {"at": "now"})
+    assert store.get_meta("last_sync") == {"at": "now"}
+
+
+def test_compact_drops_only_expired_operations(store):
+    store.append_operation({"timestamp": iso(days_ago=100), "operation": "old"})
+    store.append_operation({"timestamp": iso(days_ago=1), "operation": "new"})
+    assert store.compact(retention_days=90) == 1
+    assert [op["operation"] for op in store.recent_operations()] == ["new"]
+    assert store.compact(retention_days=90) == 0
+
+
+def test_legacy_import_runs_once(tmp_path, store):
+    legacy = tmp_path / "n8n-sync-history.json"
+    legacy.write_text(json.dumps({
+        "sync_operations": [{"timestamp": iso(1), "operation": "pull", "workflow_name": "A"}],
+        "workflow_hashes": {"wf1": "h1"},
+        "workflow_updated_at": {"wf1": "t1", "wf2": "t2"},
+        "last_sync": "2025-01-01T00:00:00",
+    }))
+
+    assert store.import_legacy_history(str(legacy)) is True
+    assert store.import_legacy_history(str(legacy)) is False
+    assert [op["workflow_name"] for op in store.recent_operations()] == ["A"]
+    assert store.workflow_state()["wf1"] == {"hash": "h1", "updated_at": "t1"}
+    assert store.workflow_state()["wf2"] == {"hash": None, "updated_at": "t2"}
+    assert store.get_meta("last_sync") == "2025-01-01T00:00:00"
+
+
+def test_history_persists_across_connections(tmp_path):
+    db_file = str(tmp_path / "history.sqlite")
+    store = SyncHistoryStore(db_file)
+    store.append_operation({"timestamp": iso(), "operation": "push"})
+    store.close()
+
+    reopened = SyncHistoryStore(db_file)
+    assert [op["operation"] for op in reopened.recent_operations()] == ["push"]
+    reopened.close()